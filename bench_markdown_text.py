@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Markdown 转纯文本的性能对比：原先 /convert-file 中的四次 re.sub 与单遍的 markdown_to_text
+
+用法: python bench_markdown_text.py [已转换的 Markdown 文件或 PDF]
+不指定文件时使用仓库中的 ae-2025-015983.pdf（需要 markitdown），转换失败则分别测试两份合成文档：
+标记密集的文档（每页都有标题、表格、链接和图片）和以正文为主的文档（接近 PDF 转换的典型输出）。
+"""
+
+import os
+import re
+import sys
+import time
+sys.path.append('src')
+
+from markdown_text import markdown_to_text
+
+SAMPLE_PDF = "ae-2025-015983.pdf"
+
+
+def legacy_strip(text: str) -> str:
+    """原实现：每次调用都重新查找模式，并把整篇文档复制四次"""
+    text = re.sub(r'#+ ', '', text)
+    text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)
+    text = re.sub(r'\*(.*?)\*', r'\1', text)
+    text = re.sub(r'`(.*?)`', r'\1', text)
+    return text
+
+
+def synthetic_document(pages: int = 500) -> str:
+    """标记密集：每页都有标题、强调、链接、图片、表格和代码块"""
+    page = (
+        "## Section {i}\n\n"
+        "Some **bold** text, some *italic* text, `inline code` and a [link](https://example.com/{i}).\n"
+        "![figure {i}](figure{i}.png)\n\n"
+        "| Column A | Column B | Column C |\n"
+        "|---|---|---|\n"
+        "| {i} | **value** | `x` |\n\n"
+        "```python\nresult = a*b*c\n```\n\n"
+        + "Plain paragraph text extracted from a PDF page without any markup at all. " * 20
+        + "\n\n"
+    )
+    return "".join(page.format(i=i) for i in range(pages))
+
+
+def prose_document(pages: int = 500) -> str:
+    """以正文为主：每页一个标题，其余是按行断开的段落"""
+    line = "Plain paragraph text extracted from a PDF page, with an occasional **term** in bold.\n"
+    page = "## Page {i}\n\n" + ("Plain paragraph text extracted from a PDF page without any markup at all.\n" * 20 + line + "\n") * 2
+    return "".join(page.format(i=i) for i in range(pages))
+
+
+def load_document(path: str) -> str:
+    if path.lower().endswith(".pdf"):
+        from converters import convert_file
+        return convert_file(path)
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def bench(funcs: list, text: str, repeat: int = 7) -> list[float]:
+    """交替运行各实现，取每个实现的最短耗时（毫秒），减少机器负载波动的影响"""
+    best = [float("inf")] * len(funcs)
+    for _ in range(repeat):
+        for i, func in enumerate(funcs):
+            started = time.perf_counter()
+            func(text)
+            best[i] = min(best[i], time.perf_counter() - started)
+    return [b * 1000 for b in best]
+
+
+def report(name: str, text: str) -> None:
+    # 放大到约 20 MB，模拟大型 PDF 的转换结果
+    copies = max(1, (20 * 1024 * 1024) // max(len(text), 1))
+    large = text * copies
+    print(f"文档: {name}，{len(large) / 1024 / 1024:.1f} MB（{copies} 份拼接）")
+
+    legacy_ms, single_ms = bench([legacy_strip, markdown_to_text], large)
+    print(f"  四次 re.sub:       {legacy_ms:8.1f} ms")
+    print(f"  markdown_to_text:  {single_ms:8.1f} ms（{legacy_ms / single_ms:.2f}x）")
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else SAMPLE_PDF
+    text = None
+    if os.path.exists(path):
+        try:
+            text = load_document(path)
+        except Exception as e:
+            print(f"加载 {path} 失败: {e}，改用合成文档")
+    if text:
+        report(path, text)
+    else:
+        report("合成文档，标记密集（500 页）", synthetic_document())
+        report("合成文档，以正文为主（500 页）", prose_document())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+
+class AgentQueueFullError(Exception):
+    """Raised when the admission queue is full."""
+
+
+class AgentRunTimeoutError(Exception):
+    """Raised when an agent run exceeds its time limit."""
+
+
+class AgentRunCancelledError(Exception):
+    """Raised when an agent run is cancelled through `AgentRunPool.cancel`."""
+
+
+class AgentRunPool():
+    """Bounded pool for agent runs with an admission queue.
+
+    At most `max_concurrency` runs execute at once and at most `max_queue`
+    more may wait for a slot; further submissions are rejected immediately.
+    Each run is its own task, so it can time out or be cancelled by id without
+    affecting the request handler or any other run.
+    """
+
+    def __init__(self, max_concurrency: int = 2, max_queue: int = 16, timeout: float = 300.0):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.timeout = timeout
+
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._queued: set[str] = set()
+
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self._wait_ms_total = 0.0
+        self._wait_ms_max = 0.0
+        self._run_ms_total = 0.0
+        self._run_ms_max = 0.0
+        self._started_runs = 0
+
+    def submit(self, run_id: str, coro_factory: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Admit a run and schedule it, returning its task.
+
+        Raises:
+            AgentQueueFullError: If `max_queue` runs are already waiting
+        """
+        if run_id in self._tasks:
+            raise ValueError(f"Run {run_id} is already in progress")
+        # Runs that have not started yet either take a free slot or wait in the queue
+        free_slots = self.max_concurrency - self.running
+        if len(self._queued) >= self.max_queue + free_slots:
+            self.rejected += 1
+            raise AgentQueueFullError(f"Agent queue is full ({self.max_queue} waiting)")
+
+        self._queued.add(run_id)
+        task = asyncio.create_task(self._run(run_id, coro_factory, time.perf_counter()))
+        self._tasks[run_id] = task
+        task.add_done_callback(lambda t: self._on_done(run_id, t))
+        return task
+
+    async def run(self, run_id: str, coro_factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Submit a run and wait for its result.
+
+        Raises:
+            AgentQueueFullError: If the admission queue is full
+            AgentRunTimeoutError: If the run exceeds `timeout` seconds
+            AgentRunCancelledError: If the run was cancelled by id
+        """
+        task = self.submit(run_id, coro_factory)
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if task.cancelled() and not asyncio.current_task().cancelling():
+                raise AgentRunCancelledError(f"Run {run_id} was cancelled")
+            raise
+
+    def cancel(self, run_id: str) -> bool:
+        """Cancel a queued or running run. Returns False if no such run exists."""
+        task = self._tasks.get(run_id)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    def stats(self) -> dict:
+        started = self._started_runs
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "timeout_seconds": self.timeout,
+            "queued": len(self._queued),
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "cancelled": self.cancelled,
+            "avg_queue_wait_ms": round(self._wait_ms_total / started, 1) if started else 0.0,
+            "max_queue_wait_ms": round(self._wait_ms_max, 1),
+            "avg_run_ms": round(self._run_ms_total / started, 1) if started else 0.0,
+            "max_run_ms": round(self._run_ms_max, 1)
+        }
+
+    async def _run(self, run_id: str, coro_factory: Callable[[], Awaitable[Any]], enqueued_at: float) -> Any:
+        async with self._semaphore:
+            self._queued.discard(run_id)
+            started_at = time.perf_counter()
+            wait_ms = (started_at - enqueued_at) * 1000
+            self._started_runs += 1
+            self._wait_ms_total += wait_ms
+            self._wait_ms_max = max(self._wait_ms_max, wait_ms)
+
+            self.running += 1
+            deadline = asyncio.timeout(self.timeout)
+            try:
+                async with deadline:
+                    return await coro_factory()
+            except TimeoutError:
+                if deadline.expired():
+                    self.timeouts += 1
+                    raise AgentRunTimeoutError(f"Agent 运行超时（{self.timeout} 秒）")
+                raise
+            finally:
+                self.running -= 1
+                run_ms = (time.perf_counter() - started_at) * 1000
+                self._run_ms_total += run_ms
+                self._run_ms_max = max(self._run_ms_max, run_ms)
+
+    def _on_done(self, run_id: str, task: asyncio.Task) -> None:
+        self._tasks.pop(run_id, None)
+        self._queued.discard(run_id)
+        if task.cancelled():
+            self.cancelled += 1
+        elif task.exception() is not None:
+            self.failed += 1
+        else:
+            self.completed += 1
@@ -1,16 +1,30 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Iterator
 import asyncio
 import uvicorn
 from dotenv import load_dotenv
 import os
 import pathlib
+import json
+import threading
+import time
+import uuid
 
 # 导入现有的 Agent 代码
-from qwen_agen import get_agent_with_config, get_obsidian_tools
-from langchain.tools import Tool
+from qwen_agen import get_registered_agent, registry_stats, resolve_agent_mode, get_obsidian_tools, get_llm, llm_config_key
+from tools import obsidian_client, async_obsidian_client, vault_cache, search_index, semantic_index, retrieve_context, conversion_cache, vault_snapshot, vault_watcher
+from agent_pool import AgentRunPool, AgentQueueFullError, AgentRunTimeoutError, AgentRunCancelledError
+from conversation_store import ConversationStore
+from conversion_jobs import ConversionJobManager
+from converters import SUPPORTED_EXTENSIONS, iter_convert
+from markdown_text import iter_markdown_to_text
+from upload_spool import spool_multipart, UploadTooLargeError
+from response_cache import ResponseCache, VaultAccess, track_access
+from tool_memo import memoize_run, tool_memo_stats
+from langchain.tools import Tool, StructuredTool
 
 load_dotenv()
 
@@ -29,10 +43,14 @@ app.add_middleware(
 class ChatRequest(BaseModel):
     message: str
     conversation_id: Optional[str] = None
+    request_id: Optional[str] = None  # 可选，用于取消请求
 
 class ChatResponse(BaseModel):
     response: str
     conversation_id: str
+    request_id: Optional[str] = None
+    agent_version: Optional[int] = None
+    cached: bool = False
     status: str = "success"
 
 class LLMConfig(BaseModel):
@@ -40,85 +58,217 @@ class LLMConfig(BaseModel):
     model: str
     api_key: Optional[str] = ""
     api_base: Optional[str] = ""
+    agent_mode: Optional[str] = None  # react / tool_calling / auto，不指定时使用 AGENT_MODE
 
 class ConvertFileRequest(BaseModel):
     file_path: str
     output_format: str = "markdown"  # "markdown" or "text"
     output_path: Optional[str] = None
 
-# 全局变量存储 Agent 实例和配置
-agent_instance = None
-conversation_history = {}
+class ConvertBatchRequest(BaseModel):
+    file_paths: List[str]
+    output_format: str = "markdown"  # "markdown" or "text"
+    output_dir: Optional[str] = None  # 不指定时转换结果随任务状态返回
+
+class AgentVersion():
+    """一个已构建完成、不再修改的 Agent 版本"""
+    
+    def __init__(self, version: int, agent, llm_config: LLMConfig, agent_mode: str):
+        self.version = version
+        self.agent = agent
+        self.llm_config = llm_config
+        self.agent_mode = agent_mode
+        self.created_at = time.time()
+
+# 全局变量存储当前 Agent 版本和配置
+# 重新配置时在后台构建新版本，完成后整体替换引用；进行中的请求持有旧版本直到结束
+active_agent: Optional[AgentVersion] = None
 current_llm_config = LLMConfig(provider="ollama", model="qwen3:1.7b")
+agent_version_counter = 0
+agent_reconfigure_lock = asyncio.Lock()
+# react: 单字符串输入的 ReAct Agent；tool_calling: 原生工具调用，一轮中的多个工具调用并发执行；auto: 按提供商选择
+default_agent_mode = os.getenv("AGENT_MODE", "react").lower()
 
-def initialize_agent(llm_config: Optional[LLMConfig] = None):
-    """初始化 Agent 实例"""
-    global agent_instance, current_llm_config
-    try:
-        if llm_config:
-            current_llm_config = llm_config
-            
-        # 获取 Obsidian 工具并转换为单输入工具
-        obsidian_tools = get_obsidian_tools()
-        
-        # 将 StructuredTool 转换为单输入的 Tool
-        simple_tools = []
-        for tool in obsidian_tools:
-            # 创建包装函数来处理单输入
-            def create_wrapper(tool_func):
-                def wrapper(input_str):
-                    try:
-                        # 对于没有参数的工具
-                        if tool_func.__name__ == 'list_files_in_vault':
-                            return tool_func("")
-                        # 对于有参数的工具，尝试解析输入
-                        elif '|' in input_str:
-                            parts = input_str.split('|')
-                            if len(parts) == 2:
-                                return tool_func(parts[0].strip(), parts[1].strip())
-                            else:
-                                return tool_func(input_str.strip())
-                        else:
-                            return tool_func(input_str.strip())
-                    except Exception as e:
-                        return f"工具调用失败: {str(e)}"
-                return wrapper
-            
-            simple_tool = Tool(
-                name=tool.name,
-                description=tool.description,
-                func=create_wrapper(tool.func)
-            )
-            simple_tools.append(simple_tool)
-        
-        # 添加一个简单的天气工具作为示例
-        def get_weather(city: str) -> str:
-            """获取指定城市的天气信息"""
-            return f"当前 {city} 的天气是晴天，气温 25°C。"
+# Agent 工作池：限制并发运行数和排队长度，保证其他端点不受慢请求影响
+agent_pool = AgentRunPool(
+    max_concurrency=int(os.getenv("AGENT_MAX_CONCURRENCY", "2")),
+    max_queue=int(os.getenv("AGENT_MAX_QUEUE", "16")),
+    timeout=float(os.getenv("AGENT_TIMEOUT_SECONDS", "300"))
+)
+
+# 对话记忆：超出 token 预算时把较早的轮次压缩成摘要，空闲对话按 LRU 淘汰，可选持久化到 SQLite
+conversation_store = ConversationStore(
+    max_conversations=int(os.getenv("CONVERSATION_MAX_ACTIVE", "200")),
+    token_budget=int(os.getenv("CONVERSATION_TOKEN_BUDGET", "2000")),
+    keep_recent_turns=int(os.getenv("CONVERSATION_KEEP_TURNS", "4")),
+    db_path=os.getenv("CONVERSATION_DB_PATH") or None
+)
+
+# 文档转换进程池：MarkItDown / unstructured 是 CPU 密集型，按文件分发到多个进程并行转换
+conversion_jobs = ConversionJobManager(
+    max_workers=int(os.getenv("CONVERT_MAX_WORKERS", "0")) or None,
+    file_timeout=float(os.getenv("CONVERT_TIMEOUT_SECONDS", "300")),
+    cache=conversion_cache,
+    prewarm=os.getenv("CONVERTER_PREWARM", "false").lower() == "true"
+)
+max_upload_bytes = int(os.getenv("CONVERT_MAX_UPLOAD_BYTES", str(200 * 1024 * 1024)))
 
-        weather_tool = Tool(
+# 回答缓存：相同问题（可选按语义相似度匹配）直接返回上次的回答，所依赖的笔记变化后自动失效
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256")),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600")),
+    revalidate_interval=float(os.getenv("RESPONSE_CACHE_REVALIDATE_SECONDS", "5")),
+    modified_since=obsidian_client.get_files_modified_since,
+    embedder=semantic_index.embedder if semantic_index else None,
+    similarity_threshold=float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0"))
+) if int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256")) > 0 else None
+
+def invalidate_cached_responses(events) -> None:
+    """在 Obsidian 中修改笔记后，让依赖这些笔记的缓存回答失效"""
+    for event in events:
+        for path in event.paths():
+            response_cache.invalidate(path)
+
+if response_cache is not None:
+    obsidian_client.add_change_listener(response_cache.invalidate)
+    if vault_watcher is not None:
+        vault_watcher.subscribe(invalidate_cached_responses)
+
+# 后台任务（对话摘要）的引用，防止任务在完成前被回收
+background_tasks = set()
+
+# 按 Agent 模式缓存的工具列表：重复初始化时复用同一组工具，注册表中已编译的 Agent 才能被复用
+agent_tools = {}
+
+def get_weather(city: str) -> str:
+    """获取指定城市的天气信息"""
+    return f"当前 {city} 的天气是晴天，气温 25°C。"
+
+def build_agent_tools(agent_mode: str) -> list:
+    """构建指定模式下的工具列表"""
+    # 获取 Obsidian 工具
+    obsidian_tools = get_obsidian_tools()
+    
+    if agent_mode == "tool_calling":
+        # 原生工具调用：直接使用带参数模式的 StructuredTool，无需把多个参数拼成一个字符串
+        for tool in obsidian_tools:
+            tool.handle_validation_error = True
+        weather_tool = StructuredTool.from_function(
             name="get_weather",
-            description="获取指定城市的天气信息，当用户询问天气时调用此工具。输入参数是城市名称。",
-            func=lambda input_str: get_weather(input_str.strip())
+            description="获取指定城市的天气信息，当用户询问天气时调用此工具。",
+            func=get_weather
         )
+        return obsidian_tools + [weather_tool]
+    
+    # 将 StructuredTool 转换为单输入的 Tool
+    simple_tools = []
+    for tool in obsidian_tools:
+        # 创建包装函数来处理单输入
+        def parse_args(tool_func, input_str):
+            # 对于没有参数的工具
+            if tool_func.__name__ == 'list_files_in_vault':
+                return ("",)
+            # edit_lines 的 JSON 数组中可能含有“|”，只按第一个“|”拆分
+            elif tool_func.__name__ == 'edit_lines' and '|' in input_str:
+                filepath, edits = input_str.split('|', 1)
+                return (filepath.strip(), edits.strip())
+            # 对于有参数的工具，尝试解析输入
+            elif '|' in input_str:
+                parts = input_str.split('|')
+                if len(parts) == 2:
+                    return (parts[0].strip(), parts[1].strip())
+            return (input_str.strip(),)
+
+        def create_wrapper(tool_func):
+            def wrapper(input_str):
+                try:
+                    return tool_func(*parse_args(tool_func, input_str))
+                except Exception as e:
+                    return f"工具调用失败: {str(e)}"
+            return wrapper
 
-        # 合并所有工具
-        tool_list = simple_tools + [weather_tool]
+        def create_async_wrapper(tool_func, tool_coroutine):
+            async def async_wrapper(input_str):
+                try:
+                    return await tool_coroutine(*parse_args(tool_func, input_str))
+                except Exception as e:
+                    return f"工具调用失败: {str(e)}"
+            return async_wrapper
         
-        # 使用配置初始化 Agent
-        agent_instance = get_agent_with_config(tool_list, current_llm_config)
-        print(f"Agent 初始化成功，使用 {current_llm_config.provider} - {current_llm_config.model}")
+        simple_tool = Tool(
+            name=tool.name,
+            description=tool.description,
+            func=create_wrapper(tool.func),
+            coroutine=create_async_wrapper(tool.func, tool.coroutine) if tool.coroutine else None
+        )
+        simple_tools.append(simple_tool)
+
+    # 添加一个简单的天气工具作为示例
+    weather_tool = Tool(
+        name="get_weather",
+        description="获取指定城市的天气信息，当用户询问天气时调用此工具。输入参数是城市名称。",
+        func=lambda input_str: get_weather(input_str.strip())
+    )
+
+    # 合并所有工具
+    return simple_tools + [weather_tool]
+
+def build_agent_version(llm_config: LLMConfig, version: int) -> AgentVersion:
+    """构建一个新的 Agent 版本（在工作线程中执行，不阻塞事件循环）"""
+    agent_mode = resolve_agent_mode(llm_config.agent_mode or default_agent_mode, llm_config.provider)
+    
+    # 工具每种模式只构建一次，所有版本共享
+    if agent_mode not in agent_tools:
+        agent_tools[agent_mode] = build_agent_tools(agent_mode)
+    
+    # 使用配置初始化 Agent，相同配置直接复用注册表中已创建的 Agent
+    agent = get_registered_agent(agent_tools[agent_mode], llm_config, agent_mode)
+    return AgentVersion(version, agent, llm_config, agent_mode)
+
+async def initialize_agent(llm_config: Optional[LLMConfig] = None) -> bool:
+    """在后台构建新的 Agent 版本并原子替换当前版本；构建失败时保留当前版本"""
+    global active_agent, current_llm_config, agent_version_counter
+    config = llm_config or current_llm_config
+    # 串行处理重新配置，避免较早的配置覆盖较新的配置
+    async with agent_reconfigure_lock:
+        try:
+            new_version = await asyncio.to_thread(build_agent_version, config, agent_version_counter + 1)
+        except Exception as e:
+            print(f"Agent 初始化失败: {str(e)}")
+            return False
+        agent_version_counter = new_version.version
+        active_agent = new_version
+        current_llm_config = config
+        print(f"Agent 初始化成功（版本 {new_version.version}，{new_version.agent_mode} 模式），使用 {config.provider} - {config.model}")
         return True
-    except Exception as e:
-        print(f"Agent 初始化失败: {str(e)}")
-        return False
 
 @app.on_event("startup")
 async def startup_event():
     """应用启动时初始化 Agent"""
-    success = initialize_agent()
+    success = await initialize_agent()
     if not success:
         print("警告: Agent 初始化失败，某些功能可能不可用")
+    if search_index is not None:
+        search_index.start()
+    if semantic_index is not None:
+        semantic_index.start()
+    if vault_watcher is not None:
+        vault_watcher.start()
+    await conversion_jobs.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """应用关闭时释放 Obsidian 连接池"""
+    if vault_watcher is not None:
+        vault_watcher.stop()
+    if search_index is not None:
+        search_index.stop()
+    if semantic_index is not None:
+        semantic_index.stop()
+    obsidian_client.close()
+    await async_obsidian_client.aclose()
+    conversation_store.close()
+    conversion_jobs.shutdown()
 
 @app.get("/")
 async def root():
@@ -130,15 +280,28 @@ async def health_check():
     """详细的健康检查"""
     return {
         "status": "healthy",
-        "agent_initialized": agent_instance is not None,
+        "agent_initialized": active_agent is not None,
         "current_config": current_llm_config.dict(),
+        "agent_version": active_agent.version if active_agent else None,
+        "agent_mode": active_agent.agent_mode if active_agent else None,
+        "llm_registry": registry_stats(),
+        "obsidian_connections": obsidian_client.get_connection_stats(),
+        "vault_cache": vault_cache.stats() if vault_cache else None,
+        "search_index": search_index.stats() if search_index else None,
+        "vault_snapshot": vault_snapshot.stats(),
+        "vault_watcher": vault_watcher.stats() if vault_watcher else None,
+        "semantic_index": semantic_index.stats() if semantic_index else None,
+        "agent_pool": agent_pool.stats(),
+        "conversations": conversation_store.stats(),
+        "conversion_jobs": conversion_jobs.stats(),
+        "response_cache": response_cache.stats() if response_cache else None,
+        "tool_memo": tool_memo_stats(),
         "version": "1.0.0"
     }
 
 @app.post("/configure-llm")
 async def configure_llm(config: LLMConfig):
     """配置LLM并重新初始化Agent"""
-    global current_llm_config
     try:
         # 先测试连接
         test_result = await test_llm_connection(config.dict())
@@ -146,34 +309,106 @@ async def configure_llm(config: LLMConfig):
             raise HTTPException(status_code=400, detail=f"LLM连接测试失败: {test_result['error']}")
         
         # 重新初始化Agent
-        success = initialize_agent(config)
+        success = await initialize_agent(config)
         if success:
-            return {"message": "LLM配置成功", "status": "success", "config": config.dict()}
+            return {"message": "LLM配置成功", "status": "success", "config": config.dict(), "agent_version": active_agent.version}
         else:
             raise HTTPException(status_code=500, detail="Agent重新初始化失败")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"配置LLM失败: {str(e)}")
 
+async def prepare_agent_input(message: str, conv_id: str) -> str:
+    """构造 Agent 输入：注入对话历史，并先检索相关笔记作为上下文，减少 Agent 查找文件的迭代次数"""
+    agent_input = conversation_store.build_prompt(conv_id, message)
+    context = await asyncio.to_thread(retrieve_context, message)
+    if context:
+        return f"以下是从 Obsidian 保险库中检索到的相关笔记片段，可直接用于回答：\n\n{context}\n\n{agent_input}"
+    return agent_input
+
+async def summarize_history(transcript: str) -> str:
+    """用当前配置的 LLM 把较早的对话压缩成摘要"""
+    llm = get_llm(
+        current_llm_config.provider,
+        current_llm_config.model,
+        current_llm_config.api_key or "",
+        current_llm_config.api_base or ""
+    )
+    from langchain_core.messages import HumanMessage
+    prompt = f"请将以下对话压缩成简洁的摘要，保留关键事实、涉及的文件名和用户的偏好，不要添加新内容：\n\n{transcript}"
+    response = await llm.ainvoke([HumanMessage(content=prompt)])
+    return response.content
+
+def response_cache_scope(agent_version: AgentVersion) -> tuple:
+    """回答缓存的作用域：同一问题在不同模型或 Agent 模式下的回答分开缓存"""
+    config = agent_version.llm_config
+    return llm_config_key(config.provider, config.model, config.api_key or "", config.api_base or "") + (agent_version.agent_mode,)
+
+def is_first_turn(conversation: dict) -> bool:
+    """只有对话的第一轮使用回答缓存，后续轮次的回答依赖上下文"""
+    return not conversation["turns"] and not conversation["summary"]
+
+async def lookup_cached_response(message: str, agent_version: AgentVersion) -> Optional[str]:
+    """查找缓存的回答（可能需要查询保险库变更和计算问题向量，在线程中执行）"""
+    if response_cache is None:
+        return None
+    return await asyncio.to_thread(response_cache.lookup, message, response_cache_scope(agent_version))
+
+async def store_cached_response(message: str, agent_version: AgentVersion, response_text: str, access: VaultAccess) -> None:
+    """缓存本轮回答（启用相似问题匹配时需要计算问题向量，在线程中执行）"""
+    if response_cache is None:
+        return
+    await asyncio.to_thread(response_cache.store, message, response_cache_scope(agent_version), response_text, access)
+
+async def remember_turn(conv_id: str, message: str, response_text: str):
+    """保存一轮对话（SQLite 写入在线程中执行），超出 token 预算时在后台生成摘要，不阻塞响应"""
+    await asyncio.to_thread(conversation_store.append_turn, conv_id, message, response_text)
+    if conversation_store.needs_compaction(conv_id):
+        task = asyncio.create_task(conversation_store.compact(conv_id, summarize_history))
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat_with_agent(request: ChatRequest):
     """与 Agent 聊天的主要端点"""
-    global agent_instance, conversation_history
-    
-    if agent_instance is None:
+    # 固定本次请求使用的 Agent 版本，运行期间不受重新配置影响
+    agent_version = active_agent
+    if agent_version is None:
         raise HTTPException(status_code=500, detail="Agent 未初始化")
+    agent = agent_version.agent
+    
+    request_id = request.request_id or uuid.uuid4().hex
     
     try:
         # 生成或使用现有的对话 ID
-        conv_id = request.conversation_id or f"conv_{len(conversation_history)}"
-        
-        # 获取对话历史
-        if conv_id not in conversation_history:
-            conversation_history[conv_id] = []
+        conv_id, conversation = conversation_store.get_or_create(request.conversation_id)
         
         print(f"收到消息: {request.message}")
         
-        # 调用 Agent
-        result = agent_instance.invoke({"input": request.message})
+        first_turn = is_first_turn(conversation)
+        cached_text = await lookup_cached_response(request.message, agent_version) if first_turn else None
+        if cached_text is not None:
+            await remember_turn(conv_id, request.message, cached_text)
+            return ChatResponse(
+                response=cached_text,
+                conversation_id=conv_id,
+                request_id=request_id,
+                agent_version=agent_version.version,
+                cached=True,
+                status="success"
+            )
+
+        async def run_agent():
+            # 记录本次运行读取和修改了哪些笔记，决定回答能否缓存以及何时失效；重复的只读工具调用直接复用结果
+            with track_access() as access, memoize_run() as memo:
+                agent_input = await prepare_agent_input(request.message, conv_id)
+                # 异步调用 Agent，避免阻塞事件循环
+                result = await agent.ainvoke({"input": agent_input})
+            if memo.saved:
+                print(f"工具调用缓存: {memo.calls} 次只读调用中复用了 {memo.saved} 次")
+            return result, access
+        
+        # 交给工作池执行，超出并发和排队上限时直接拒绝
+        result, access = await agent_pool.run(request_id, run_agent)
         
         print(f"Agent 返回结果: {result}")
         
@@ -181,17 +416,24 @@ async def chat_with_agent(request: ChatRequest):
         response_text = result.get("output", str(result))
         
         # 保存对话历史
-        conversation_history[conv_id].append({
-            "user": request.message,
-            "agent": response_text
-        })
+        await remember_turn(conv_id, request.message, response_text)
+        if first_turn:
+            await store_cached_response(request.message, agent_version, response_text, access)
         
         return ChatResponse(
             response=response_text,
             conversation_id=conv_id,
+            request_id=request_id,
+            agent_version=agent_version.version,
             status="success"
         )
-        
+    
+    except AgentQueueFullError:
+        raise HTTPException(status_code=429, detail="服务器繁忙，请稍后再试")
+    except AgentRunTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except AgentRunCancelledError:
+        raise HTTPException(status_code=499, detail="请求已取消")
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
@@ -199,40 +441,197 @@ async def chat_with_agent(request: ChatRequest):
         print(f"错误详情: {error_details}")
         raise HTTPException(status_code=500, detail=f"处理请求时出错: {str(e)}")
 
+@app.post("/chat/stream")
+async def chat_with_agent_stream(request: ChatRequest):
+    """流式聊天端点，以 NDJSON 逐行返回事件
+
+    事件类型：
+    - start: 请求已受理，附带可用于取消的 request_id
+    - token: LLM 生成的文本片段
+    - tool_start / tool_end: 工具调用开始 / 结束
+    - final: 最终回答，附带首 token 延迟（time_to_first_token_ms）、总耗时（total_ms）
+      和本次运行中复用的工具调用次数（tool_calls_saved）
+      命中回答缓存时直接返回 final，附带 cached: true
+    - error: 处理出错、超时或被取消
+    """
+    # 固定本次请求使用的 Agent 版本，运行期间不受重新配置影响
+    agent_version = active_agent
+    if agent_version is None:
+        raise HTTPException(status_code=500, detail="Agent 未初始化")
+    agent = agent_version.agent
+    
+    request_id = request.request_id or uuid.uuid4().hex
+    conv_id, conversation = conversation_store.get_or_create(request.conversation_id)
+    
+    def encode_event(event: dict) -> str:
+        return json.dumps(event, ensure_ascii=False, default=str) + "\n"
+    
+    first_turn = is_first_turn(conversation)
+    cached_text = await lookup_cached_response(request.message, agent_version) if first_turn else None
+    if cached_text is not None:
+        await remember_turn(conv_id, request.message, cached_text)
+        cached_events = [
+            {"type": "start", "request_id": request_id, "conversation_id": conv_id, "agent_version": agent_version.version},
+            {"type": "final", "response": cached_text, "conversation_id": conv_id, "request_id": request_id, "cached": True}
+        ]
+        return StreamingResponse(
+            iter([encode_event(event) for event in cached_events]),
+            media_type="application/x-ndjson"
+        )
+    
+    events = asyncio.Queue()
+    
+    async def run_agent():
+        started = time.perf_counter()
+        first_token_ms = None
+        response_text = None
+        # Agent 决定调用的工具及其输入（字符串输入在工具事件里取不到）
+        action_inputs = {}
+        
+        try:
+            print(f"收到流式消息: {request.message}")
+            # 记录本次运行读取和修改了哪些笔记，决定回答能否缓存以及何时失效；重复的只读工具调用直接复用结果
+            with track_access() as access, memoize_run() as memo:
+                agent_input = await prepare_agent_input(request.message, conv_id)
+            
+                async for event in agent.astream_events({"input": agent_input}, version="v2"):
+                    kind = event["event"]
+                
+                    if kind in ("on_chat_model_stream", "on_llm_stream"):
+                        chunk = event["data"].get("chunk")
+                        text = getattr(chunk, "content", None)
+                        if text is None:
+                            text = getattr(chunk, "text", "")
+                        if not isinstance(text, str) or not text:
+                            continue
+                        if first_token_ms is None:
+                            first_token_ms = round((time.perf_counter() - started) * 1000, 1)
+                        await events.put({"type": "token", "content": text})
+                
+                    elif kind == "on_chain_stream" and not event.get("parent_ids"):
+                        for action in event["data"].get("chunk", {}).get("actions", []):
+                            action_inputs[action.tool] = action.tool_input
+                
+                    elif kind == "on_tool_start":
+                        await events.put({
+                            "type": "tool_start",
+                            "tool": event["name"],
+                            "input": event["data"].get("input") or action_inputs.get(event["name"])
+                        })
+                
+                    elif kind == "on_tool_end":
+                        await events.put({
+                            "type": "tool_end",
+                            "tool": event["name"],
+                            "output": str(event["data"].get("output"))
+                        })
+                
+                    elif kind == "on_chain_end" and not event.get("parent_ids"):
+                        # 根链结束即 Agent 的最终结果
+                        output = event["data"].get("output")
+                        response_text = output.get("output", str(output)) if isinstance(output, dict) else str(output)
+            
+            total_ms = round((time.perf_counter() - started) * 1000, 1)
+            print(f"流式响应完成，首 token 延迟: {first_token_ms} ms，总耗时: {total_ms} ms，复用工具调用: {memo.saved} 次")
+            
+            response_text = response_text or ""
+            await remember_turn(conv_id, request.message, response_text)
+            if first_turn:
+                await store_cached_response(request.message, agent_version, response_text, access)
+            
+            await events.put({
+                "type": "final",
+                "response": response_text,
+                "conversation_id": conv_id,
+                "request_id": request_id,
+                "time_to_first_token_ms": first_token_ms,
+                "total_ms": total_ms,
+                "tool_calls_saved": memo.saved
+            })
+        
+        except Exception as e:
+            import traceback
+            print(f"流式处理请求时出错: {str(e)}")
+            print(f"错误详情: {traceback.format_exc()}")
+            await events.put({"type": "error", "error": f"处理请求时出错: {str(e)}"})
+    
+    # 在返回响应前完成准入检查，队列已满时直接返回 429
+    try:
+        task = agent_pool.submit(request_id, run_agent)
+    except AgentQueueFullError:
+        raise HTTPException(status_code=429, detail="服务器繁忙，请稍后再试")
+    
+    async def event_stream():
+        try:
+            yield encode_event({"type": "start", "request_id": request_id, "conversation_id": conv_id, "agent_version": agent_version.version})
+            while True:
+                next_event = asyncio.ensure_future(events.get())
+                done, _ = await asyncio.wait({next_event, task}, return_when=asyncio.FIRST_COMPLETED)
+                if next_event in done:
+                    yield encode_event(next_event.result())
+                    continue
+                next_event.cancel()
+                break
+            
+            while not events.empty():
+                yield encode_event(events.get_nowait())
+            
+            if task.cancelled():
+                yield encode_event({"type": "error", "error": "请求已取消"})
+            elif isinstance(task.exception(), AgentRunTimeoutError):
+                yield encode_event({"type": "error", "error": str(task.exception())})
+            elif task.exception() is not None:
+                yield encode_event({"type": "error", "error": f"处理请求时出错: {str(task.exception())}"})
+        finally:
+            # 客户端断开连接时停止 Agent 运行
+            if not task.done():
+                task.cancel()
+    
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+@app.post("/chat/{request_id}/cancel")
+async def cancel_chat(request_id: str):
+    """取消排队中或运行中的聊天请求"""
+    if not agent_pool.cancel(request_id):
+        raise HTTPException(status_code=404, detail="请求不存在或已结束")
+    return {"message": f"请求 {request_id} 已取消", "status": "success"}
+
 @app.get("/conversations/{conversation_id}")
 async def get_conversation_history(conversation_id: str):
-    """获取对话历史"""
-    if conversation_id not in conversation_history:
+    """获取对话历史（较早的轮次可能已被压缩进 summary）"""
+    conversation = conversation_store.get(conversation_id)
+    if conversation is None:
         raise HTTPException(status_code=404, detail="对话不存在")
     
     return {
         "conversation_id": conversation_id,
-        "history": conversation_history[conversation_id]
+        "summary": conversation["summary"],
+        "history": conversation["turns"]
     }
 
 @app.get("/conversations")
 async def list_conversations():
     """列出所有对话"""
+    conversation_ids = conversation_store.list_ids()
     return {
-        "conversations": list(conversation_history.keys()),
-        "total": len(conversation_history)
+        "conversations": conversation_ids,
+        "total": len(conversation_ids)
     }
 
 @app.delete("/conversations/{conversation_id}")
 async def delete_conversation(conversation_id: str):
     """删除对话历史"""
-    if conversation_id not in conversation_history:
+    if not conversation_store.delete(conversation_id):
         raise HTTPException(status_code=404, detail="对话不存在")
     
-    del conversation_history[conversation_id]
     return {"message": f"对话 {conversation_id} 已删除"}
 
 @app.post("/agent/reload")
 async def reload_agent():
     """重新加载 Agent"""
-    success = initialize_agent()
+    success = await initialize_agent()
     if success:
-        return {"message": "Agent 重新加载成功", "status": "success"}
+        return {"message": "Agent 重新加载成功", "status": "success", "agent_version": active_agent.version}
     else:
         raise HTTPException(status_code=500, detail="Agent 重新加载失败")
 
@@ -245,31 +644,10 @@ async def test_llm_connection(request: dict):
         api_key = request.get("api_key", "")
         api_base = request.get("api_base", "")
         
-        # Test the LLM connection by creating a simple chat
-        if provider == "ollama":
-            from langchain_ollama import ChatOllama
-            llm = ChatOllama(model=model, base_url=api_base or "http://localhost:11434")
-        elif provider == "openai":
-            from langchain_openai import ChatOpenAI
-            llm = ChatOpenAI(model=model, api_key=api_key, base_url=api_base)
-        elif provider == "deepseek":
-            from langchain_openai import ChatOpenAI
-            llm = ChatOpenAI(
-                model=model,
-                api_key=api_key,
-                base_url=api_base or "https://api.deepseek.com"
-            )
-        elif provider == "gemini":
-            from langchain_google_genai import ChatGoogleGenerativeAI
-            llm = ChatGoogleGenerativeAI(model=model, google_api_key=api_key)
-        elif provider == "qwen":
-            from langchain_openai import ChatOpenAI
-            llm = ChatOpenAI(
-                model=model,
-                api_key=api_key,
-                base_url=api_base or "https://dashscope.aliyuncs.com/compatible-mode/v1"
-            )
-        else:
+        # Test the LLM connection, reusing the registered client (and its connection pool) for this config
+        try:
+            llm = get_llm(provider, model, api_key, api_base)
+        except ValueError:
             return {"success": False, "error": f"Unsupported provider: {provider}"}
         
         # Test with a simple message
@@ -317,45 +695,28 @@ async def reload_agent_endpoint(request: dict):
         model = request.get("model", "qwen3:1.7b")
         api_key = request.get("api_key", "")
         api_base = request.get("api_base", "")
+        agent_mode = request.get("agent_mode")
         
         # 创建新的LLM配置
         config = LLMConfig(
             provider=provider,
             model=model,
             api_key=api_key,
-            api_base=api_base
+            api_base=api_base,
+            agent_mode=agent_mode
         )
         
         # 重新初始化Agent
-        success = initialize_agent(config)
+        success = await initialize_agent(config)
         
         if success:
-            return {"success": True, "message": "Agent reloaded successfully"}
+            return {"success": True, "message": "Agent reloaded successfully", "agent_version": active_agent.version}
         else:
             return {"success": False, "error": "Agent重新初始化失败"}
         
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-async def convert_file_async(file_path_str: str, use_unstructured: bool):
-    loop = asyncio.get_event_loop()
-    try:
-        if use_unstructured:
-            from unstructured.partition.auto import partition
-            elements = await loop.run_in_executor(None, partition, file_path_str)
-            return "\n\n".join([str(el) for el in elements])
-        else:
-            from markitdown import MarkItDown
-            md = MarkItDown()
-            result = await loop.run_in_executor(None, md.convert, file_path_str)
-            return result.text_content
-    except Exception as e:
-        # 如果 `markitdown` 失败，尝试 `unstructured`
-        if not use_unstructured:
-            print(f"Markitdown 转换失败: {e}，尝试使用 unstructured")
-            return await convert_file_async(file_path_str, use_unstructured=True)
-        raise e
-
 @app.post("/convert-file")
 async def convert_file(request: ConvertFileRequest):
     """使用Markitdown或Unstructured转换文件"""
@@ -364,27 +725,17 @@ async def convert_file(request: ConvertFileRequest):
         if not file_path.exists():
             raise HTTPException(status_code=404, detail=f"文件不存在: {request.file_path}")
 
-        supported_extensions = {'.pdf', '.docx', '.doc', '.xlsx', '.xls', '.pptx', '.ppt', '.txt', '.md', '.html', '.htm', '.jpg', '.png'}
-        if file_path.suffix.lower() not in supported_extensions:
+        if file_path.suffix.lower() not in SUPPORTED_EXTENSIONS:
             raise HTTPException(status_code=400, detail=f"不支持的文件类型: {file_path.suffix}")
 
         try:
-            # 默认使用 markitdown，但准备好 unstructured 作为后备
-            content = await asyncio.wait_for(convert_file_async(str(file_path), use_unstructured=False), timeout=120.0)
-        except asyncio.TimeoutError:
+            # 默认使用 markitdown，但准备好 unstructured 作为后备；在转换进程池中执行，内容未变的文件直接命中缓存
+            content, cache_hit = await conversion_jobs.convert_cached(str(file_path), request.output_format, timeout=120.0)
+        except TimeoutError:
             raise HTTPException(status_code=408, detail="文件转换超时。请尝试使用unstructured或检查文件内容。")
         except ImportError as e:
             raise HTTPException(status_code=500, detail=f"缺少必要的库: {e}。请运行 'pip install markitdown unstructured'。")
 
-        if request.output_format == "text":
-            import re
-            text_content = content
-            text_content = re.sub(r'#+ ', '', text_content)
-            text_content = re.sub(r'\*\*(.*?)\*\*', r'\1', text_content)
-            text_content = re.sub(r'\*(.*?)\*', r'\1', text_content)
-            text_content = re.sub(r'`(.*?)`', r'\1', text_content)
-            content = text_content
-
         if request.output_path:
             output_path = pathlib.Path(request.output_path)
             output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -394,12 +745,14 @@ async def convert_file(request: ConvertFileRequest):
                 "success": True,
                 "message": f"文件已转换并保存到: {output_path}",
                 "output_path": str(output_path),
+                "cache_hit": cache_hit,
                 "content": content[:1000] + "..." if len(content) > 1000 else content
             }
         else:
             return {
                 "success": True,
                 "message": "文件转换成功",
+                "cache_hit": cache_hit,
                 "content": content
             }
     except Exception as e:
@@ -409,6 +762,189 @@ async def convert_file(request: ConvertFileRequest):
         print(f"错误详情: {error_details}")
         raise HTTPException(status_code=500, detail=f"文件转换失败: {str(e)}")
 
+async def iterate_in_thread(iterator: Iterator[str], max_buffered: int = 4):
+    """在工作线程中消费同步迭代器，通过有界队列逐块交给事件循环，内存占用不随文档大小增长"""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=max_buffered)
+    stopped = threading.Event()
+    done = object()
+    
+    def produce():
+        try:
+            for item in iterator:
+                if stopped.is_set():
+                    return
+                asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+        except Exception as e:
+            asyncio.run_coroutine_threadsafe(queue.put(e), loop).result()
+        finally:
+            asyncio.run_coroutine_threadsafe(queue.put(done), loop)
+    
+    producer = loop.run_in_executor(None, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # 客户端断开时让生产线程尽快退出：清空队列解除阻塞，它会在下一块之前停止
+        stopped.set()
+        while not queue.empty():
+            queue.get_nowait()
+        await producer
+
+@app.post("/convert-file/stream")
+async def convert_file_stream(request: ConvertFileRequest):
+    """流式转换大文件：按页 / 元素逐块输出 Markdown，text 格式逐块去除标记
+    
+    指定 output_path 时逐块写入文件并返回摘要，否则以 text/markdown 流式返回内容。
+    """
+    file_path = pathlib.Path(request.file_path)
+    if not file_path.exists():
+        raise HTTPException(status_code=404, detail=f"文件不存在: {request.file_path}")
+    if file_path.suffix.lower() not in SUPPORTED_EXTENSIONS:
+        raise HTTPException(status_code=400, detail=f"不支持的文件类型: {file_path.suffix}")
+    
+    # text 格式跨块处理：未结束的行和代码块留到下一块再去除标记，结果与 /convert-file 一致
+    transform = iter_markdown_to_text if request.output_format == "text" else (lambda chunks: chunks)
+    
+    if request.output_path:
+        output_path = pathlib.Path(request.output_path)
+        
+        def write_output():
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            chunks = 0
+            characters = 0
+            with open(output_path, 'w', encoding='utf-8') as f:
+                for chunk in transform(iter_convert(str(file_path))):
+                    f.write(chunk)
+                    chunks += 1
+                    characters += len(chunk)
+            return chunks, characters
+        
+        try:
+            chunks, characters = await asyncio.to_thread(write_output)
+        except ImportError as e:
+            raise HTTPException(status_code=500, detail=f"缺少必要的库: {e}。请运行 'pip install markitdown unstructured'。")
+        except Exception as e:
+            print(f"文件转换错误: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"文件转换失败: {str(e)}")
+        return {
+            "success": True,
+            "message": f"文件已转换并保存到: {output_path}",
+            "output_path": str(output_path),
+            "chunks": chunks,
+            "characters": characters
+        }
+    
+    async def content_stream():
+        try:
+            async for chunk in iterate_in_thread(transform(iter_convert(str(file_path)))):
+                yield chunk
+        except Exception as e:
+            # 响应头已发出，只能记录错误并结束流
+            print(f"流式文件转换错误: {str(e)}")
+    
+    return StreamingResponse(content_stream(), media_type="text/markdown; charset=utf-8")
+
+@app.post("/convert-upload")
+async def convert_upload(request: Request):
+    """上传文件并转换（multipart/form-data），适用于服务器无法直接访问的文件
+    
+    表单字段：
+    - file: 要转换的文件
+    - output_format: "markdown"（默认）或 "text"
+    - vault_path: 可选，转换结果直接写入保险库中的该路径，不再返回全文
+    """
+    try:
+        upload = await spool_multipart(request.headers.get("content-type", ""), request.stream(), max_upload_bytes)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        suffix = pathlib.Path(upload.filename).suffix.lower()
+        if suffix not in SUPPORTED_EXTENSIONS:
+            raise HTTPException(status_code=400, detail=f"不支持的文件类型: {suffix}")
+        
+        output_format = upload.fields.get("output_format", "markdown")
+        vault_path = upload.fields.get("vault_path")
+        try:
+            content, cache_hit = await conversion_jobs.convert_cached(upload.path, output_format, timeout=conversion_jobs.file_timeout)
+        except TimeoutError:
+            raise HTTPException(status_code=408, detail="文件转换超时。请尝试使用unstructured或检查文件内容。")
+        except ImportError as e:
+            raise HTTPException(status_code=500, detail=f"缺少必要的库: {e}。请运行 'pip install markitdown unstructured'。")
+        except Exception as e:
+            print(f"文件转换错误: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"文件转换失败: {str(e)}")
+        
+        result = {
+            "success": True,
+            "filename": upload.filename,
+            "size": upload.size,
+            "cache_hit": cache_hit
+        }
+        if vault_path:
+            # 通过 Obsidian 客户端直接写入保险库，同时通知缓存和索引
+            try:
+                await asyncio.to_thread(obsidian_client.put_content, vault_path, content)
+            except Exception as e:
+                raise HTTPException(status_code=502, detail=f"文件转换成功，但保存到Obsidian失败: {str(e)}")
+            result.update({
+                "message": f"文件已转换并保存到保险库: {vault_path}",
+                "vault_path": vault_path,
+                "content": content[:1000] + "..." if len(content) > 1000 else content
+            })
+        else:
+            result.update({"message": "文件转换成功", "content": content})
+        return result
+    finally:
+        await asyncio.to_thread(upload.cleanup)
+
+@app.post("/convert-batch")
+async def convert_batch(request: ConvertBatchRequest):
+    """提交批量转换任务，文件在进程池中并行转换，立即返回任务 ID"""
+    if not request.file_paths:
+        raise HTTPException(status_code=400, detail="文件列表为空")
+    
+    job = conversion_jobs.submit(request.file_paths, request.output_format, request.output_dir)
+    return {"job_id": job.id, "status": job.status, "total": len(job.files)}
+
+@app.get("/convert-batch/{job_id}")
+async def get_convert_batch(job_id: str, include_content: bool = True):
+    """查询批量转换任务的进度和每个文件的结果"""
+    job = conversion_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="转换任务不存在")
+    return job.to_dict(include_content=include_content)
+
+@app.get("/convert-batch/{job_id}/stream")
+async def stream_convert_batch(job_id: str):
+    """以 NDJSON 流式返回批量转换进度：每个文件完成时一个 file 事件，全部结束时一个 done 事件"""
+    job = conversion_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="转换任务不存在")
+    
+    async def event_stream():
+        async for event in job.watch():
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+@app.delete("/convert-batch/{job_id}")
+async def cancel_convert_batch(job_id: str):
+    """取消批量转换任务中尚未完成的文件"""
+    if conversion_jobs.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="转换任务不存在")
+    if not conversion_jobs.cancel(job_id):
+        raise HTTPException(status_code=409, detail="转换任务已结束")
+    return {"message": f"转换任务 {job_id} 已取消", "status": "success"}
+
 if __name__ == "__main__":
     # 从环境变量获取配置
     host = os.getenv("API_HOST", "127.0.0.1")
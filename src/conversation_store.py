@@ -0,0 +1,200 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+_CJK_RE = re.compile(r'[぀-ヿ㐀-䶿一-鿿가-힯豈-﫿]')
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: one per CJK character, one per four other characters."""
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+class ConversationStore():
+    """Per-conversation memory with a token budget and LRU eviction.
+
+    Each conversation keeps a running summary plus its most recent turns.
+    Once the turns exceed `token_budget`, everything but the last
+    `keep_recent_turns` is folded into the summary. At most
+    `max_conversations` stay in memory; with `db_path` set, conversations are
+    also persisted to SQLite and reloaded on demand after eviction.
+    """
+
+    def __init__(self, max_conversations: int = 200, token_budget: int = 2000, keep_recent_turns: int = 4, db_path: Optional[str] = None):
+        self.max_conversations = max(1, max_conversations)
+        self.token_budget = token_budget
+        self.keep_recent_turns = max(1, keep_recent_turns)
+
+        self._conversations: OrderedDict[str, dict] = OrderedDict()
+        self._compacting: set[str] = set()
+        self._lock = threading.RLock()
+        self.evictions = 0
+        self.compactions = 0
+
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS conversations ("
+                "id TEXT PRIMARY KEY, summary TEXT NOT NULL, turns TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def new_id(self) -> str:
+        return f"conv_{uuid.uuid4().hex[:12]}"
+
+    def get(self, conv_id: str) -> Optional[dict]:
+        """Return a conversation as `{"summary", "turns", "updated_at"}`, or None."""
+        with self._lock:
+            conversation = self._conversations.get(conv_id)
+            if conversation is None:
+                conversation = self._load(conv_id)
+                if conversation is None:
+                    return None
+                self._remember(conv_id, conversation)
+            else:
+                self._conversations.move_to_end(conv_id)
+            return conversation
+
+    def get_or_create(self, conv_id: Optional[str] = None) -> tuple[str, dict]:
+        conv_id = conv_id or self.new_id()
+        with self._lock:
+            conversation = self.get(conv_id)
+            if conversation is None:
+                conversation = {"summary": "", "turns": [], "updated_at": time.time()}
+                self._remember(conv_id, conversation)
+            return conv_id, conversation
+
+    def list_ids(self) -> list[str]:
+        with self._lock:
+            ids = list(self._conversations)
+            if self._db is not None:
+                stored = [row[0] for row in self._db.execute("SELECT id FROM conversations ORDER BY updated_at")]
+                stored_ids = set(stored)
+                ids = stored + [i for i in ids if i not in stored_ids]
+            return ids
+
+    def delete(self, conv_id: str) -> bool:
+        with self._lock:
+            existed = self._conversations.pop(conv_id, None) is not None
+            if self._db is not None:
+                cursor = self._db.execute("DELETE FROM conversations WHERE id = ?", (conv_id,))
+                self._db.commit()
+                existed = existed or cursor.rowcount > 0
+            return existed
+
+    def append_turn(self, conv_id: str, user_message: str, agent_response: str) -> None:
+        with self._lock:
+            conv_id, conversation = self.get_or_create(conv_id)
+            conversation["turns"].append({"user": user_message, "agent": agent_response})
+            conversation["updated_at"] = time.time()
+            self._save(conv_id, conversation)
+
+    def build_prompt(self, conv_id: str, message: str) -> str:
+        """Prefix the message with the conversation summary and recent turns."""
+        conversation = self.get(conv_id)
+        if conversation is None or not (conversation["summary"] or conversation["turns"]):
+            return message
+
+        parts = []
+        if conversation["summary"]:
+            parts.append(f"之前对话的摘要：\n{conversation['summary']}")
+        if conversation["turns"]:
+            recent = "\n".join(f"用户：{t['user']}\n助手：{t['agent']}" for t in conversation["turns"])
+            parts.append(f"最近的对话：\n{recent}")
+        parts.append(f"当前问题：{message}")
+        return "\n\n".join(parts)
+
+    def needs_compaction(self, conv_id: str) -> bool:
+        conversation = self.get(conv_id)
+        if conversation is None or len(conversation["turns"]) <= self.keep_recent_turns:
+            return False
+        return self._tokens(conversation) > self.token_budget
+
+    async def compact(self, conv_id: str, summarize: Callable[[str], Awaitable[str]]) -> None:
+        """Fold older turns into the summary once the token budget is exceeded.
+
+        Args:
+            conv_id: Conversation to compact
+            summarize: Async callable turning a transcript into a short summary.
+                If it fails, the oldest part of the transcript is simply dropped.
+        """
+        with self._lock:
+            if conv_id in self._compacting or not self.needs_compaction(conv_id):
+                return
+            self._compacting.add(conv_id)
+            conversation = self.get(conv_id)
+            older = conversation["turns"][:-self.keep_recent_turns]
+            previous_summary = conversation["summary"]
+
+        try:
+            transcript = "\n".join(f"用户：{t['user']}\n助手：{t['agent']}" for t in older)
+            if previous_summary:
+                transcript = f"已有摘要：\n{previous_summary}\n\n新的对话：\n{transcript}"
+            try:
+                summary = (await summarize(transcript)).strip()
+            except Exception as e:
+                print(f"对话摘要生成失败，改为截断: {str(e)}")
+                summary = transcript[-self.token_budget:]
+
+            with self._lock:
+                # Turns appended while summarizing stay after the compacted ones
+                conversation["turns"] = conversation["turns"][len(older):]
+                conversation["summary"] = summary
+                self.compactions += 1
+                self._save(conv_id, conversation)
+        finally:
+            with self._lock:
+                self._compacting.discard(conv_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "active_conversations": len(self._conversations),
+                "max_conversations": self.max_conversations,
+                "token_budget": self.token_budget,
+                "persistent": self._db is not None,
+                "evictions": self.evictions,
+                "compactions": self.compactions
+            }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+
+    def _tokens(self, conversation: dict) -> int:
+        return estimate_tokens(conversation["summary"]) + sum(
+            estimate_tokens(t["user"]) + estimate_tokens(t["agent"]) for t in conversation["turns"]
+        )
+
+    def _remember(self, conv_id: str, conversation: dict) -> None:
+        self._conversations[conv_id] = conversation
+        self._conversations.move_to_end(conv_id)
+        while len(self._conversations) > self.max_conversations:
+            self._conversations.popitem(last=False)
+            self.evictions += 1
+
+    def _load(self, conv_id: str) -> Optional[dict]:
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT summary, turns, updated_at FROM conversations WHERE id = ?", (conv_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"summary": row[0], "turns": json.loads(row[1]), "updated_at": row[2]}
+
+    def _save(self, conv_id: str, conversation: dict) -> None:
+        if self._db is None:
+            return
+        self._db.execute(
+            "INSERT OR REPLACE INTO conversations (id, summary, turns, updated_at) VALUES (?, ?, ?, ?)",
+            (conv_id, conversation["summary"], json.dumps(conversation["turns"], ensure_ascii=False), conversation["updated_at"])
+        )
+        self._db.commit()
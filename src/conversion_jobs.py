@@ -0,0 +1,321 @@
+import asyncio
+import multiprocessing
+import os
+import pathlib
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Optional
+
+from conversion_cache import ConversionCache
+from converters import SUPPORTED_EXTENSIONS, convert_file, warm_up
+from markdown_text import markdown_to_text
+
+
+class ConversionJob():
+    """A batch of files converted in parallel, with per-file status and a progress event log."""
+
+    def __init__(self, job_id: str, file_paths: list[str], output_format: str, output_dir: Optional[str]):
+        self.id = job_id
+        self.output_format = output_format
+        self.output_dir = output_dir
+        self.created_at = time.time()
+        self.finished_at = None
+        self.cancelled = False
+        self.files = [
+            {"path": path, "status": "pending", "output_path": None, "content": None, "error": None, "cache_hit": False, "elapsed_ms": None}
+            for path in file_paths
+        ]
+        self.events: list[dict[str, Any]] = []
+        self._tasks: list[asyncio.Task] = []
+        self._changed = asyncio.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def status(self) -> str:
+        if not self.done:
+            return "running"
+        return "cancelled" if self.cancelled else "completed"
+
+    def progress(self) -> dict:
+        counts = {"pending": 0, "done": 0, "failed": 0, "cancelled": 0}
+        for file in self.files:
+            counts[file["status"]] += 1
+        return {"total": len(self.files), **counts}
+
+    def to_dict(self, include_content: bool = True) -> dict:
+        files = self.files if include_content else [{k: v for k, v in f.items() if k != "content"} for f in self.files]
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "output_format": self.output_format,
+            "output_dir": self.output_dir,
+            "progress": self.progress(),
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "files": files
+        }
+
+    async def publish(self, event: dict) -> None:
+        async with self._changed:
+            self.events.append(event)
+            self._changed.notify_all()
+
+    async def watch(self) -> AsyncIterator[dict]:
+        """Yield every progress event from the start until the job finishes."""
+        seen = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: len(self.events) > seen or self.done)
+                new_events = self.events[seen:]
+            seen += len(new_events)
+            for event in new_events:
+                yield event
+            if self.done and seen == len(self.events):
+                return
+
+
+class ConversionJobManager():
+    """Runs batch conversion jobs on a shared process pool.
+
+    MarkItDown and unstructured are CPU-bound and hold the GIL, so each file is
+    converted in a worker process and a batch scales with the number of cores.
+    Finished jobs are kept for polling until `max_jobs` newer ones replace them.
+    With a `cache`, files whose content was converted before are not converted again.
+    With `prewarm`, every worker loads its converters when it starts and
+    `start()` launches the workers ahead of the first request.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, file_timeout: float = 300.0, max_jobs: int = 50, cache: Optional[ConversionCache] = None, prewarm: bool = False):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.file_timeout = file_timeout
+        self.max_jobs = max_jobs
+        self.cache = cache
+        self.prewarm = prewarm
+        self._executor = None
+        self._slots = None
+        self._jobs: OrderedDict[str, ConversionJob] = OrderedDict()
+
+        self.warmup_ms = None
+        self.worker_stats = None
+        self.conversions = 0
+        self._conversion_ms_total = 0.0
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: the server process runs threads (indexes, pools) that must not be forked
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=warm_up if self.prewarm else None
+            )
+        return self._executor
+
+    async def start(self) -> None:
+        """Start and warm up the worker processes if `prewarm` is enabled."""
+        if not self.prewarm:
+            return
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            # One call per worker: the pool spawns a new process while none is idle
+            results = await asyncio.gather(*[
+                loop.run_in_executor(self.executor, warm_up) for _ in range(self.max_workers)
+            ])
+        except Exception as e:
+            print(f"转换进程预热失败: {str(e)}")
+            return
+        self.warmup_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.worker_stats = results[0]
+        print(f"转换进程预热完成：{self.max_workers} 个进程，用时 {self.warmup_ms} ms")
+
+    async def convert(self, file_path: str, use_unstructured: bool = False, timeout: Optional[float] = None) -> str:
+        """Convert a single file in the process pool.
+
+        At most `max_workers` files are handed to the pool at once, so the
+        timeout only starts counting once a worker is available. A worker
+        keeps converting after a timeout or cancellation, so its slot is only
+        released once the worker has actually finished the file.
+
+        Raises:
+            TimeoutError: If the conversion takes longer than `timeout` seconds
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        loop = asyncio.get_running_loop()
+        await self._slots.acquire()
+        started = time.perf_counter()
+        executor = self.executor
+        try:
+            future = loop.run_in_executor(executor, convert_file, file_path, use_unstructured)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._release_slot)
+        try:
+            content = await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+            self.conversions += 1
+            self._conversion_ms_total += (time.perf_counter() - started) * 1000
+            return content
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"文件转换超时（{timeout} 秒）")
+        except BrokenProcessPool as e:
+            # A worker crashed (e.g. out of memory). Every file still in the broken pool
+            # fails with this error; later files get a fresh pool. The pool's futures are
+            # not cancelled, so those files are reported as failed rather than cancelled.
+            if self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False)
+            raise Exception(f"转换进程异常退出（可能内存不足）: {str(e)}")
+
+    def _release_slot(self, future: asyncio.Future) -> None:
+        self._slots.release()
+        # Nobody awaits a file that timed out or was cancelled; consume its outcome here
+        if not future.cancelled():
+            future.exception()
+
+    async def convert_cached(self, file_path: str, output_format: str = "markdown", timeout: Optional[float] = None) -> tuple[str, bool]:
+        """Convert a file to `output_format` ("markdown" or "text") through the cache.
+
+        Returns:
+            The converted content and whether it came from the cache
+        """
+        key = await asyncio.to_thread(self.cache.key, file_path, output_format) if self.cache else None
+        if key:
+            content = await asyncio.to_thread(self.cache.get, key)
+            if content is not None:
+                return content, True
+
+        content = await self.convert(file_path, timeout=timeout)
+        if output_format == "text":
+            content = markdown_to_text(content)
+        if key:
+            await asyncio.to_thread(self.cache.put, key, content)
+        return content, False
+
+    def submit(self, file_paths: list[str], output_format: str = "markdown", output_dir: Optional[str] = None) -> ConversionJob:
+        """Start converting `file_paths` in the background and return the job."""
+        job = ConversionJob(uuid.uuid4().hex, file_paths, output_format, output_dir)
+        self._jobs[job.id] = job
+        self._evict()
+
+        output_names = self._output_names(file_paths, output_format) if output_dir else {}
+        job._tasks = [asyncio.create_task(self._convert_one(job, file, output_names.get(i))) for i, file in enumerate(job.files)]
+        asyncio.create_task(self._finish(job))
+        return job
+
+    def get(self, job_id: str) -> Optional[ConversionJob]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel the files of a job that have not finished yet.
+
+        Files still waiting for a worker are dropped; files already being
+        converted run to completion in their worker but their result is discarded.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.done:
+            return False
+        job.cancelled = True
+        for task in job._tasks:
+            task.cancel()
+        return True
+
+    def stats(self) -> dict:
+        running = [job for job in self._jobs.values() if not job.done]
+        return {
+            "max_workers": self.max_workers,
+            "jobs": len(self._jobs),
+            "running_jobs": len(running),
+            "pending_files": sum(job.progress()["pending"] for job in running),
+            "prewarm": self.prewarm,
+            "warmup_ms": self.warmup_ms,
+            "worker_converter_init": self.worker_stats,
+            "conversions": self.conversions,
+            "avg_conversion_ms": round(self._conversion_ms_total / self.conversions, 1) if self.conversions else 0.0,
+            "cache": self.cache.stats() if self.cache else None
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _convert_one(self, job: ConversionJob, file: dict, output_name: Optional[str]) -> None:
+        path = pathlib.Path(file["path"])
+        started = time.perf_counter()
+        try:
+            if not path.exists():
+                raise FileNotFoundError(f"文件不存在: {file['path']}")
+            if path.suffix.lower() not in SUPPORTED_EXTENSIONS:
+                raise ValueError(f"不支持的文件类型: {path.suffix}")
+
+            content, file["cache_hit"] = await self.convert_cached(str(path), job.output_format, timeout=self.file_timeout)
+
+            if output_name:
+                output_path = pathlib.Path(job.output_dir) / output_name
+                await asyncio.to_thread(self._write_output, output_path, content)
+                file["output_path"] = str(output_path)
+            else:
+                file["content"] = content
+            file["status"] = "done"
+        except asyncio.CancelledError:
+            file["status"] = "cancelled"
+        except Exception as e:
+            file["status"] = "failed"
+            file["error"] = str(e)
+
+        file["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        await job.publish({
+            "type": "file",
+            "path": file["path"],
+            "status": file["status"],
+            "output_path": file["output_path"],
+            "error": file["error"],
+            "cache_hit": file["cache_hit"],
+            "elapsed_ms": file["elapsed_ms"],
+            "progress": job.progress()
+        })
+
+    async def _finish(self, job: ConversionJob) -> None:
+        await asyncio.gather(*job._tasks, return_exceptions=True)
+        # Tasks cancelled before they started never updated their file
+        for file in job.files:
+            if file["status"] == "pending":
+                file["status"] = "cancelled"
+        job.finished_at = time.time()
+        await job.publish({"type": "done", "status": job.status, "progress": job.progress()})
+
+    def _evict(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        while len(self._jobs) > self.max_jobs and finished:
+            del self._jobs[finished.pop(0)]
+
+    @staticmethod
+    def _output_names(file_paths: list[str], output_format: str) -> dict[int, str]:
+        """Pick a unique output file name for each input, based on its stem."""
+        extension = ".txt" if output_format == "text" else ".md"
+        names = {}
+        used = set()
+        for i, file_path in enumerate(file_paths):
+            stem = pathlib.Path(file_path).stem
+            name = f"{stem}{extension}"
+            counter = 1
+            while name in used:
+                name = f"{stem}_{counter}{extension}"
+                counter += 1
+            used.add(name)
+            names[i] = name
+        return names
+
+    @staticmethod
+    def _write_output(output_path: pathlib.Path, content: str) -> None:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(content)
@@ -0,0 +1,151 @@
+import os
+import threading
+import time
+from typing import Iterator
+
+# 支持转换的文件类型
+SUPPORTED_EXTENSIONS = {'.pdf', '.docx', '.doc', '.xlsx', '.xls', '.pptx', '.ppt', '.txt', '.md', '.html', '.htm', '.jpg', '.png'}
+
+# Converters are created once per process and shared by every call
+_markitdown = None
+_partition = None
+_lock = threading.Lock()
+_stats = {
+    "markitdown_init_ms": None,
+    "unstructured_import_ms": None,
+    "conversions": 0,
+    "conversion_ms_total": 0.0
+}
+
+
+def get_markitdown():
+    """Return the process-wide MarkItDown instance, creating it on first use."""
+    global _markitdown
+    if _markitdown is None:
+        with _lock:
+            if _markitdown is None:
+                started = time.perf_counter()
+                from markitdown import MarkItDown
+                _markitdown = MarkItDown()
+                _stats["markitdown_init_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return _markitdown
+
+
+def get_partition():
+    """Return `unstructured.partition.auto.partition`, importing it on first use."""
+    global _partition
+    if _partition is None:
+        with _lock:
+            if _partition is None:
+                started = time.perf_counter()
+                from unstructured.partition.auto import partition
+                _partition = partition
+                _stats["unstructured_import_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return _partition
+
+
+def warm_up() -> dict:
+    """Initialize every available converter now instead of on the first conversion.
+
+    Used as the initializer of conversion worker processes. Missing converters
+    are skipped.
+    """
+    try:
+        get_markitdown()
+    except ImportError:
+        pass
+    try:
+        get_partition()
+    except ImportError:
+        pass
+    return converter_stats()
+
+
+def converter_stats() -> dict:
+    with _lock:
+        conversions = _stats["conversions"]
+        return {
+            "markitdown_init_ms": _stats["markitdown_init_ms"],
+            "unstructured_import_ms": _stats["unstructured_import_ms"],
+            "conversions": conversions,
+            "avg_conversion_ms": round(_stats["conversion_ms_total"] / conversions, 1) if conversions else 0.0
+        }
+
+
+def convert_file(file_path: str, use_unstructured: bool = False) -> str:
+    """Convert a document to Markdown, falling back to unstructured if MarkItDown fails.
+
+    Module-level and argument-only so it can run in a worker process.
+    """
+    started = time.perf_counter()
+    try:
+        if use_unstructured:
+            elements = get_partition()(file_path)
+            content = "\n\n".join([str(el) for el in elements])
+        else:
+            content = get_markitdown().convert(file_path).text_content
+    except Exception as e:
+        # 如果 `markitdown` 失败，尝试 `unstructured`
+        if not use_unstructured:
+            print(f"Markitdown 转换失败: {e}，尝试使用 unstructured")
+            return convert_file(file_path, use_unstructured=True)
+        raise e
+
+    with _lock:
+        _stats["conversions"] += 1
+        _stats["conversion_ms_total"] += (time.perf_counter() - started) * 1000
+    return content
+
+
+def iter_convert(file_path: str, chunk_size: int = 64 * 1024) -> Iterator[str]:
+    """Convert a document to Markdown piece by piece.
+
+    PDFs are yielded one page at a time with pdfminer (or one unstructured
+    element at a time without it) and plain text files in chunks of whole
+    lines, so memory stays bounded by the largest page or chunk. Other formats are converted in full first and then yielded in
+    paragraph-aligned chunks. Every piece ends on a line boundary.
+    """
+    suffix = os.path.splitext(file_path)[1].lower()
+
+    if suffix == '.pdf':
+        try:
+            from pdfminer.high_level import extract_pages
+            from pdfminer.layout import LTTextContainer
+        except ImportError:
+            extract_pages = None
+        if extract_pages is not None:
+            for page in extract_pages(file_path):
+                text = "".join(element.get_text() for element in page if isinstance(element, LTTextContainer))
+                yield text.rstrip("\n") + "\n\n"
+            return
+        try:
+            partition = get_partition()
+        except ImportError:
+            partition = None
+        if partition is not None:
+            for element in partition(file_path):
+                yield f"{element}\n\n"
+            return
+
+    if suffix in ('.txt', '.md'):
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            lines = []
+            size = 0
+            for line in f:
+                lines.append(line)
+                size += len(line)
+                if size >= chunk_size:
+                    yield "".join(lines)
+                    lines = []
+                    size = 0
+            if lines:
+                yield "".join(lines)
+        return
+
+    content = convert_file(file_path)
+    start = 0
+    while start < len(content):
+        end = content.find("\n\n", start + chunk_size)
+        end = len(content) if end < 0 else end + 2
+        yield content[start:end]
+        start = end
@@ -0,0 +1,128 @@
+import re
+from typing import Iterable, Iterator
+
+# Bump when the output changes, so cached plain-text conversions are redone
+MARKDOWN_TEXT_VERSION = "3"
+
+# One alternation for every construct, so the document is scanned once. Every
+# branch starts with a literal character (block constructs with the newline
+# before them) so the regex engine can skip ahead to candidate positions
+# instead of trying each branch at every character. A fenced code block is
+# matched as a whole, so nothing inside it is treated as markup.
+_MARKDOWN_RE = re.compile(r"""
+    \n(?:
+        [ \t]*(?P<fence>`{3,}|~{3,})[^\n]*(?P<code_block>(?s:.*?))(?:\n[ \t]*(?P=fence)[^\n]*(?=\n|\Z)|\Z)
+      | (?P<rule>[ \t]*\|?[ \t]*:?-{3,}:?[ \t]*(?:\|[ \t]*:?-{3,}:?[ \t]*)*\|?[ \t]*(?=\n|\Z))
+      | [ \t]*\|(?P<row>[^\n]*)\|[ \t]*(?=\n|\Z)
+      | (?P<heading>[ \t]{0,3}\#{1,6}[ \t]+)
+      | (?P<quote>[ \t]{0,3}>[ \t]?)
+    )
+  | !\[(?P<image>[^\]\n]*)\]\([^)\n]*\)
+  | \[(?P<link>[^\]\n]*)\]\([^)\n]*\)
+  | \*\*(?P<bold>[^\n]+?)\*\*
+  | __(?P<bold_underscore>[^\n]+?)__
+  | `(?P<code>[^`\n]+)`
+  | \*(?P<italic>[^*\n]+)\*
+  | _(?<!\w_)(?P<italic_underscore>[^_\n]+)_(?!\w)
+  | \\(?P<escaped>[\\`*_{}\[\]()\#+\-.!|>])
+""", re.VERBOSE)
+
+# Text that may contain further inline markup; checked before scanning it again
+_INLINE_MARKUP_RE = re.compile(r"[*_`\[\\!]")
+_CELL_SEPARATOR_RE = re.compile(r"[ \t]*\|[ \t]*")
+# A line that opens (or, with the same fence, closes) a fenced code block
+_FENCE_LINE_RE = re.compile(r"[ \t]*(`{3,}|~{3,})")
+
+# The callback runs once per match, so it dispatches on the group index
+# rather than the group name
+_GROUPS = _MARKDOWN_RE.groupindex
+_NESTED = frozenset(_GROUPS[name] for name in ("link", "bold", "bold_underscore", "italic", "italic_underscore"))
+_DROPPED = frozenset((_GROUPS["rule"],))
+_LINE_START = frozenset((_GROUPS["heading"], _GROUPS["quote"]))
+_ROW = _GROUPS["row"]
+
+
+def _replace(match: re.Match) -> str:
+    group = match.lastindex
+    if group in _NESTED:
+        # Emphasis and link text may contain further inline markup
+        text = match[group]
+        return _MARKDOWN_RE.sub(_replace, text) if _INLINE_MARKUP_RE.search(text) else text
+    if group in _LINE_START:
+        return "\n"
+    if group in _DROPPED:
+        # Drop the whole line together with the newline before it
+        return ""
+    if group == _ROW:
+        row = _CELL_SEPARATOR_RE.sub("\t", match[group].strip())
+        return "\n" + (_MARKDOWN_RE.sub(_replace, row) if _INLINE_MARKUP_RE.search(row) else row)
+    # Inline code, image alt text, escaped characters and the body of a fenced
+    # code block (which keeps the newline that ended the opening fence line)
+    return match[group]
+
+
+def markdown_to_text(markdown: str) -> str:
+    """Convert Markdown to plain text in a single pass.
+
+    Removes heading and blockquote markers, code fences, table rules and
+    horizontal rules; keeps the text of emphasis, inline code, links and
+    image alt text; turns table rows into tab-separated cells and unescapes
+    backslash-escaped characters. The contents of fenced code blocks are
+    kept unchanged.
+    """
+    # A leading newline lets block constructs on the first line match too
+    text = _MARKDOWN_RE.sub(_replace, "\n" + markdown)
+    return text[1:] if text.startswith("\n") else text
+
+
+def iter_markdown_to_text(chunks: Iterable[str]) -> Iterator[str]:
+    """Convert a stream of Markdown chunks to plain text.
+
+    The joined output is identical to `markdown_to_text` on the whole
+    document. Every construct except a fenced code block ends at a line
+    break, so each chunk is converted up to the last line break outside a
+    fenced block and the rest is carried over to the next chunk. Only an
+    unfinished line or an open code block is ever held back.
+    """
+    # Like markdown_to_text, start with a newline so the first line can match
+    # block constructs; every carried-over remainder starts with a newline too
+    pending = "\n"
+    line_start = 0
+    fence = None
+    started = False
+
+    def convert(segment: str) -> str:
+        nonlocal started
+        text = _MARKDOWN_RE.sub(_replace, segment)
+        if not started and text:
+            started = True
+            return text[1:] if text.startswith("\n") else text
+        return text
+
+    for chunk in chunks:
+        pending += chunk
+        cut = 0
+        while True:
+            line_end = pending.find("\n", line_start + 1)
+            if line_end < 0:
+                break
+            line = pending[line_start + 1:line_end]
+            if fence is None:
+                match = _FENCE_LINE_RE.match(line)
+                if match:
+                    fence = match.group(1)
+            elif line.lstrip(" \t").startswith(fence):
+                fence = None
+            if fence is None:
+                cut = line_end
+            line_start = line_end
+        if cut:
+            text = convert(pending[:cut])
+            pending = pending[cut:]
+            line_start -= cut
+            if text:
+                yield text
+
+    text = convert(pending)
+    if text:
+        yield text
@@ -1,7 +1,82 @@
+import asyncio
+import httpx
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import urllib.parse
 import os
-from typing import Any
+import time
+from typing import Any, Optional
+
+from vault_cache import VaultContentCache, parse_mtime
+from vault_changeset import VaultChangeset
+
+LINE_EDIT_OPERATIONS = ('insert', 'delete', 'replace')
+
+# Obsidian does not index hidden files, so creating and removing this placeholder
+# makes the folder without a spurious note event
+FOLDER_PLACEHOLDER = '.folder_placeholder'
+
+def apply_line_edits_to_text(content: str, edits: list[dict]) -> str:
+    """Apply a batch of line edits to a note's text.
+
+    Every edit is a dict with:
+        operation: "insert", "delete" or "replace"
+        line: First line of the edit (1-based). "insert" puts the new lines
+            before this line; use the line count + 1 to append at the end.
+        end_line: Last line (inclusive) removed by "delete" or "replace";
+            defaults to `line`
+        content: Text inserted by "insert" or "replace" (may span several lines)
+
+    Line numbers refer to the note before any edit is applied, so edits can
+    be listed in any order. Overlapping delete/replace ranges, and inserts
+    inside such a range, are rejected.
+
+    Raises:
+        Exception: If an edit is malformed, out of range or overlaps another
+    """
+    lines = content.split('\n')
+    line_count = len(lines)
+    ranges = []
+    inserts = []
+
+    for index, edit in enumerate(edits):
+        operation = edit.get('operation')
+        if operation not in LINE_EDIT_OPERATIONS:
+            raise Exception(f"Unsupported operation: {operation}. Use one of {', '.join(LINE_EDIT_OPERATIONS)}.")
+        start = int(edit.get('line', 0))
+        if operation == 'insert':
+            if not 1 <= start <= line_count + 1:
+                raise Exception(f"Line number {start} is out of range (file has {line_count} lines)")
+            inserts.append((start, index))
+            continue
+        end = int(edit.get('end_line') or start)
+        if not 1 <= start <= end <= line_count:
+            raise Exception(f"Line range {start}-{end} is out of range (file has {line_count} lines)")
+        ranges.append((start, end, index))
+
+    ranges.sort()
+    for (_, previous_end, _), (start, end, _) in zip(ranges, ranges[1:]):
+        if start <= previous_end:
+            raise Exception(f"Line range {start}-{end} overlaps another edit")
+    for position, _ in inserts:
+        if any(start < position <= end for start, end, _ in ranges):
+            raise Exception(f"Insert at line {position} falls inside an edited range")
+
+    # Apply from the bottom up so the line numbers of the remaining edits stay valid.
+    # At the same line the range edit goes first and inserts keep their listed order.
+    operations = [(start, 1, index, end) for start, end, index in ranges]
+    operations += [(position, 0, index, None) for position, index in inserts]
+    for start, _, index, end in sorted(operations, key=lambda op: op[:3], reverse=True):
+        edit = edits[index]
+        new_lines = [] if edit['operation'] == 'delete' else str(edit.get('content', '')).split('\n')
+        if end is None:
+            lines[start - 1:start - 1] = new_lines
+        else:
+            lines[start - 1:end] = new_lines
+
+    return '\n'.join(lines)
 
 class Obsidian():
     def __init__(
@@ -11,6 +86,11 @@ class Obsidian():
             host: str = str(os.getenv('OBSIDIAN_HOST', '127.0.0.1')),
             port: int = int(os.getenv('OBSIDIAN_PORT', '27124')),
             verify_ssl: bool = False,
+            pool_size: int = 10,
+            keep_alive: bool = True,
+            max_retries: int = 3,
+            backoff_factor: float = 0.3,
+            cache: Optional[VaultContentCache] = None,
         ):
         self.api_key = api_key
         
@@ -23,6 +103,61 @@ class Obsidian():
         self.port = port
         self.verify_ssl = verify_ssl
         self.timeout = (3, 6)
+        self.cache = cache
+        self._change_listeners = []
+        self.session = self._create_session(pool_size, keep_alive, max_retries, backoff_factor)
+
+    def _create_session(self, pool_size: int, keep_alive: bool, max_retries: int, backoff_factor: float) -> requests.Session:
+        """Create the pooled HTTP session shared by every method of this client.
+
+        Connections to the Local REST API are kept alive and reused between calls,
+        and transient failures (connection errors, 429/5xx) are retried with
+        exponential backoff. Only idempotent methods are retried on status codes.
+        """
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 502, 503, 504),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.verify = self.verify_ssl
+        if not keep_alive:
+            session.headers['Connection'] = 'close'
+        return session
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+
+    def get_connection_stats(self) -> dict:
+        """Return counters for connections opened vs. reused by the session.
+
+        Returns:
+            Dict with 'requests', 'connections_opened' and 'connections_reused'
+        """
+        requests_made = 0
+        connections_opened = 0
+        for adapter in set(self.session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                requests_made += pool.num_requests
+                connections_opened += pool.num_connections
+
+        return {
+            'requests': requests_made,
+            'connections_opened': connections_opened,
+            'connections_reused': max(requests_made - connections_opened, 0)
+        }
 
     def get_base_url(self) -> str:
         return f'{self.protocol}://{self.host}:{self.port}'
@@ -44,11 +179,39 @@ class Obsidian():
         except requests.exceptions.RequestException as e:
             raise Exception(f"Request failed: {str(e)}")
 
+    def add_change_listener(self, listener) -> None:
+        """Register a callback invoked with the path of every write or delete made through this client."""
+        self._change_listeners.append(listener)
+
+    def _after_write(self, filepath: str) -> None:
+        """Drop cached state for a path that was just written or deleted."""
+        if self.cache is not None:
+            self.cache.invalidate(filepath)
+        for listener in self._change_listeners:
+            listener(filepath)
+
+    def _revalidate_cache(self) -> None:
+        """Drop cached notes that were modified outside this client.
+
+        Runs at most once per `cache.revalidate_interval` with a single DQL
+        query, so cache hits in between cost no network calls.
+        """
+        since = self.cache.begin_revalidation()
+        if since is None:
+            return
+
+        started_at = time.time()
+        try:
+            modified = self.get_files_modified_since(since)
+        except Exception:
+            modified = None
+        self.cache.end_revalidation(modified, started_at)
+
     def list_files_in_vault(self) -> Any:
         url = f"{self.get_base_url()}/vault/"
         
         def call_fn():
-            response = requests.get(url, headers=self._get_headers(), verify=self.verify_ssl, timeout=self.timeout)
+            response = self.session.get(url, headers=self._get_headers(), verify=self.verify_ssl, timeout=self.timeout)
             response.raise_for_status()
             
             return response.json()['files']
@@ -60,21 +223,126 @@ class Obsidian():
         url = f"{self.get_base_url()}/vault/{dirpath}/"
         
         def call_fn():
-            response = requests.get(url, headers=self._get_headers(), verify=self.verify_ssl, timeout=self.timeout)
+            response = self.session.get(url, headers=self._get_headers(), verify=self.verify_ssl, timeout=self.timeout)
             response.raise_for_status()
             
             return response.json()['files']
 
         return self._safe_call(call_fn)
 
+    def walk_files(self, dirpath: str = "") -> list[str]:
+        """List every file below a directory, descending into subfolders.
+
+        Args:
+            dirpath: Directory to start from (vault root if empty)
+
+        Returns:
+            List of file paths relative to the vault root
+        """
+        files = []
+        pending = [dirpath.strip('/')]
+
+        while pending:
+            current = pending.pop()
+            entries = self.list_files_in_dir(current) if current else self.list_files_in_vault()
+            for name in entries:
+                path = f"{current}/{name}" if current else name
+                if name.endswith('/'):
+                    pending.append(path.rstrip('/'))
+                else:
+                    files.append(path)
+
+        return files
+
+    def list_file_stats(self, dirpath: str = "", max_concurrency: int = 8) -> dict[str, tuple[Optional[int], Optional[int]]]:
+        """List every file below a directory together with its size and mtime.
+
+        Directories are listed level by level, each level concurrently, and
+        the sizes and mtimes of all notes come from a single Dataview query.
+        Dataview only knows Markdown notes, so other files have (None, None).
+
+        Args:
+            dirpath: Directory to start from (vault root if empty)
+            max_concurrency: Maximum number of directory listings in flight
+
+        Returns:
+            Mapping of file path to (size in bytes, mtime in epoch milliseconds)
+        """
+        files = []
+        level = [dirpath.strip('/')]
+
+        def list_dir(current: str) -> list[str]:
+            return self.list_files_in_dir(current) if current else self.list_files_in_vault()
+
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+            while level:
+                next_level = []
+                for current, entries in zip(level, executor.map(list_dir, level)):
+                    for name in entries:
+                        path = f"{current}/{name}" if current else name
+                        if name.endswith('/'):
+                            next_level.append(path.rstrip('/'))
+                        else:
+                            files.append(path)
+                level = next_level
+
+        try:
+            stats = self._query_note_stats()
+        except Exception:
+            # Without Dataview the listing is still complete, just without stats
+            stats = {}
+        return {path: stats.get(path, (None, None)) for path in files}
+
+    def _query_note_stats(self) -> dict[str, tuple[Optional[int], Optional[int]]]:
+        url = f"{self.get_base_url()}/search/"
+        headers = self._get_headers() | {
+            'Content-Type': 'application/vnd.olrapi.dataview.dql+txt'
+        }
+
+        def call_fn():
+            response = self.session.post(
+                url,
+                headers=headers,
+                data="TABLE file.size, file.mtime".encode('utf-8'),
+                verify=self.verify_ssl,
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            stats = {}
+            for item in response.json():
+                result = item.get('result') or {}
+                size = result.get('file.size')
+                stats[item['filename']] = (int(size) if isinstance(size, (int, float)) else None, parse_mtime(result.get('file.mtime')))
+            return stats
+
+        return self._safe_call(call_fn)
+
     def get_file_contents(self, filepath: str) -> Any:
         url = f"{self.get_base_url()}/vault/{filepath}"
+        use_cache = self.cache is not None and filepath.endswith('.md')
+
+        if use_cache:
+            self._revalidate_cache()
+            cached = self.cache.get(filepath)
+            if cached is not None:
+                return cached[0]
     
         def call_fn():
-            response = requests.get(url, headers=self._get_headers(), verify=self.verify_ssl, timeout=self.timeout)
+            if not use_cache:
+                response = self.session.get(url, headers=self._get_headers(), verify=self.verify_ssl, timeout=self.timeout)
+                response.raise_for_status()
+                
+                return response.text
+
+            # Fetch the note with its stat so the cached entry knows its mtime
+            headers = self._get_headers() | {'Accept': 'application/vnd.olrapi.note+json'}
+            response = self.session.get(url, headers=headers, verify=self.verify_ssl, timeout=self.timeout)
             response.raise_for_status()
-            
-            return response.text
+
+            note = response.json()
+            content = note.get('content', '')
+            self.cache.put(filepath, content, parse_mtime(note.get('stat', {}).get('mtime')))
+            return content
 
         return self._safe_call(call_fn)
     
@@ -107,7 +375,7 @@ class Obsidian():
         }
         
         def call_fn():
-            response = requests.post(url, headers=self._get_headers(), params=params, verify=self.verify_ssl, timeout=self.timeout)
+            response = self.session.post(url, headers=self._get_headers(), params=params, verify=self.verify_ssl, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
 
@@ -117,7 +385,7 @@ class Obsidian():
         url = f"{self.get_base_url()}/vault/{filepath}"
         
         def call_fn():
-            response = requests.post(
+            response = self.session.post(
                 url, 
                 headers=self._get_headers() | {'Content-Type': 'text/markdown'}, 
                 data=content,
@@ -127,7 +395,10 @@ class Obsidian():
             response.raise_for_status()
             return None
 
-        return self._safe_call(call_fn)
+        try:
+            return self._safe_call(call_fn)
+        finally:
+            self._after_write(filepath)
     
     def patch_content(self, filepath: str, operation: str, target_type: str, target: str, content: str) -> Any:
         url = f"{self.get_base_url()}/vault/{filepath}"
@@ -140,17 +411,20 @@ class Obsidian():
         }
         
         def call_fn():
-            response = requests.patch(url, headers=headers, data=content, verify=self.verify_ssl, timeout=self.timeout)
+            response = self.session.patch(url, headers=headers, data=content, verify=self.verify_ssl, timeout=self.timeout)
             response.raise_for_status()
             return None
 
-        return self._safe_call(call_fn)
+        try:
+            return self._safe_call(call_fn)
+        finally:
+            self._after_write(filepath)
 
     def put_content(self, filepath: str, content: str) -> Any:
         url = f"{self.get_base_url()}/vault/{filepath}"
         
         def call_fn():
-            response = requests.put(
+            response = self.session.put(
                 url, 
                 headers=self._get_headers() | {'Content-Type': 'text/markdown'}, 
                 data=content,
@@ -160,7 +434,10 @@ class Obsidian():
             response.raise_for_status()
             return None
 
-        return self._safe_call(call_fn)
+        try:
+            return self._safe_call(call_fn)
+        finally:
+            self._after_write(filepath)
     
     def delete_file(self, filepath: str) -> Any:
         """Delete a file or directory from the vault.
@@ -174,11 +451,14 @@ class Obsidian():
         url = f"{self.get_base_url()}/vault/{filepath}"
         
         def call_fn():
-            response = requests.delete(url, headers=self._get_headers(), verify=self.verify_ssl, timeout=self.timeout)
+            response = self.session.delete(url, headers=self._get_headers(), verify=self.verify_ssl, timeout=self.timeout)
             response.raise_for_status()
             return None
             
-        return self._safe_call(call_fn)
+        try:
+            return self._safe_call(call_fn)
+        finally:
+            self._after_write(filepath)
     
     def search_json(self, query: dict) -> Any:
         url = f"{self.get_base_url()}/search/"
@@ -188,7 +468,7 @@ class Obsidian():
         }
         
         def call_fn():
-            response = requests.post(url, headers=headers, json=query, verify=self.verify_ssl, timeout=self.timeout)
+            response = self.session.post(url, headers=headers, json=query, verify=self.verify_ssl, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
 
@@ -212,7 +492,7 @@ class Obsidian():
             headers = self._get_headers()
             if type == "metadata":
                 headers['Accept'] = 'application/vnd.olrapi.note+json'
-            response = requests.get(url, headers=headers, verify=self.verify_ssl, timeout=self.timeout)
+            response = self.session.get(url, headers=headers, verify=self.verify_ssl, timeout=self.timeout)
             response.raise_for_status()
             
             return response.text
@@ -237,7 +517,7 @@ class Obsidian():
         }
         
         def call_fn():
-            response = requests.get(
+            response = self.session.get(
                 url, 
                 headers=self._get_headers(), 
                 params=params,
@@ -250,31 +530,66 @@ class Obsidian():
 
         return self._safe_call(call_fn)
     
+    def folder_exists(self, folder_path: str) -> bool:
+        try:
+            self.list_files_in_dir(folder_path.strip('/'))
+            return True
+        except Exception as e:
+            if '40400' in str(e):
+                return False
+            raise
+
+    def stat_file(self, filepath: str) -> Optional[tuple[Optional[int], Optional[int]]]:
+        """Check a single file with one listing of its parent folder.
+
+        The Local REST API reports no size or mtime in listings, so an
+        existing file is (None, None).
+
+        Returns:
+            (size, mtime) of the file, or None if it is not a file (missing or a folder)
+        """
+        parent, _, name = filepath.strip('/').rpartition('/')
+        try:
+            entries = self.list_files_in_dir(parent) if parent else self.list_files_in_vault()
+        except Exception as e:
+            if '40400' in str(e):
+                return None
+            raise
+        return (None, None) if name in entries else None
+
     def create_folder(self, folder_path: str) -> Any:
-        """Create a folder by creating a placeholder file and then deleting it.
-        
+        """Create a folder, including any missing parent folders.
+
+        The Local REST API has no call for creating folders, but writing a
+        file creates all of its parents. A folder that already exists costs a
+        single listing request; otherwise a hidden placeholder is written and
+        removed again.
+
         Args:
             folder_path: Path to the folder to create (relative to vault root)
-            
+
         Returns:
             None on success
         """
-        # Create a temporary file in the folder to ensure the folder exists
-        temp_file_path = f"{folder_path}/.temp_placeholder.md"
+        folder_path = folder_path.strip('/')
+        if self.folder_exists(folder_path):
+            return None
+
+        temp_file_path = f"{folder_path}/{FOLDER_PLACEHOLDER}"
         
         def call_fn():
-            # Create the temporary file
-            response = requests.put(
+            # Create the placeholder, which creates the folder and its parents
+            response = self.session.put(
                 f"{self.get_base_url()}/vault/{temp_file_path}",
-                headers=self._get_headers() | {'Content-Type': 'text/markdown'},
-                data="# Temporary file to create folder structure",
+                headers=self._get_headers() | {'Content-Type': 'application/octet-stream'},
+                data=b"",
                 verify=self.verify_ssl,
                 timeout=self.timeout
             )
             response.raise_for_status()
             
-            # Delete the temporary file, leaving the folder
-            delete_response = requests.delete(
+            # Delete the placeholder, leaving the folder
+            delete_response = self.session.delete(
                 f"{self.get_base_url()}/vault/{temp_file_path}",
                 headers=self._get_headers(),
                 verify=self.verify_ssl,
@@ -285,17 +600,133 @@ class Obsidian():
             
         return self._safe_call(call_fn)
 
-    def delete_folder(self, folder_path: str) -> Any:
+    def _read_bytes(self, filepath: str) -> bytes:
+        url = f"{self.get_base_url()}/vault/{filepath}"
+
+        def call_fn():
+            response = self.session.get(url, headers=self._get_headers(), verify=self.verify_ssl, timeout=self.timeout)
+            response.raise_for_status()
+            return response.content
+
+        return self._safe_call(call_fn)
+
+    def _write_bytes(self, filepath: str, data: bytes) -> None:
+        url = f"{self.get_base_url()}/vault/{filepath}"
+        content_type = 'text/markdown' if filepath.endswith('.md') else 'application/octet-stream'
+
+        def call_fn():
+            response = self.session.put(
+                url,
+                headers=self._get_headers() | {'Content-Type': content_type},
+                data=data,
+                verify=self.verify_ssl,
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            return None
+
+        try:
+            return self._safe_call(call_fn)
+        finally:
+            self._after_write(filepath)
+
+    def _run_per_file(self, func, paths: list[str], max_concurrency: int) -> dict:
+        """Run `func(path)` for every path concurrently and summarize the outcome."""
+        def run(path: str) -> Optional[dict]:
+            try:
+                func(path)
+                return None
+            except Exception as e:
+                return {'path': path, 'error': str(e)}
+
+        failed = []
+        if paths:
+            with ThreadPoolExecutor(max_workers=min(max(1, max_concurrency), len(paths))) as executor:
+                failed = [error for error in executor.map(run, paths) if error is not None]
+        return {'files': len(paths), 'succeeded': len(paths) - len(failed), 'failed': failed}
+
+    def _check_folder_target(self, source: str, destination: str) -> None:
+        if not source or not destination:
+            raise Exception("Source and destination folders are required")
+        if destination == source or destination.startswith(source + '/'):
+            raise Exception(f"Cannot copy or move {source} into itself")
+
+    def copy_folder(self, source: str, destination: str, max_concurrency: int = 8) -> dict:
+        """Copy every file below a folder, several files at a time.
+
+        Existing files at the destination are overwritten. Empty subfolders
+        are not copied.
+
+        Args:
+            source: Folder to copy (relative to vault root)
+            destination: Folder to copy into; created if missing
+            max_concurrency: Maximum number of files copied at the same time
+
+        Returns:
+            Dict with 'files', 'succeeded' and 'failed' (list of {'path', 'error'})
+        """
+        source, destination = source.strip('/'), destination.strip('/')
+        self._check_folder_target(source, destination)
+
+        def copy(path: str) -> None:
+            self._write_bytes(destination + path[len(source):], self._read_bytes(path))
+
+        return self._run_per_file(copy, self.walk_files(source), max_concurrency)
+
+    def move_folder(self, source: str, destination: str, max_concurrency: int = 8) -> dict:
+        """Move every file below a folder, several files at a time.
+
+        Each file is copied and then deleted; the source folder is removed
+        once all of its files have moved. Files that failed stay in place.
+
+        Args:
+            source: Folder to move (relative to vault root)
+            destination: New location of the folder
+            max_concurrency: Maximum number of files moved at the same time
+
+        Returns:
+            Dict with 'files', 'succeeded' and 'failed' (list of {'path', 'error'})
+        """
+        source, destination = source.strip('/'), destination.strip('/')
+        self._check_folder_target(source, destination)
+
+        def move(path: str) -> None:
+            self._write_bytes(destination + path[len(source):], self._read_bytes(path))
+            self.delete_file(path)
+
+        summary = self._run_per_file(move, self.walk_files(source), max_concurrency)
+        if not summary['failed']:
+            self._remove_empty_folder(source)
+        return summary
+
+    def delete_folder(self, folder_path: str, max_concurrency: int = 8) -> dict:
         """Delete a folder and all its contents.
-        
+
+        Files are deleted several at a time, then the folder itself.
+
         Args:
             folder_path: Path to the folder to delete (relative to vault root)
-            
+            max_concurrency: Maximum number of files deleted at the same time
+
         Returns:
-            None on success
+            Dict with 'files', 'succeeded' and 'failed' (list of {'path', 'error'})
         """
-        # Note: The delete_file method already supports deleting directories
-        return self.delete_file(folder_path)
+        folder_path = folder_path.strip('/')
+        if not folder_path:
+            raise Exception("Refusing to delete the vault root")
+
+        summary = self._run_per_file(self.delete_file, self.walk_files(folder_path), max_concurrency)
+        if not summary['failed']:
+            self._remove_empty_folder(folder_path)
+        return summary
+
+    def _remove_empty_folder(self, folder_path: str) -> None:
+        try:
+            self.delete_file(folder_path)
+        except Exception as e:
+            # Obsidian may already have dropped the folder along with its last file
+            if '40400' not in str(e):
+                raise
 
     def patch_content_at_line(self, filepath: str, line_number: int, content: str, operation: str = "insert") -> Any:
         """Insert or delete content at a specific line number.
@@ -313,20 +744,105 @@ class Obsidian():
             # Use line-based targeting for insertion
             return self.patch_content(filepath, "append", "line", str(line_number), content)
         elif operation == "delete":
-            # For deletion, we need to get the current content and reconstruct it
-            current_content = self.get_file_contents(filepath)
-            lines = current_content.split('\n')
-            
-            # Remove the specified line (convert to 0-based index)
-            if 1 <= line_number <= len(lines):
-                lines.pop(line_number - 1)
-                new_content = '\n'.join(lines)
-                return self.put_content(filepath, new_content)
-            else:
-                raise Exception(f"Line number {line_number} is out of range (file has {len(lines)} lines)")
+            self.apply_line_edits(filepath, [{'operation': 'delete', 'line': line_number}])
+            return None
         else:
             raise Exception(f"Unsupported operation: {operation}. Use 'insert' or 'delete'.")
 
+    def apply_line_edits(self, filepath: str, edits: list[dict], expected_mtime: Optional[int] = None) -> dict:
+        """Apply many line edits to a note in a single read-modify-write.
+
+        The note is fetched once together with its mtime, edited with
+        `apply_line_edits_to_text` and uploaded once. The Local REST API has
+        no conditional PUT, so `expected_mtime` is checked against the fetched
+        note: it catches edits made since the caller last read the note, but
+        not a write landing between this method's GET and PUT.
+
+        Args:
+            filepath: Path to the note
+            edits: Line edits, see `apply_line_edits_to_text`
+            expected_mtime: mtime (epoch ms) the note must still have, or None
+
+        Returns:
+            Dict with 'edits' (number applied), 'lines' (new line count) and
+            'mtime' (new mtime in epoch ms, None if the backend does not report it)
+        """
+        url = f"{self.get_base_url()}/vault/{filepath}"
+
+        def call_fn():
+            headers = self._get_headers() | {'Accept': 'application/vnd.olrapi.note+json'}
+            response = self.session.get(url, headers=headers, verify=self.verify_ssl, timeout=self.timeout)
+            response.raise_for_status()
+
+            note = response.json()
+            mtime = parse_mtime(note.get('stat', {}).get('mtime'))
+            if expected_mtime is not None and mtime != expected_mtime:
+                raise Exception(f"Error 41200: {filepath} was modified (mtime {mtime}, expected {expected_mtime})")
+            new_content = apply_line_edits_to_text(note.get('content', ''), edits)
+
+            response = self.session.put(
+                url,
+                headers=self._get_headers() | {'Content-Type': 'text/markdown'},
+                data=new_content.encode('utf-8'),
+                verify=self.verify_ssl,
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            return {'edits': len(edits), 'lines': new_content.count('\n') + 1, 'mtime': None}
+
+        try:
+            return self._safe_call(call_fn)
+        finally:
+            self._after_write(filepath)
+
+    def changeset(self, max_concurrency: int = 8) -> VaultChangeset:
+        """Start a batch of writes that is applied concurrently and can be rolled back.
+
+        Args:
+            max_concurrency: Maximum number of paths written at the same time
+
+        Returns:
+            An empty `VaultChangeset` bound to this client
+        """
+        return VaultChangeset(self, max_concurrency)
+
+    def get_files_modified_since(self, since: float) -> dict[str, Optional[int]]:
+        """Get the files modified after a point in time using `file.mtime`.
+
+        Args:
+            since: Unix timestamp in seconds
+
+        Returns:
+            Mapping of file path to its mtime in epoch milliseconds (None if unknown)
+        """
+        # A little slack covers clock differences between this process and Obsidian
+        seconds = max(int(time.time() - since) + 2, 1)
+        dql_query = "\n".join([
+            "TABLE file.mtime",
+            f"WHERE file.mtime >= date(now) - dur({seconds} seconds)"
+        ])
+
+        url = f"{self.get_base_url()}/search/"
+        headers = self._get_headers() | {
+            'Content-Type': 'application/vnd.olrapi.dataview.dql+txt'
+        }
+
+        def call_fn():
+            response = self.session.post(
+                url,
+                headers=headers,
+                data=dql_query.encode('utf-8'),
+                verify=self.verify_ssl,
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            return {
+                item['filename']: parse_mtime((item.get('result') or {}).get('file.mtime'))
+                for item in response.json()
+            }
+
+        return self._safe_call(call_fn)
+
     def get_recent_changes(self, limit: int = 10, days: int = 90) -> Any:
         """Get recently modified files in the vault.
         
@@ -355,7 +871,7 @@ class Obsidian():
         }
         
         def call_fn():
-            response = requests.post(
+            response = self.session.post(
                 url,
                 headers=headers,
                 data=dql_query.encode('utf-8'),
@@ -365,4 +881,675 @@ class Obsidian():
             response.raise_for_status()
             return response.json()
 
-        return self._safe_call(call_fn)
\ No newline at end of file
+        return self._safe_call(call_fn)
+
+
+class AsyncObsidian():
+    """Async counterpart of `Obsidian` backed by a pooled `httpx.AsyncClient`.
+
+    Exposes the same method surface as `Obsidian` (as coroutines), except for
+    `changeset`: `VaultChangeset` drives a synchronous client from threads.
+    Batch reads are issued concurrently, bounded by `batch_concurrency`.
+    """
+
+    def __init__(
+            self,
+            api_key: str,
+            protocol: str = os.getenv('OBSIDIAN_PROTOCOL', 'https').lower(),
+            host: str = str(os.getenv('OBSIDIAN_HOST', '127.0.0.1')),
+            port: int = int(os.getenv('OBSIDIAN_PORT', '27124')),
+            verify_ssl: bool = False,
+            pool_size: int = 10,
+            keep_alive: bool = True,
+            max_retries: int = 3,
+            batch_concurrency: int = 8,
+            cache: Optional[VaultContentCache] = None,
+        ):
+        self.api_key = api_key
+
+        if protocol == 'http':
+            self.protocol = 'http'
+        else:
+            self.protocol = 'https'
+
+        self.host = host
+        self.port = port
+        self.verify_ssl = verify_ssl
+        self.timeout = httpx.Timeout(6.0, connect=3.0)
+        self.batch_concurrency = max(1, batch_concurrency)
+        self.cache = cache
+        self._change_listeners = []
+
+        limits = httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size if keep_alive else 0
+        )
+        # httpx only retries failed connection attempts, never requests that reached the server
+        transport = httpx.AsyncHTTPTransport(verify=verify_ssl, limits=limits, retries=max_retries)
+        self.client = httpx.AsyncClient(transport=transport, timeout=self.timeout)
+
+    async def aclose(self) -> None:
+        """Close all pooled connections."""
+        await self.client.aclose()
+
+    def get_base_url(self) -> str:
+        return f'{self.protocol}://{self.host}:{self.port}'
+
+    def _get_headers(self) -> dict:
+        headers = {
+            'Authorization': f'Bearer {self.api_key}'
+        }
+        return headers
+
+    async def _safe_call(self, f) -> Any:
+        try:
+            return await f()
+        except httpx.HTTPStatusError as e:
+            try:
+                error_data = e.response.json() if e.response.content else {}
+            except ValueError:
+                error_data = {}
+            code = error_data.get('errorCode', -1)
+            message = error_data.get('message', '<unknown>')
+            raise Exception(f"Error {code}: {message}")
+        except httpx.HTTPError as e:
+            raise Exception(f"Request failed: {str(e)}")
+
+    def add_change_listener(self, listener) -> None:
+        """Register a callback invoked with the path of every write or delete made through this client."""
+        self._change_listeners.append(listener)
+
+    def _after_write(self, filepath: str) -> None:
+        """Drop cached state for a path that was just written or deleted."""
+        if self.cache is not None:
+            self.cache.invalidate(filepath)
+        for listener in self._change_listeners:
+            listener(filepath)
+
+    async def _revalidate_cache(self) -> None:
+        """Drop cached notes that were modified outside this client."""
+        since = self.cache.begin_revalidation()
+        if since is None:
+            return
+
+        started_at = time.time()
+        try:
+            modified = await self.get_files_modified_since(since)
+        except Exception:
+            modified = None
+        self.cache.end_revalidation(modified, started_at)
+
+    async def list_files_in_vault(self) -> Any:
+        url = f"{self.get_base_url()}/vault/"
+
+        async def call_fn():
+            response = await self.client.get(url, headers=self._get_headers())
+            response.raise_for_status()
+
+            return response.json()['files']
+
+        return await self._safe_call(call_fn)
+
+    async def list_files_in_dir(self, dirpath: str) -> Any:
+        url = f"{self.get_base_url()}/vault/{dirpath}/"
+
+        async def call_fn():
+            response = await self.client.get(url, headers=self._get_headers())
+            response.raise_for_status()
+
+            return response.json()['files']
+
+        return await self._safe_call(call_fn)
+
+    async def walk_files(self, dirpath: str = "") -> list[str]:
+        """List every file below a directory, descending into subfolders.
+
+        See `Obsidian.walk_files`.
+        """
+        files = []
+        pending = [dirpath.strip('/')]
+
+        while pending:
+            current = pending.pop()
+            entries = await self.list_files_in_dir(current) if current else await self.list_files_in_vault()
+            for name in entries:
+                path = f"{current}/{name}" if current else name
+                if name.endswith('/'):
+                    pending.append(path.rstrip('/'))
+                else:
+                    files.append(path)
+
+        return files
+
+    async def list_file_stats(self, dirpath: str = "", max_concurrency: int = 8) -> dict[str, tuple[Optional[int], Optional[int]]]:
+        """List every file below a directory together with its size and mtime.
+
+        See `Obsidian.list_file_stats`.
+        """
+        files = []
+        level = [dirpath.strip('/')]
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def list_dir(current: str) -> list[str]:
+            async with semaphore:
+                return await self.list_files_in_dir(current) if current else await self.list_files_in_vault()
+
+        while level:
+            next_level = []
+            listings = await asyncio.gather(*(list_dir(current) for current in level))
+            for current, entries in zip(level, listings):
+                for name in entries:
+                    path = f"{current}/{name}" if current else name
+                    if name.endswith('/'):
+                        next_level.append(path.rstrip('/'))
+                    else:
+                        files.append(path)
+            level = next_level
+
+        try:
+            stats = await self._query_note_stats()
+        except Exception:
+            # Without Dataview the listing is still complete, just without stats
+            stats = {}
+        return {path: stats.get(path, (None, None)) for path in files}
+
+    async def _query_note_stats(self) -> dict[str, tuple[Optional[int], Optional[int]]]:
+        url = f"{self.get_base_url()}/search/"
+        headers = self._get_headers() | {
+            'Content-Type': 'application/vnd.olrapi.dataview.dql+txt'
+        }
+
+        async def call_fn():
+            response = await self.client.post(url, headers=headers, content="TABLE file.size, file.mtime".encode('utf-8'))
+            response.raise_for_status()
+            stats = {}
+            for item in response.json():
+                result = item.get('result') or {}
+                size = result.get('file.size')
+                stats[item['filename']] = (int(size) if isinstance(size, (int, float)) else None, parse_mtime(result.get('file.mtime')))
+            return stats
+
+        return await self._safe_call(call_fn)
+
+    async def get_file_contents(self, filepath: str) -> Any:
+        url = f"{self.get_base_url()}/vault/{filepath}"
+        use_cache = self.cache is not None and filepath.endswith('.md')
+
+        if use_cache:
+            await self._revalidate_cache()
+            cached = self.cache.get(filepath)
+            if cached is not None:
+                return cached[0]
+
+        async def call_fn():
+            if not use_cache:
+                response = await self.client.get(url, headers=self._get_headers())
+                response.raise_for_status()
+
+                return response.text
+
+            headers = self._get_headers() | {'Accept': 'application/vnd.olrapi.note+json'}
+            response = await self.client.get(url, headers=headers)
+            response.raise_for_status()
+
+            note = response.json()
+            content = note.get('content', '')
+            self.cache.put(filepath, content, parse_mtime(note.get('stat', {}).get('mtime')))
+            return content
+
+        return await self._safe_call(call_fn)
+
+    async def get_batch_file_contents(self, filepaths: list[str]) -> str:
+        """Get contents of multiple files concurrently and concatenate them with headers.
+
+        At most `batch_concurrency` requests are in flight at once. The output
+        keeps the order of `filepaths` and matches `Obsidian.get_batch_file_contents`.
+
+        Args:
+            filepaths: List of file paths to read
+
+        Returns:
+            String containing all file contents with headers
+        """
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+
+        async def read_one(filepath: str) -> str:
+            async with semaphore:
+                try:
+                    content = await self.get_file_contents(filepath)
+                    return f"# {filepath}\n\n{content}\n\n---\n\n"
+                except Exception as e:
+                    # Add error message but continue processing other files
+                    return f"# {filepath}\n\nError reading file: {str(e)}\n\n---\n\n"
+
+        result = await asyncio.gather(*(read_one(filepath) for filepath in filepaths))
+        return "".join(result)
+
+    async def search(self, query: str, context_length: int = 100) -> Any:
+        url = f"{self.get_base_url()}/search/simple/"
+        params = {
+            'query': query,
+            'contextLength': context_length
+        }
+
+        async def call_fn():
+            response = await self.client.post(url, headers=self._get_headers(), params=params)
+            response.raise_for_status()
+            return response.json()
+
+        return await self._safe_call(call_fn)
+
+    async def append_content(self, filepath: str, content: str) -> Any:
+        url = f"{self.get_base_url()}/vault/{filepath}"
+
+        async def call_fn():
+            response = await self.client.post(
+                url,
+                headers=self._get_headers() | {'Content-Type': 'text/markdown'},
+                content=content
+            )
+            response.raise_for_status()
+            return None
+
+        try:
+            return await self._safe_call(call_fn)
+        finally:
+            self._after_write(filepath)
+
+    async def patch_content(self, filepath: str, operation: str, target_type: str, target: str, content: str) -> Any:
+        url = f"{self.get_base_url()}/vault/{filepath}"
+
+        headers = self._get_headers() | {
+            'Content-Type': 'text/markdown',
+            'Operation': operation,
+            'Target-Type': target_type,
+            'Target': urllib.parse.quote(target)
+        }
+
+        async def call_fn():
+            response = await self.client.patch(url, headers=headers, content=content)
+            response.raise_for_status()
+            return None
+
+        try:
+            return await self._safe_call(call_fn)
+        finally:
+            self._after_write(filepath)
+
+    async def put_content(self, filepath: str, content: str) -> Any:
+        url = f"{self.get_base_url()}/vault/{filepath}"
+
+        async def call_fn():
+            response = await self.client.put(
+                url,
+                headers=self._get_headers() | {'Content-Type': 'text/markdown'},
+                content=content
+            )
+            response.raise_for_status()
+            return None
+
+        try:
+            return await self._safe_call(call_fn)
+        finally:
+            self._after_write(filepath)
+
+    async def delete_file(self, filepath: str) -> Any:
+        """Delete a file or directory from the vault.
+
+        Args:
+            filepath: Path to the file to delete (relative to vault root)
+
+        Returns:
+            None on success
+        """
+        url = f"{self.get_base_url()}/vault/{filepath}"
+
+        async def call_fn():
+            response = await self.client.delete(url, headers=self._get_headers())
+            response.raise_for_status()
+            return None
+
+        try:
+            return await self._safe_call(call_fn)
+        finally:
+            self._after_write(filepath)
+
+    async def search_json(self, query: dict) -> Any:
+        url = f"{self.get_base_url()}/search/"
+
+        headers = self._get_headers() | {
+            'Content-Type': 'application/vnd.olrapi.jsonlogic+json'
+        }
+
+        async def call_fn():
+            response = await self.client.post(url, headers=headers, json=query)
+            response.raise_for_status()
+            return response.json()
+
+        return await self._safe_call(call_fn)
+
+    async def get_periodic_note(self, period: str, type: str = "content") -> Any:
+        """Get current periodic note for the specified period.
+
+        Args:
+            period: The period type (daily, weekly, monthly, quarterly, yearly)
+            type: Type of the data to get ('content' or 'metadata').
+
+        Returns:
+            Content of the periodic note
+        """
+        url = f"{self.get_base_url()}/periodic/{period}/"
+
+        async def call_fn():
+            headers = self._get_headers()
+            if type == "metadata":
+                headers['Accept'] = 'application/vnd.olrapi.note+json'
+            response = await self.client.get(url, headers=headers)
+            response.raise_for_status()
+
+            return response.text
+
+        return await self._safe_call(call_fn)
+
+    async def get_recent_periodic_notes(self, period: str, limit: int = 5, include_content: bool = False) -> Any:
+        """Get most recent periodic notes for the specified period type.
+
+        Args:
+            period: The period type (daily, weekly, monthly, quarterly, yearly)
+            limit: Maximum number of notes to return (default: 5)
+            include_content: Whether to include note content (default: False)
+
+        Returns:
+            List of recent periodic notes
+        """
+        url = f"{self.get_base_url()}/periodic/{period}/recent"
+        params = {
+            "limit": limit,
+            "includeContent": include_content
+        }
+
+        async def call_fn():
+            response = await self.client.get(url, headers=self._get_headers(), params=params)
+            response.raise_for_status()
+
+            return response.json()
+
+        return await self._safe_call(call_fn)
+
+    async def folder_exists(self, folder_path: str) -> bool:
+        try:
+            await self.list_files_in_dir(folder_path.strip('/'))
+            return True
+        except Exception as e:
+            if '40400' in str(e):
+                return False
+            raise
+
+    async def stat_file(self, filepath: str) -> Optional[tuple[Optional[int], Optional[int]]]:
+        """Check a single file with one listing of its parent folder.
+
+        See `Obsidian.stat_file`.
+        """
+        parent, _, name = filepath.strip('/').rpartition('/')
+        try:
+            entries = await self.list_files_in_dir(parent) if parent else await self.list_files_in_vault()
+        except Exception as e:
+            if '40400' in str(e):
+                return None
+            raise
+        return (None, None) if name in entries else None
+
+    async def create_folder(self, folder_path: str) -> Any:
+        """Create a folder, including any missing parent folders.
+
+        See `Obsidian.create_folder`.
+
+        Args:
+            folder_path: Path to the folder to create (relative to vault root)
+
+        Returns:
+            None on success
+        """
+        folder_path = folder_path.strip('/')
+        if await self.folder_exists(folder_path):
+            return None
+
+        temp_file_path = f"{folder_path}/{FOLDER_PLACEHOLDER}"
+
+        async def call_fn():
+            response = await self.client.put(
+                f"{self.get_base_url()}/vault/{temp_file_path}",
+                headers=self._get_headers() | {'Content-Type': 'application/octet-stream'},
+                content=b""
+            )
+            response.raise_for_status()
+
+            delete_response = await self.client.delete(
+                f"{self.get_base_url()}/vault/{temp_file_path}",
+                headers=self._get_headers()
+            )
+            delete_response.raise_for_status()
+            return None
+
+        return await self._safe_call(call_fn)
+
+    async def _read_bytes(self, filepath: str) -> bytes:
+        url = f"{self.get_base_url()}/vault/{filepath}"
+
+        async def call_fn():
+            response = await self.client.get(url, headers=self._get_headers())
+            response.raise_for_status()
+            return response.content
+
+        return await self._safe_call(call_fn)
+
+    async def _write_bytes(self, filepath: str, data: bytes) -> None:
+        url = f"{self.get_base_url()}/vault/{filepath}"
+        content_type = 'text/markdown' if filepath.endswith('.md') else 'application/octet-stream'
+
+        async def call_fn():
+            response = await self.client.put(url, headers=self._get_headers() | {'Content-Type': content_type}, content=data)
+            response.raise_for_status()
+            return None
+
+        try:
+            return await self._safe_call(call_fn)
+        finally:
+            self._after_write(filepath)
+
+    async def _run_per_file(self, func, paths: list[str], max_concurrency: int) -> dict:
+        """Await `func(path)` for every path concurrently and summarize the outcome."""
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run(path: str) -> Optional[dict]:
+            async with semaphore:
+                try:
+                    await func(path)
+                    return None
+                except Exception as e:
+                    return {'path': path, 'error': str(e)}
+
+        failed = [error for error in await asyncio.gather(*(run(path) for path in paths)) if error is not None]
+        return {'files': len(paths), 'succeeded': len(paths) - len(failed), 'failed': failed}
+
+    def _check_folder_target(self, source: str, destination: str) -> None:
+        if not source or not destination:
+            raise Exception("Source and destination folders are required")
+        if destination == source or destination.startswith(source + '/'):
+            raise Exception(f"Cannot copy or move {source} into itself")
+
+    async def copy_folder(self, source: str, destination: str, max_concurrency: int = 8) -> dict:
+        """Copy every file below a folder, several files at a time.
+
+        See `Obsidian.copy_folder`.
+
+        Returns:
+            Dict with 'files', 'succeeded' and 'failed' (list of {'path', 'error'})
+        """
+        source, destination = source.strip('/'), destination.strip('/')
+        self._check_folder_target(source, destination)
+
+        async def copy(path: str) -> None:
+            await self._write_bytes(destination + path[len(source):], await self._read_bytes(path))
+
+        return await self._run_per_file(copy, await self.walk_files(source), max_concurrency)
+
+    async def move_folder(self, source: str, destination: str, max_concurrency: int = 8) -> dict:
+        """Move every file below a folder, several files at a time.
+
+        See `Obsidian.move_folder`.
+
+        Returns:
+            Dict with 'files', 'succeeded' and 'failed' (list of {'path', 'error'})
+        """
+        source, destination = source.strip('/'), destination.strip('/')
+        self._check_folder_target(source, destination)
+
+        async def move(path: str) -> None:
+            await self._write_bytes(destination + path[len(source):], await self._read_bytes(path))
+            await self.delete_file(path)
+
+        summary = await self._run_per_file(move, await self.walk_files(source), max_concurrency)
+        if not summary['failed']:
+            await self._remove_empty_folder(source)
+        return summary
+
+    async def delete_folder(self, folder_path: str, max_concurrency: int = 8) -> dict:
+        """Delete a folder and all its contents.
+
+        Files are deleted several at a time, then the folder itself.
+
+        Args:
+            folder_path: Path to the folder to delete (relative to vault root)
+            max_concurrency: Maximum number of files deleted at the same time
+
+        Returns:
+            Dict with 'files', 'succeeded' and 'failed' (list of {'path', 'error'})
+        """
+        folder_path = folder_path.strip('/')
+        if not folder_path:
+            raise Exception("Refusing to delete the vault root")
+
+        summary = await self._run_per_file(self.delete_file, await self.walk_files(folder_path), max_concurrency)
+        if not summary['failed']:
+            await self._remove_empty_folder(folder_path)
+        return summary
+
+    async def _remove_empty_folder(self, folder_path: str) -> None:
+        try:
+            await self.delete_file(folder_path)
+        except Exception as e:
+            # Obsidian may already have dropped the folder along with its last file
+            if '40400' not in str(e):
+                raise
+
+    async def patch_content_at_line(self, filepath: str, line_number: int, content: str, operation: str = "insert") -> Any:
+        """Insert or delete content at a specific line number.
+
+        Args:
+            filepath: Path to the file
+            line_number: Line number (1-based)
+            content: Content to insert (ignored for delete operation)
+            operation: "insert" to add content, "delete" to remove lines
+
+        Returns:
+            None on success
+        """
+        if operation == "insert":
+            return await self.patch_content(filepath, "append", "line", str(line_number), content)
+        elif operation == "delete":
+            await self.apply_line_edits(filepath, [{'operation': 'delete', 'line': line_number}])
+            return None
+        else:
+            raise Exception(f"Unsupported operation: {operation}. Use 'insert' or 'delete'.")
+
+    async def apply_line_edits(self, filepath: str, edits: list[dict], expected_mtime: Optional[int] = None) -> dict:
+        """Apply many line edits to a note in a single read-modify-write.
+
+        See `Obsidian.apply_line_edits`.
+        """
+        url = f"{self.get_base_url()}/vault/{filepath}"
+
+        async def call_fn():
+            headers = self._get_headers() | {'Accept': 'application/vnd.olrapi.note+json'}
+            response = await self.client.get(url, headers=headers)
+            response.raise_for_status()
+
+            note = response.json()
+            mtime = parse_mtime(note.get('stat', {}).get('mtime'))
+            if expected_mtime is not None and mtime != expected_mtime:
+                raise Exception(f"Error 41200: {filepath} was modified (mtime {mtime}, expected {expected_mtime})")
+            new_content = apply_line_edits_to_text(note.get('content', ''), edits)
+
+            response = await self.client.put(
+                url,
+                headers=self._get_headers() | {'Content-Type': 'text/markdown'},
+                content=new_content.encode('utf-8')
+            )
+            response.raise_for_status()
+            return {'edits': len(edits), 'lines': new_content.count('\n') + 1, 'mtime': None}
+
+        try:
+            return await self._safe_call(call_fn)
+        finally:
+            self._after_write(filepath)
+
+    async def get_files_modified_since(self, since: float) -> dict[str, Optional[int]]:
+        """Get the files modified after a point in time using `file.mtime`.
+
+        Args:
+            since: Unix timestamp in seconds
+
+        Returns:
+            Mapping of file path to its mtime in epoch milliseconds (None if unknown)
+        """
+        seconds = max(int(time.time() - since) + 2, 1)
+        dql_query = "\n".join([
+            "TABLE file.mtime",
+            f"WHERE file.mtime >= date(now) - dur({seconds} seconds)"
+        ])
+
+        url = f"{self.get_base_url()}/search/"
+        headers = self._get_headers() | {
+            'Content-Type': 'application/vnd.olrapi.dataview.dql+txt'
+        }
+
+        async def call_fn():
+            response = await self.client.post(url, headers=headers, content=dql_query.encode('utf-8'))
+            response.raise_for_status()
+            return {
+                item['filename']: parse_mtime((item.get('result') or {}).get('file.mtime'))
+                for item in response.json()
+            }
+
+        return await self._safe_call(call_fn)
+
+    async def get_recent_changes(self, limit: int = 10, days: int = 90) -> Any:
+        """Get recently modified files in the vault.
+
+        Args:
+            limit: Maximum number of files to return (default: 10)
+            days: Only include files modified within this many days (default: 90)
+
+        Returns:
+            List of recently modified files with metadata
+        """
+        query_lines = [
+            "TABLE file.mtime",
+            f"WHERE file.mtime >= date(today) - dur({days} days)",
+            "SORT file.mtime DESC",
+            f"LIMIT {limit}"
+        ]
+        dql_query = "\n".join(query_lines)
+
+        url = f"{self.get_base_url()}/search/"
+        headers = self._get_headers() | {
+            'Content-Type': 'application/vnd.olrapi.dataview.dql+txt'
+        }
+
+        async def call_fn():
+            response = await self.client.post(url, headers=headers, content=dql_query.encode('utf-8'))
+            response.raise_for_status()
+            return response.json()
+
+        return await self._safe_call(call_fn)
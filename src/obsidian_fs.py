@@ -0,0 +1,406 @@
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+from typing import Any, Optional
+
+from obsidian import Obsidian, apply_line_edits_to_text
+
+
+class FileSystemObsidian(Obsidian):
+    """Obsidian client that reads and writes the vault directory directly.
+
+    Meant for running the API server on the same machine as the vault. File
+    operations bypass the Local REST API entirely; features that need
+    Obsidian itself (search, Dataview queries, periodic notes and heading/block
+    patches) are still served by the REST API through the parent class.
+    """
+
+    def __init__(self, vault_path: str, api_key: str, mmap_threshold: int = 1024 * 1024, **kwargs):
+        super().__init__(api_key, **kwargs)
+        self.vault_path = os.path.realpath(vault_path)
+        self.mmap_threshold = mmap_threshold
+        # Serializes read-modify-write edits made through this client
+        self._edit_lock = threading.Lock()
+
+        if not os.path.isdir(self.vault_path):
+            raise Exception(f"Vault directory does not exist: {vault_path}")
+
+    def _resolve(self, path: str) -> str:
+        """Map a vault-relative path to an absolute path inside the vault."""
+        full_path = os.path.realpath(os.path.join(self.vault_path, path.strip('/')))
+        if os.path.commonpath([self.vault_path, full_path]) != self.vault_path:
+            raise Exception(f"Path is outside the vault: {path}")
+        return full_path
+
+    def _safe_fs_call(self, f) -> Any:
+        try:
+            return f()
+        except FileNotFoundError as e:
+            raise Exception(f"Error 40400: File not found: {e.filename}")
+        except OSError as e:
+            raise Exception(f"Filesystem operation failed: {str(e)}")
+
+    def _list_dir(self, full_path: str) -> list[str]:
+        files = []
+        with os.scandir(full_path) as entries:
+            for entry in entries:
+                # Hidden entries such as .obsidian and .trash are not part of the vault listing
+                if entry.name.startswith('.'):
+                    continue
+                # Symlinked folders are not descended into, matching walk_files
+                files.append(f"{entry.name}/" if entry.is_dir(follow_symlinks=False) else entry.name)
+        return sorted(files)
+
+    def _read_text(self, full_path: str, size: int) -> str:
+        try:
+            with open(full_path, 'rb') as f:
+                if size < self.mmap_threshold:
+                    return f.read().decode('utf-8')
+                # Large notes are decoded straight from the mapped pages
+                try:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:
+                    # Emptied since it was stat'ed; an empty file cannot be mapped
+                    return f.read().decode('utf-8')
+                with mapped, memoryview(mapped) as view:
+                    return str(view, 'utf-8')
+        except UnicodeDecodeError as e:
+            rel_path = os.path.relpath(full_path, self.vault_path).replace(os.sep, '/')
+            raise Exception(f"Error 41500: {rel_path} is not UTF-8 text ({e.reason} at byte {e.start})")
+
+    def _write_text(self, full_path: str, content: str) -> None:
+        self._write_atomic(full_path, content.encode('utf-8'))
+
+    def _write_atomic(self, full_path: str, data: bytes) -> None:
+        """Write a file atomically so Obsidian never sees a partial note."""
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _revalidate_cache(self) -> None:
+        # Reads stat the file themselves, so no vault-wide check is needed
+        return None
+
+    def list_files_in_vault(self) -> Any:
+        return self._safe_fs_call(lambda: self._list_dir(self.vault_path))
+
+    def list_files_in_dir(self, dirpath: str) -> Any:
+        return self._safe_fs_call(lambda: self._list_dir(self._resolve(dirpath)))
+
+    def walk_files(self, dirpath: str = "") -> list[str]:
+        """List every file below a directory, descending into subfolders.
+
+        Args:
+            dirpath: Directory to start from (vault root if empty)
+
+        Returns:
+            List of file paths relative to the vault root
+        """
+        files = []
+
+        def walk(full_path: str, rel_path: str):
+            with os.scandir(full_path) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    entry_path = f"{rel_path}{entry.name}"
+                    if entry.is_dir(follow_symlinks=False):
+                        walk(entry.path, f"{entry_path}/")
+                    else:
+                        files.append(entry_path)
+
+        start = dirpath.strip('/')
+        self._safe_fs_call(lambda: walk(self._resolve(start), f"{start}/" if start else ""))
+        return files
+
+    def list_file_stats(self, dirpath: str = "", max_concurrency: int = 8) -> dict[str, tuple[Optional[int], Optional[int]]]:
+        """List every file below a directory together with its size and mtime.
+
+        Args:
+            dirpath: Directory to start from (vault root if empty)
+            max_concurrency: Unused; the directory entries already carry their stat
+
+        Returns:
+            Mapping of file path to (size in bytes, mtime in epoch milliseconds)
+        """
+        stats = {}
+
+        def walk(full_path: str, rel_path: str):
+            with os.scandir(full_path) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    entry_path = f"{rel_path}{entry.name}"
+                    if entry.is_dir(follow_symlinks=False):
+                        walk(entry.path, f"{entry_path}/")
+                    else:
+                        stat = entry.stat()
+                        stats[entry_path] = (stat.st_size, stat.st_mtime_ns // 1_000_000)
+
+        start = dirpath.strip('/')
+        self._safe_fs_call(lambda: walk(self._resolve(start), f"{start}/" if start else ""))
+        return stats
+
+    def stat_file(self, filepath: str) -> Optional[tuple[Optional[int], Optional[int]]]:
+        """Return (size, mtime) of a file, or None if it is missing or a folder."""
+        full_path = self._resolve(filepath)
+        if not os.path.isfile(full_path):
+            return None
+        stat = self._safe_fs_call(lambda: os.stat(full_path))
+        return stat.st_size, stat.st_mtime_ns // 1_000_000
+
+    def get_file_contents(self, filepath: str) -> Any:
+        full_path = self._resolve(filepath)
+
+        def call_fn():
+            stat = os.stat(full_path)
+            mtime = stat.st_mtime_ns // 1_000_000
+            if self.cache is not None:
+                cached = self.cache.get(filepath, mtime)
+                if cached is not None:
+                    return cached[0]
+
+            content = self._read_text(full_path, stat.st_size)
+            if self.cache is not None:
+                self.cache.put(filepath, content, mtime)
+            return content
+
+        return self._safe_fs_call(call_fn)
+
+    def append_content(self, filepath: str, content: str) -> Any:
+        full_path = self._resolve(filepath)
+
+        def call_fn():
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, 'ab') as f:
+                f.write(content.encode('utf-8'))
+            return None
+
+        try:
+            return self._safe_fs_call(call_fn)
+        finally:
+            self._after_write(filepath)
+
+    def put_content(self, filepath: str, content: str) -> Any:
+        full_path = self._resolve(filepath)
+
+        try:
+            return self._safe_fs_call(lambda: self._write_text(full_path, content))
+        finally:
+            self._after_write(filepath)
+
+    def apply_line_edits(self, filepath: str, edits: list[dict], expected_mtime: Optional[int] = None) -> dict:
+        """Apply many line edits to a note in a single read-modify-write.
+
+        The note's mtime is checked against `expected_mtime` before reading
+        and checked again right before the edited note replaces it, so an edit
+        made in between (e.g. in Obsidian) fails the call instead of being
+        overwritten.
+
+        Args:
+            filepath: Path to the note
+            edits: Line edits, see `apply_line_edits_to_text`
+            expected_mtime: mtime (epoch ms) the note must still have, or None
+
+        Returns:
+            Dict with 'edits' (number applied), 'lines' (new line count) and
+            'mtime' (new mtime in epoch ms)
+        """
+        full_path = self._resolve(filepath)
+
+        def check_mtime(expected: Optional[int]) -> os.stat_result:
+            stat = os.stat(full_path)
+            mtime = stat.st_mtime_ns // 1_000_000
+            if expected is not None and mtime != expected:
+                raise Exception(f"Error 41200: {filepath} was modified (mtime {mtime}, expected {expected})")
+            return stat
+
+        def call_fn():
+            with self._edit_lock:
+                stat = check_mtime(expected_mtime)
+                new_content = apply_line_edits_to_text(self._read_text(full_path, stat.st_size), edits)
+                check_mtime(stat.st_mtime_ns // 1_000_000)
+                self._write_text(full_path, new_content)
+                mtime = os.stat(full_path).st_mtime_ns // 1_000_000
+            return {'edits': len(edits), 'lines': new_content.count('\n') + 1, 'mtime': mtime}
+
+        try:
+            return self._safe_fs_call(call_fn)
+        finally:
+            self._after_write(filepath)
+
+    def delete_file(self, filepath: str) -> Any:
+        """Delete a file or directory from the vault.
+
+        Args:
+            filepath: Path to the file to delete (relative to vault root)
+
+        Returns:
+            None on success
+        """
+        full_path = self._resolve(filepath)
+        if full_path == self.vault_path:
+            raise Exception("Refusing to delete the vault root")
+
+        def call_fn():
+            if os.path.isdir(full_path):
+                shutil.rmtree(full_path)
+            else:
+                os.remove(full_path)
+            return None
+
+        try:
+            return self._safe_fs_call(call_fn)
+        finally:
+            self._after_write(filepath)
+
+    def create_folder(self, folder_path: str) -> Any:
+        """Create a folder, including any missing parent folders.
+
+        Args:
+            folder_path: Path to the folder to create (relative to vault root)
+
+        Returns:
+            None on success
+        """
+        full_path = self._resolve(folder_path)
+        return self._safe_fs_call(lambda: os.makedirs(full_path, exist_ok=True))
+
+    def _read_bytes(self, filepath: str) -> bytes:
+        full_path = self._resolve(filepath)
+
+        def call_fn():
+            with open(full_path, 'rb') as f:
+                return f.read()
+
+        return self._safe_fs_call(call_fn)
+
+    def _write_bytes(self, filepath: str, data: bytes) -> None:
+        full_path = self._resolve(filepath)
+        try:
+            return self._safe_fs_call(lambda: self._write_atomic(full_path, data))
+        finally:
+            self._after_write(filepath)
+
+    def _resolve_folder_pair(self, source: str, destination: str) -> tuple[str, str, str, str]:
+        source, destination = source.strip('/'), destination.strip('/')
+        self._check_folder_target(source, destination)
+        source_path, destination_path = self._resolve(source), self._resolve(destination)
+        if not os.path.isdir(source_path):
+            raise Exception(f"Error 40400: Folder not found: {source}")
+        return source, destination, source_path, destination_path
+
+    def _summary(self, files: int, errors: list) -> dict:
+        # shutil.Error carries (source, destination, reason) for every file it could not handle
+        failed = [{'path': os.path.relpath(error[0], self.vault_path), 'error': str(error[2])} for error in errors]
+        return {'files': files, 'succeeded': files - len(failed), 'failed': failed}
+
+    def copy_folder(self, source: str, destination: str, max_concurrency: int = 8) -> dict:
+        """Copy a folder with `shutil.copytree`, merging into an existing destination.
+
+        Args:
+            source: Folder to copy (relative to vault root)
+            destination: Folder to copy into; created if missing
+            max_concurrency: Unused; the copy runs in a single call
+
+        Returns:
+            Dict with 'files', 'succeeded' and 'failed' (list of {'path', 'error'})
+        """
+        source, destination, source_path, destination_path = self._resolve_folder_pair(source, destination)
+        files = len(self.walk_files(source))
+
+        def call_fn():
+            try:
+                shutil.copytree(source_path, destination_path, dirs_exist_ok=True)
+                return []
+            except shutil.Error as e:
+                return e.args[0]
+
+        try:
+            return self._summary(files, self._safe_fs_call(call_fn))
+        finally:
+            self._after_write(destination)
+
+    def move_folder(self, source: str, destination: str, max_concurrency: int = 8) -> dict:
+        """Move a folder with a single rename, or merge it into an existing destination.
+
+        Args:
+            source: Folder to move (relative to vault root)
+            destination: New location of the folder
+            max_concurrency: Unused; the move runs in a single call
+
+        Returns:
+            Dict with 'files', 'succeeded' and 'failed' (list of {'path', 'error'})
+        """
+        source, destination, source_path, destination_path = self._resolve_folder_pair(source, destination)
+        files = len(self.walk_files(source))
+
+        def call_fn():
+            if not os.path.exists(destination_path):
+                os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+                os.rename(source_path, destination_path)
+                return []
+            try:
+                shutil.copytree(source_path, destination_path, dirs_exist_ok=True)
+            except shutil.Error as e:
+                return e.args[0]
+            shutil.rmtree(source_path)
+            return []
+
+        try:
+            return self._summary(files, self._safe_fs_call(call_fn))
+        finally:
+            self._after_write(source)
+            self._after_write(destination)
+
+    def delete_folder(self, folder_path: str, max_concurrency: int = 8) -> dict:
+        """Delete a folder and all its contents with `shutil.rmtree`.
+
+        Args:
+            folder_path: Path to the folder to delete (relative to vault root)
+            max_concurrency: Unused; the delete runs in a single call
+
+        Returns:
+            Dict with 'files', 'succeeded' and 'failed' (list of {'path', 'error'})
+        """
+        files = len(self.walk_files(folder_path))
+        self.delete_file(folder_path)
+        return {'files': files, 'succeeded': files, 'failed': []}
+
+    def get_files_modified_since(self, since: float) -> dict[str, Optional[int]]:
+        """Get the Markdown files modified after a point in time.
+
+        Args:
+            since: Unix timestamp in seconds
+
+        Returns:
+            Mapping of file path to its mtime in epoch milliseconds
+        """
+        since_ns = int(since * 1_000_000_000)
+        modified = {}
+
+        def walk(full_path: str, rel_path: str):
+            with os.scandir(full_path) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    entry_path = f"{rel_path}{entry.name}"
+                    if entry.is_dir(follow_symlinks=False):
+                        walk(entry.path, f"{entry_path}/")
+                    elif entry.name.endswith('.md'):
+                        mtime_ns = entry.stat().st_mtime_ns
+                        if mtime_ns >= since_ns:
+                            modified[entry_path] = mtime_ns // 1_000_000
+
+        self._safe_fs_call(lambda: walk(self.vault_path, ""))
+        return modified
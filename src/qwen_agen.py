@@ -1,10 +1,14 @@
 from dotenv import load_dotenv
 import os
+import hashlib
+import threading
+from collections import OrderedDict
 load_dotenv()
 
 # 导入各种LLM
 from langchain_ollama import ChatOllama
-from langchain.agents import initialize_agent, AgentType
+from langchain.agents import initialize_agent, AgentType, AgentExecutor, create_tool_calling_agent
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.tools import Tool
 from pydantic import BaseModel, Field
 import requests
@@ -25,8 +29,78 @@ async def get_tool():
 # 4) 初始化 LLM（支持多种提供商）
 ##########################################
 
+# LLM 客户端和已编译 Agent 的注册表：相同配置直接复用，切换回之前用过的模型无需重新创建
+LLM_REGISTRY_SIZE = int(os.getenv("LLM_REGISTRY_SIZE", "8"))
+_llm_registry = OrderedDict()
+_agent_registry = OrderedDict()
+_http_clients = {}
+_registry_lock = threading.RLock()
+_registry_counters = {"llm_hits": 0, "llm_misses": 0, "agent_hits": 0, "agent_misses": 0}
+
+def llm_config_key(provider: str, model: str, api_key: str = "", api_base: str = "") -> tuple:
+    """LLM 配置的注册表键，API Key 只保存哈希"""
+    key_hash = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+    return (provider, model, api_base or "", key_hash)
+
+def get_http_clients(base_url: str):
+    """按服务地址共享 httpx 连接池，同一服务下的不同模型和 Key 复用已建立的连接"""
+    import httpx
+    with _registry_lock:
+        if base_url not in _http_clients:
+            _http_clients[base_url] = (httpx.Client(), httpx.AsyncClient())
+        return _http_clients[base_url]
+
 def get_llm(provider: str, model: str, api_key: str = "", api_base: str = ""):
-    """根据配置获取LLM实例"""
+    """根据配置获取LLM实例，相同配置返回注册表中已创建的实例"""
+    key = llm_config_key(provider, model, api_key, api_base)
+    with _registry_lock:
+        llm = _llm_registry.get(key)
+        if llm is not None:
+            _llm_registry.move_to_end(key)
+            _registry_counters["llm_hits"] += 1
+            return llm
+        _registry_counters["llm_misses"] += 1
+        llm = create_llm(provider, model, api_key, api_base)
+        _llm_registry[key] = llm
+        while len(_llm_registry) > LLM_REGISTRY_SIZE:
+            _llm_registry.popitem(last=False)
+        return llm
+
+def get_registered_agent(tool_list, llm_config, agent_mode: str = "react"):
+    """获取（必要时创建）指定配置、模式和工具集的 Agent，重复切换配置时直接复用"""
+    key = (
+        llm_config_key(llm_config.provider, llm_config.model, llm_config.api_key, llm_config.api_base),
+        agent_mode,
+        tuple(id(tool) for tool in tool_list)
+    )
+    with _registry_lock:
+        agent = _agent_registry.get(key)
+        if agent is not None:
+            _agent_registry.move_to_end(key)
+            _registry_counters["agent_hits"] += 1
+            return agent
+        _registry_counters["agent_misses"] += 1
+        if agent_mode == "tool_calling":
+            agent = get_tool_calling_agent_with_config(tool_list, llm_config)
+        else:
+            agent = get_agent_with_config(tool_list, llm_config)
+        _agent_registry[key] = agent
+        while len(_agent_registry) > LLM_REGISTRY_SIZE:
+            _agent_registry.popitem(last=False)
+        return agent
+
+def registry_stats() -> dict:
+    with _registry_lock:
+        return {
+            **_registry_counters,
+            "llms": len(_llm_registry),
+            "agents": len(_agent_registry),
+            "http_pools": len(_http_clients),
+            "max_size": LLM_REGISTRY_SIZE
+        }
+
+def create_llm(provider: str, model: str, api_key: str = "", api_base: str = ""):
+    """根据配置创建新的LLM实例"""
     if provider == "ollama":
         return ChatOllama(
             model=model,
@@ -35,19 +109,27 @@ def get_llm(provider: str, model: str, api_key: str = "", api_base: str = ""):
         )
     elif provider == "openai":
         from langchain_openai import ChatOpenAI
+        base_url = api_base or "https://api.openai.com/v1"
+        http_client, http_async_client = get_http_clients(base_url)
         return ChatOpenAI(
             model=model,
             api_key=api_key,
-            base_url=api_base or "https://api.openai.com/v1",
+            base_url=base_url,
             temperature=0,
+            http_client=http_client,
+            http_async_client=http_async_client,
         )
     elif provider == "deepseek":
         from langchain_openai import ChatOpenAI
+        base_url = api_base or "https://api.deepseek.com"
+        http_client, http_async_client = get_http_clients(base_url)
         return ChatOpenAI(
             model=model,
             api_key=api_key,
-            base_url=api_base or "https://api.deepseek.com",
+            base_url=base_url,
             temperature=0,
+            http_client=http_client,
+            http_async_client=http_async_client,
         )
     elif provider == "gemini":
         from langchain_google_genai import ChatGoogleGenerativeAI
@@ -58,11 +140,15 @@ def get_llm(provider: str, model: str, api_key: str = "", api_base: str = ""):
         )
     elif provider == "qwen":
         from langchain_openai import ChatOpenAI
+        base_url = api_base or "https://dashscope.aliyuncs.com/compatible-mode/v1"
+        http_client, http_async_client = get_http_clients(base_url)
         return ChatOpenAI(
             model=model,
             api_key=api_key,
-            base_url=api_base or "https://dashscope.aliyuncs.com/compatible-mode/v1",
+            base_url=base_url,
             temperature=0,
+            http_client=http_client,
+            http_async_client=http_async_client,
         )
     else:
         raise ValueError(f"不支持的LLM提供商: {provider}")
@@ -110,6 +196,49 @@ def get_agent_with_config(tool_list, llm_config):
 # 5) 初始化 Agent（支持 Function Calling）
 ##########################################
 
+# auto 模式下默认使用原生工具调用的提供商；Ollama 是否支持取决于具体模型，需显式指定 tool_calling
+TOOL_CALLING_PROVIDERS = {"openai", "deepseek", "qwen", "gemini"}
+
+TOOL_CALLING_SYSTEM_PROMPT = (
+    "你是 Obsidian 笔记助手，可以调用工具读取、搜索和修改用户的保险库。"
+    "互不依赖的工具调用请在同一轮中一次性发出，它们会被并行执行。"
+)
+
+def resolve_agent_mode(agent_mode: str, provider: str) -> str:
+    """把 auto 解析为具体的 Agent 模式（react 或 tool_calling）"""
+    if agent_mode == "auto":
+        return "tool_calling" if provider in TOOL_CALLING_PROVIDERS else "react"
+    if agent_mode not in ("react", "tool_calling"):
+        raise ValueError(f"不支持的 Agent 模式: {agent_mode}")
+    return agent_mode
+
+def get_tool_calling_agent_with_config(tool_list, llm_config):
+    """使用原生工具调用（function calling）初始化 Agent
+    
+    直接传入带 args_schema 的 StructuredTool，模型一轮中发出的多个工具调用
+    在异步执行（ainvoke / astream_events）时会并发运行。
+    """
+    llm = get_llm(
+        provider=llm_config.provider,
+        model=llm_config.model,
+        api_key=llm_config.api_key,
+        api_base=llm_config.api_base
+    )
+
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", TOOL_CALLING_SYSTEM_PROMPT),
+        ("human", "{input}"),
+        MessagesPlaceholder("agent_scratchpad")
+    ])
+    agent = create_tool_calling_agent(llm, tool_list, prompt)
+    return AgentExecutor(
+        agent=agent,
+        tools=tool_list,
+        verbose=True,
+        handle_parsing_errors=True,
+        max_iterations=4
+    )
+
 ##########################################
 # 6) 测试调用
 ##########################################
@@ -130,6 +259,10 @@ if __name__ == "__main__":
                     # 对于没有参数的工具
                     if tool_func.__name__ == 'list_files_in_vault':
                         return tool_func("")
+                    # edit_lines 的 JSON 数组中可能含有“|”，只按第一个“|”拆分
+                    elif tool_func.__name__ == 'edit_lines' and '|' in input_str:
+                        filepath, edits = input_str.split('|', 1)
+                        return tool_func(filepath.strip(), edits.strip())
                     # 对于有参数的工具，尝试解析输入
                     elif '|' in input_str:
                         parts = input_str.split('|')
@@ -0,0 +1,280 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+class VaultAccess():
+    """What an agent run read from and wrote to the vault.
+
+    `paths` are notes that were read, `prefixes` are folders whose listing the
+    answer depends on ("" for the whole vault, e.g. after a search). A run
+    that wrote to the vault or used content from outside it is not cacheable.
+    """
+
+    def __init__(self):
+        self.paths: set[str] = set()
+        self.prefixes: set[str] = set()
+        self.wrote = False
+        self.uncacheable = False
+
+    @property
+    def cacheable(self) -> bool:
+        return not self.wrote and not self.uncacheable
+
+
+_current_access: ContextVar[Optional[VaultAccess]] = ContextVar("vault_access", default=None)
+
+
+@contextmanager
+def track_access() -> Iterator[VaultAccess]:
+    """Record the vault accesses of everything run inside the block.
+
+    The recorder is shared through a context variable, so tools running in
+    worker threads started from the block (which copy the context) report
+    into the same object.
+    """
+    access = VaultAccess()
+    token = _current_access.set(access)
+    try:
+        yield access
+    finally:
+        _current_access.reset(token)
+
+
+def record_read(path: str) -> None:
+    access = _current_access.get()
+    if access is not None:
+        access.paths.add(path.strip("/"))
+
+
+def record_listing(dirpath: str = "") -> None:
+    """Record that the result depends on everything below `dirpath` ("" for the whole vault)."""
+    access = _current_access.get()
+    if access is not None:
+        access.prefixes.add(dirpath.strip("/"))
+
+
+def record_write(path: str) -> None:
+    access = _current_access.get()
+    if access is not None:
+        access.wrote = True
+
+
+def record_uncacheable() -> None:
+    access = _current_access.get()
+    if access is not None:
+        access.uncacheable = True
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = " ?？.。!！~～"
+
+
+def normalize_question(question: str) -> str:
+    """Lower-case, collapse whitespace and drop trailing punctuation."""
+    return _WHITESPACE_RE.sub(" ", question).strip().lower().rstrip(_TRAILING_PUNCTUATION)
+
+
+def _depends_on(entry: dict, path: str) -> bool:
+    path = path.strip("/")
+    if path in entry["paths"]:
+        return True
+    for prefix in entry["prefixes"]:
+        if not prefix or path == prefix or path.startswith(prefix + "/"):
+            return True
+    # A folder that was deleted or renamed takes the notes read below it along
+    folder = path + "/"
+    return any(p.startswith(folder) for p in entry["paths"])
+
+
+class ResponseCache():
+    """Cache of agent answers keyed by normalized question and agent configuration.
+
+    Each entry remembers the notes and folders the run depended on and is
+    dropped when any of them changes: writes made through the client are
+    reported via `invalidate`, and edits made elsewhere are picked up by
+    calling `modified_since` at most once per `revalidate_interval`. Deletions
+    made outside this process are only noticed once `ttl` expires.
+
+    With an `embedder` and a `similarity_threshold` above zero, a question
+    without an exact match also matches the most similar cached question of
+    the same scope whose cosine similarity reaches the threshold.
+    """
+
+    def __init__(
+            self,
+            max_entries: int = 256,
+            ttl: float = 3600.0,
+            revalidate_interval: float = 5.0,
+            modified_since: Optional[Callable[[float], dict[str, Any]]] = None,
+            embedder=None,
+            similarity_threshold: float = 0.0
+        ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.revalidate_interval = revalidate_interval
+        self.modified_since = modified_since
+        self.embedder = embedder if NUMPY_AVAILABLE and similarity_threshold > 0 else None
+        self.similarity_threshold = similarity_threshold
+
+        self._entries: OrderedDict[tuple, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_validated = time.time()
+        self._validating = False
+
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.skipped = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def lookup(self, question: str, scope: tuple) -> Optional[str]:
+        """Return the cached answer for a question, or None on a miss.
+
+        May issue a modification query and an embedding call, so call it from
+        a worker thread.
+        """
+        self._revalidate()
+        normalized = normalize_question(question)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get((scope, normalized))
+            if entry is not None and now - entry["created_at"] > self.ttl:
+                del self._entries[(scope, normalized)]
+                self.invalidations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end((scope, normalized))
+                self.hits += 1
+                return entry["response"]
+            has_candidates = self.embedder is not None and any(
+                e["vector"] is not None for (s, _), e in self._entries.items() if s == scope
+            )
+
+        if has_candidates:
+            vector = self._embed(normalized)
+            if vector is not None:
+                with self._lock:
+                    best_key, best_score = None, self.similarity_threshold
+                    for key, entry in self._entries.items():
+                        if key[0] != scope or entry["vector"] is None or now - entry["created_at"] > self.ttl:
+                            continue
+                        score = float(np.dot(vector, entry["vector"]))
+                        if score >= best_score:
+                            best_key, best_score = key, score
+                    if best_key is not None:
+                        self._entries.move_to_end(best_key)
+                        self.hits += 1
+                        self.similar_hits += 1
+                        return self._entries[best_key]["response"]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def store(self, question: str, scope: tuple, response: str, access: VaultAccess) -> bool:
+        """Cache an answer together with its vault dependencies.
+
+        Returns:
+            False if the run was not cacheable (it wrote to the vault or used
+            outside content) and nothing was stored
+        """
+        if not access.cacheable or self.max_entries <= 0:
+            with self._lock:
+                self.skipped += 1
+            return False
+
+        normalized = normalize_question(question)
+        entry = {
+            "response": response,
+            "paths": frozenset(access.paths),
+            "prefixes": frozenset(access.prefixes),
+            "vector": self._embed(normalized) if self.embedder is not None else None,
+            "created_at": time.time()
+        }
+        with self._lock:
+            self._entries[(scope, normalized)] = entry
+            self._entries.move_to_end((scope, normalized))
+            self.stores += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return True
+
+    def invalidate(self, path: str) -> None:
+        """Drop every answer that depends on a path (a note or a folder)."""
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if _depends_on(entry, path)]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "stores": self.stores,
+                "skipped": self.skipped,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "similarity_matching": self.embedder is not None
+            }
+
+    def _revalidate(self) -> None:
+        if self.modified_since is None:
+            return
+        with self._lock:
+            if self._validating or not self._entries:
+                return
+            if time.time() - self._last_validated < self.revalidate_interval:
+                return
+            self._validating = True
+            since = self._last_validated
+
+        started_at = time.time()
+        try:
+            modified = self.modified_since(since)
+        except Exception:
+            modified = None
+
+        if modified is None:
+            self.clear()
+        else:
+            for path in modified:
+                self.invalidate(path)
+        with self._lock:
+            self._last_validated = started_at
+            self._validating = False
+
+    def _embed(self, text: str):
+        try:
+            vector = np.asarray(self.embedder.embed([text])[0], dtype=np.float32)
+        except Exception as e:
+            print(f"问题向量化失败: {str(e)}")
+            return None
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else None
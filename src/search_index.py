@@ -0,0 +1,333 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+# Hiragana/Katakana, CJK ideographs and Hangul are written without spaces
+_CJK_RANGES = '぀-ヿ㐀-䶿一-鿿가-힯豈-﫿'
+_TOKEN_RE = re.compile(rf'[{_CJK_RANGES}]+|[^\W{_CJK_RANGES}]+')
+_CJK_RE = re.compile(rf'[{_CJK_RANGES}]')
+
+# Length of the character n-grams used to find indexed words containing a query run
+_GRAM = 3
+
+
+def _is_cjk(run: str) -> bool:
+    return bool(_CJK_RE.match(run))
+
+
+def _word_grams(word: str) -> set[str]:
+    return {word[i:i + _GRAM] for i in range(len(word) - _GRAM + 1)}
+
+
+def tokenize(text: str) -> set[str]:
+    """Split text into index terms.
+
+    Latin words are indexed whole. CJK runs have no word boundaries, so they
+    are indexed as single characters plus overlapping character bigrams,
+    which lets any Chinese substring query be answered from the postings.
+    """
+    tokens = set()
+    for run in _TOKEN_RE.findall(text.lower()):
+        if _is_cjk(run):
+            tokens.update(run)
+            tokens.update(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.add(run)
+    return tokens
+
+
+class VaultSearchIndex():
+    """Local inverted index answering `/search/simple/` style queries.
+
+    The index is built once from the whole vault in a background thread,
+    which then keeps it current: every `refresh_interval` it re-reads notes
+    whose `file.mtime` changed, and every `rescan_interval` it lists the vault
+    again to pick up deleted notes. Writes made through the client are
+    applied before the next query, so queries never list the vault
+    themselves. Results use the same structure as the Local REST API:
+    `filename`, `score` and `matches` with `match` offsets and a `context`
+    snippet of `context_length` characters on each side.
+    """
+
+    def __init__(self, client, refresh_interval: float = 10.0, rescan_interval: float = 600.0, max_workers: int = 8):
+        self.client = client
+        self.refresh_interval = refresh_interval
+        self.rescan_interval = rescan_interval
+        self.max_workers = max_workers
+
+        self._docs: dict[str, str] = {}
+        self._doc_tokens: dict[str, set[str]] = {}
+        self._postings: dict[str, set[str]] = {}
+        self._words: set[str] = set()
+        self._word_grams: dict[str, set[str]] = {}
+        self._dirty: set[str] = set()
+        # Bumped by every client write, so a read that overlapped a write is not stored
+        self._writes = 0
+        self._written_at: dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+
+        self.ready = False
+        self._building = False
+        self._last_refresh = 0.0
+        self._last_rescan = 0.0
+        self.build_seconds = None
+        self.last_query_ms = None
+        self.queries = 0
+
+        client.add_change_listener(self.mark_dirty)
+
+    def start(self) -> None:
+        """Build the index and keep it current in a background thread."""
+        with self._lock:
+            if self.ready or self._building:
+                return
+            self._building = True
+        self._stop.clear()
+        threading.Thread(target=self._run, name="vault-search-index", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        self.build()
+        while not self._stop.wait(self.refresh_interval):
+            if self.ready:
+                self._poll()
+            else:
+                self._building = True
+                self.build()
+
+    def build(self) -> None:
+        """Index every Markdown note in the vault."""
+        started = time.time()
+        try:
+            self._rescan(started)
+            with self._lock:
+                self.ready = True
+                self._last_refresh = started
+            self.build_seconds = round(time.time() - started, 3)
+            print(f"搜索索引构建完成：{len(self._docs)} 篇笔记，用时 {self.build_seconds} 秒")
+        except Exception as e:
+            print(f"搜索索引构建失败: {str(e)}")
+        finally:
+            self._building = False
+
+    def mark_dirty(self, path: str) -> None:
+        """Re-read a path (or every note below a folder) before the next query."""
+        prefix = path.rstrip('/') + '/'
+        with self._lock:
+            paths = [path] + [p for p in self._docs if p.startswith(prefix)]
+            self._writes += 1
+            self._dirty.update(paths)
+            for p in paths:
+                self._written_at[p] = self._writes
+
+    def update_file(self, path: str, content: Optional[str] = None) -> None:
+        """(Re)index a single note, reading it from the vault if no content is given."""
+        with self._lock:
+            writes = self._writes
+        if content is None:
+            try:
+                content = self.client.get_file_contents(path)
+            except Exception:
+                content = None
+
+        tokens = tokenize(content) if content is not None else set()
+        with self._lock:
+            if self._written_at.get(path, 0) > writes:
+                # Written again while being read; the pending update will store the new content
+                return
+            self._remove(path)
+            if content is None:
+                return
+            self._docs[path] = content
+            self._doc_tokens[path] = tokens
+            for token in tokens:
+                self._postings.setdefault(token, set()).add(path)
+                if not _is_cjk(token) and token not in self._words:
+                    self._words.add(token)
+                    for gram in _word_grams(token):
+                        self._word_grams.setdefault(gram, set()).add(token)
+
+    def remove_file(self, path: str) -> None:
+        with self._lock:
+            self._remove(path)
+
+    def refresh(self) -> None:
+        """Apply the writes made through the client since the last query."""
+        if not self.ready:
+            return
+        # Blocking, so a query waits for writes another query is still applying
+        with self._refresh_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, set()
+            for path in dirty:
+                if path.endswith('.md'):
+                    self.update_file(path)
+                else:
+                    self.remove_file(path)
+
+    def _poll(self) -> None:
+        """Pick up changes made outside the client; runs on the background thread."""
+        now = time.time()
+        try:
+            if now - self._last_rescan >= self.rescan_interval:
+                self._rescan(now)
+            else:
+                modified = self.client.get_files_modified_since(self._last_refresh)
+                self._index_paths([path for path in modified if path.endswith('.md')])
+            self._last_refresh = now
+        except Exception as e:
+            print(f"搜索索引更新失败: {str(e)}")
+
+    def search(self, query: str, context_length: int = 100) -> list[dict[str, Any]]:
+        """Search the index with the same semantics as Obsidian's simple search.
+
+        Every whitespace-separated word of the query must occur in a note
+        (case-insensitive substring match).
+
+        Args:
+            query: Search query
+            context_length: Characters of context around each match
+
+        Returns:
+            List of results sorted by score, like `/search/simple/`
+        """
+        self.refresh()
+        started = time.perf_counter()
+
+        words = [word for word in query.lower().split() if word]
+        results = []
+        if words:
+            with self._lock:
+                candidates = None
+                for word in words:
+                    word_candidates = self._candidates(word)
+                    if word_candidates is None:
+                        continue
+                    candidates = word_candidates if candidates is None else candidates & word_candidates
+                    if not candidates:
+                        break
+                if candidates is None:
+                    candidates = set(self._docs)
+                docs = [(path, self._docs[path]) for path in candidates]
+
+            for path, content in docs:
+                matches = self._find_matches(content, words, context_length)
+                if matches:
+                    results.append({
+                        'filename': path,
+                        'score': len(matches),
+                        'matches': matches
+                    })
+            results.sort(key=lambda r: (-r['score'], r['filename']))
+
+        self.last_query_ms = round((time.perf_counter() - started) * 1000, 3)
+        self.queries += 1
+        return results
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'ready': self.ready,
+                'building': self._building,
+                'documents': len(self._docs),
+                'terms': len(self._postings),
+                'pending_updates': len(self._dirty),
+                'build_seconds': self.build_seconds,
+                'queries': self.queries,
+                'last_query_ms': self.last_query_ms
+            }
+
+    def _rescan(self, started: float) -> None:
+        paths = [path for path in self.client.walk_files() if path.endswith('.md')]
+        with self._lock:
+            for path in set(self._docs) - set(paths):
+                self._remove(path)
+            known = set(self._docs)
+
+        # Notes already indexed only need re-reading if they changed since the last refresh
+        if known and self._last_refresh:
+            modified = self.client.get_files_modified_since(self._last_refresh)
+            paths = [path for path in paths if path not in known or path in modified]
+        self._index_paths(paths)
+        self._last_rescan = started
+
+    def _index_paths(self, paths: list[str]) -> None:
+        if not paths:
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(self.update_file, paths))
+
+    def _candidates(self, word: str) -> Optional[set[str]]:
+        """Return the notes that can contain `word`, or None if the postings can't narrow it down."""
+        result = None
+        for run in _TOKEN_RE.findall(word):
+            if _is_cjk(run):
+                grams = [run] if len(run) == 1 else [run[i:i + 2] for i in range(len(run) - 1)]
+                docs = None
+                for gram in grams:
+                    gram_docs = self._postings.get(gram, set())
+                    docs = gram_docs if docs is None else docs & gram_docs
+            elif len(run) < _GRAM:
+                # Too short for the n-gram index; the other runs (or a full scan) decide
+                continue
+            else:
+                # Simple search matches substrings, so any indexed word containing the run
+                # qualifies; only words sharing all of the run's n-grams need checking
+                words = None
+                for gram in sorted(_word_grams(run), key=lambda g: len(self._word_grams.get(g, ()))):
+                    gram_words = self._word_grams.get(gram)
+                    if not gram_words:
+                        return set()
+                    words = set(gram_words) if words is None else words & gram_words
+                    if not words:
+                        return set()
+                docs = set()
+                for indexed_word in words:
+                    if run in indexed_word:
+                        docs |= self._postings[indexed_word]
+
+            result = docs if result is None else result & docs
+            if not result:
+                return set()
+        return result
+
+    def _find_matches(self, content: str, words: list[str], context_length: int) -> list[dict[str, Any]]:
+        lowered = content.lower()
+        matches = []
+        for word in words:
+            start = lowered.find(word)
+            if start < 0:
+                return []
+            while start >= 0:
+                end = start + len(word)
+                matches.append({
+                    'match': {'start': start, 'end': end},
+                    'context': content[max(start - context_length, 0):end + context_length]
+                })
+                start = lowered.find(word, end)
+        matches.sort(key=lambda m: m['match']['start'])
+        return matches
+
+    def _remove(self, path: str) -> None:
+        self._docs.pop(path, None)
+        for token in self._doc_tokens.pop(path, ()):
+            docs = self._postings.get(token)
+            if docs is None:
+                continue
+            docs.discard(path)
+            if not docs:
+                del self._postings[token]
+                if token in self._words:
+                    self._words.discard(token)
+                    for gram in _word_grams(token):
+                        gram_words = self._word_grams.get(gram)
+                        if gram_words is not None:
+                            gram_words.discard(token)
+                            if not gram_words:
+                                del self._word_grams[gram]
@@ -0,0 +1,343 @@
+import json
+import os
+import threading
+import time
+from typing import Any
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    print("警告: numpy 未安装，语义检索功能将不可用")
+
+
+class OllamaEmbedder():
+    """Embeds text with a local Ollama embedding model."""
+
+    def __init__(self, model: str = "nomic-embed-text", base_url: str = "http://localhost:11434"):
+        from langchain_ollama import OllamaEmbeddings
+        self.name = f"ollama:{model}"
+        self._embeddings = OllamaEmbeddings(model=model, base_url=base_url)
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        return self._embeddings.embed_documents(texts)
+
+
+class SentenceTransformerEmbedder():
+    """Embeds text in-process with a sentence-transformers model."""
+
+    def __init__(self, model: str = "BAAI/bge-small-zh-v1.5"):
+        from sentence_transformers import SentenceTransformer
+        self.name = f"sentence-transformers:{model}"
+        self._model = SentenceTransformer(model)
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        return self._model.encode(texts, normalize_embeddings=True).tolist()
+
+
+def create_embedder(provider: str, model: str, base_url: str = ""):
+    """Create the embedding backend named by `provider`."""
+    if provider == "ollama":
+        return OllamaEmbedder(model=model, base_url=base_url or "http://localhost:11434")
+    elif provider == "sentence-transformers":
+        return SentenceTransformerEmbedder(model=model)
+    else:
+        raise ValueError(f"不支持的嵌入模型提供商: {provider}")
+
+
+def chunk_text(text: str, chunk_size: int = 800, overlap: int = 100) -> list[str]:
+    """Split a note into chunks of roughly `chunk_size` characters along paragraph breaks."""
+    chunks = []
+    current = ""
+    for paragraph in (p.strip() for p in text.split("\n\n")):
+        if not paragraph:
+            continue
+        if current and len(current) + len(paragraph) + 2 > chunk_size:
+            chunks.append(current)
+            current = ""
+        while len(paragraph) > chunk_size:
+            chunks.append(paragraph[:chunk_size])
+            paragraph = paragraph[chunk_size - overlap:]
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class SemanticIndex():
+    """Chunked embedding index of the vault with brute-force cosine search.
+
+    Vectors are kept as one normalized float32 matrix and persisted to
+    `index_dir` as `vectors.npy` (memory-mapped on load) next to a JSON file
+    describing each row. Changed notes are re-embedded incrementally on a
+    background thread, woken by writes through the client and otherwise every
+    `refresh_interval`; unchanged rows are carried over as they are. Queries
+    never embed notes themselves. The index is written to disk at most once
+    per `save_interval` (and on `stop`), so a burst of edits costs one save.
+    """
+
+    def __init__(
+            self,
+            client,
+            embedder,
+            index_dir: str,
+            chunk_size: int = 800,
+            refresh_interval: float = 60.0,
+            batch_size: int = 32,
+            save_interval: float = 60.0
+        ):
+        self.client = client
+        self.embedder = embedder
+        self.index_dir = index_dir
+        self.chunk_size = chunk_size
+        self.refresh_interval = refresh_interval
+        self.batch_size = batch_size
+        self.save_interval = save_interval
+
+        self._vectors = None
+        self._chunks: list[dict[str, Any]] = []
+        self._files: dict[str, float] = {}
+        self._dirty: set[str] = set()
+        self._lock = threading.RLock()
+        self._update_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+        self.ready = False
+        self._building = False
+        self._last_sync = 0.0
+        self._unsaved = False
+        self._last_save = 0.0
+        self.saves = 0
+        self.last_query_ms = None
+
+        client.add_change_listener(self.mark_dirty)
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.index_dir, "vectors.npy")
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.index_dir, "meta.json")
+
+    def start(self) -> None:
+        """Load the persisted index, bring it up to date and keep it current in a background thread."""
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+        self._stop.clear()
+
+        def run():
+            try:
+                self.load()
+                self.sync()
+            finally:
+                self._building = False
+            while not self._stop.is_set():
+                self._wake.wait(self.refresh_interval)
+                self._wake.clear()
+                if self._stop.is_set():
+                    break
+                self.refresh()
+                self._save_if_due()
+
+        threading.Thread(target=run, name="vault-semantic-index", daemon=True).start()
+
+    def stop(self) -> None:
+        """Stop the background thread and write out any unsaved changes."""
+        self._stop.set()
+        self._wake.set()
+        self._save_if_due(force=True)
+
+    def load(self) -> bool:
+        """Load a persisted index built with the same embedding model."""
+        if not (os.path.exists(self._vectors_path) and os.path.exists(self._meta_path)):
+            return False
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("embedder") != self.embedder.name:
+            print("语义索引使用的嵌入模型已变更，将重新构建")
+            return False
+
+        vectors = np.load(self._vectors_path, mmap_mode="r")
+        with self._lock:
+            self._vectors = vectors
+            self._chunks = meta["chunks"]
+            self._files = meta["files"]
+            self._last_sync = meta.get("synced_at", 0.0)
+            self.ready = True
+        return True
+
+    def save(self) -> None:
+        os.makedirs(self.index_dir, exist_ok=True)
+        with self._lock:
+            vectors = self._vectors
+            meta = {
+                "embedder": self.embedder.name,
+                "synced_at": self._last_sync,
+                "files": self._files,
+                "chunks": self._chunks
+            }
+
+        # Write to temporary files first so a crash never leaves a half-written index
+        temp_vectors = f"{self._vectors_path}.tmp.npy"
+        np.save(temp_vectors, np.asarray(vectors if vectors is not None else np.zeros((0, 0)), dtype=np.float32))
+        temp_meta = f"{self._meta_path}.tmp"
+        with open(temp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(temp_vectors, self._vectors_path)
+        os.replace(temp_meta, self._meta_path)
+        self.saves += 1
+
+    def _save_if_due(self, force: bool = False) -> None:
+        with self._lock:
+            due = self._unsaved and (force or time.time() - self._last_save >= self.save_interval)
+            if due:
+                self._unsaved = False
+                self._last_save = time.time()
+        if not due:
+            return
+        try:
+            self.save()
+        except Exception as e:
+            with self._lock:
+                self._unsaved = True
+            print(f"语义索引保存失败: {str(e)}")
+
+    def mark_dirty(self, path: str) -> None:
+        """Re-embed a path (or every note below a folder) on the next update."""
+        prefix = path.rstrip('/') + '/'
+        with self._lock:
+            self._dirty.add(path)
+            self._dirty.update(p for p in self._files if p.startswith(prefix))
+        self._wake.set()
+
+    def sync(self) -> None:
+        """Bring the index in line with the vault, re-embedding only what changed."""
+        if not self._update_lock.acquire(blocking=False):
+            return
+        try:
+            started = time.time()
+            paths = {path for path in self.client.walk_files() if path.endswith('.md')}
+            with self._lock:
+                known = set(self._files)
+                dirty, self._dirty = self._dirty, set()
+
+            modified = self.client.get_files_modified_since(self._last_sync) if known and self._last_sync else {}
+            changed = (paths - known) | (paths & (set(modified) | dirty))
+            removed = (known - paths) | (dirty - paths)
+            self._apply(changed, removed, started)
+            self._save_if_due(force=True)
+            print(f"语义索引同步完成：{len(changed)} 篇更新，{len(removed)} 篇移除，用时 {round(time.time() - started, 3)} 秒")
+        except Exception as e:
+            print(f"语义索引同步失败: {str(e)}")
+        finally:
+            self._update_lock.release()
+
+    def refresh(self) -> None:
+        """Apply pending writes and recent mtime changes if the refresh interval has elapsed."""
+        if not self.ready or self._building:
+            return
+        with self._lock:
+            due = self._dirty or time.time() - self._last_sync >= self.refresh_interval
+        if not due or not self._update_lock.acquire(blocking=False):
+            return
+        try:
+            started = time.time()
+            with self._lock:
+                dirty, self._dirty = self._dirty, set()
+            modified = self.client.get_files_modified_since(self._last_sync)
+            candidates = {path for path in set(modified) | dirty if path.endswith('.md')}
+            if not candidates:
+                with self._lock:
+                    self._last_sync = started
+                return
+            self._apply(candidates, set(), started)
+        except Exception as e:
+            print(f"语义索引更新失败: {str(e)}")
+        finally:
+            self._update_lock.release()
+
+    def search(self, query: str, top_k: int = 5) -> list[dict[str, Any]]:
+        """Return the `top_k` chunks most similar to the query.
+
+        Returns:
+            List of dicts with 'filename', 'score' and 'text', best match first
+        """
+        with self._lock:
+            vectors = self._vectors
+            chunks = self._chunks
+        if vectors is None or not len(chunks):
+            return []
+
+        started = time.perf_counter()
+        query_vector = self._embed([query])[0]
+        scores = vectors @ query_vector
+        k = min(top_k, len(chunks))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        self.last_query_ms = round((time.perf_counter() - started) * 1000, 3)
+
+        return [
+            {
+                "filename": chunks[i]["path"],
+                "score": round(float(scores[i]), 4),
+                "text": chunks[i]["text"]
+            }
+            for i in top
+        ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "building": self._building,
+                "embedder": self.embedder.name,
+                "files": len(self._files),
+                "chunks": len(self._chunks),
+                "pending_updates": len(self._dirty),
+                "unsaved": self._unsaved,
+                "saves": self.saves,
+                "last_query_ms": self.last_query_ms
+            }
+
+    def _apply(self, changed: set[str], removed: set[str], started: float) -> None:
+        new_chunks = []
+        new_files = {}
+        for path in sorted(changed):
+            try:
+                content = self.client.get_file_contents(path)
+            except Exception:
+                removed.add(path)
+                continue
+            new_files[path] = started
+            new_chunks.extend({"path": path, "text": text} for text in chunk_text(content, self.chunk_size))
+
+        new_vectors = self._embed([chunk["text"] for chunk in new_chunks]) if new_chunks else None
+
+        with self._lock:
+            dropped = changed | removed
+            keep = [i for i, chunk in enumerate(self._chunks) if chunk["path"] not in dropped]
+            parts = []
+            if self._vectors is not None and keep:
+                parts.append(np.asarray(self._vectors[keep], dtype=np.float32))
+            if new_vectors is not None:
+                parts.append(new_vectors)
+
+            self._vectors = np.concatenate(parts) if parts else None
+            self._chunks = [self._chunks[i] for i in keep] + new_chunks
+            self._files = {p: t for p, t in self._files.items() if p not in dropped} | new_files
+            self._last_sync = started
+            self.ready = True
+            self._unsaved = True
+
+    def _embed(self, texts: list[str]):
+        batches = []
+        for i in range(0, len(texts), self.batch_size):
+            batches.append(np.asarray(self.embedder.embed(texts[i:i + self.batch_size]), dtype=np.float32))
+        vectors = np.concatenate(batches)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
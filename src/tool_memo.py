@@ -0,0 +1,154 @@
+import functools
+import inspect
+import json
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+
+class ToolMemo():
+    """Results of read-only tool calls made during one agent run."""
+
+    def __init__(self):
+        self.results: dict[tuple, Any] = {}
+        self.calls = 0
+        self.saved = 0
+        self.invalidations = 0
+        # Bumped by every write, so a read that overlapped a write is not stored
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            if self.results:
+                self.invalidations += 1
+            self.results.clear()
+            self.generation += 1
+
+
+_current_memo: ContextVar[Optional[ToolMemo]] = ContextVar("tool_memo", default=None)
+
+_totals_lock = threading.Lock()
+_totals = {"runs": 0, "calls": 0, "saved": 0}
+
+
+@contextmanager
+def memoize_run() -> Iterator[ToolMemo]:
+    """Memoize read-only tool calls made inside the block.
+
+    Tool calls outside any block are never memoized, so results cannot leak
+    from one run (or one user) to another.
+    """
+    memo = ToolMemo()
+    token = _current_memo.set(memo)
+    try:
+        yield memo
+    finally:
+        _current_memo.reset(token)
+        with _totals_lock:
+            _totals["runs"] += 1
+            _totals["calls"] += memo.calls
+            _totals["saved"] += memo.saved
+
+
+def tool_memo_stats() -> dict:
+    with _totals_lock:
+        return dict(_totals)
+
+
+def _call_key(name: str, signature: inspect.Signature, args: tuple, kwargs: dict) -> tuple:
+    # Bind to the signature so positional, keyword and default arguments give the same key
+    try:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = bound.arguments
+    except TypeError:
+        arguments = {"args": args, "kwargs": kwargs}
+    return name, json.dumps(arguments, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def _memoized(name: str, func: Callable, is_failure: Callable[[Any], bool]) -> Callable:
+    signature = inspect.signature(func)
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            memo = _current_memo.get()
+            if memo is None:
+                return await func(*args, **kwargs)
+            key = _call_key(name, signature, args, kwargs)
+            with memo._lock:
+                memo.calls += 1
+                if key in memo.results:
+                    memo.saved += 1
+                    return memo.results[key]
+                generation = memo.generation
+            result = await func(*args, **kwargs)
+            with memo._lock:
+                if memo.generation == generation and not is_failure(result):
+                    memo.results[key] = result
+            return result
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        memo = _current_memo.get()
+        if memo is None:
+            return func(*args, **kwargs)
+        key = _call_key(name, signature, args, kwargs)
+        with memo._lock:
+            memo.calls += 1
+            if key in memo.results:
+                memo.saved += 1
+                return memo.results[key]
+            generation = memo.generation
+        result = func(*args, **kwargs)
+        with memo._lock:
+            if memo.generation == generation and not is_failure(result):
+                memo.results[key] = result
+        return result
+    return wrapper
+
+
+def _invalidating(func: Callable) -> Callable:
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                memo = _current_memo.get()
+                if memo is not None:
+                    memo.invalidate()
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            memo = _current_memo.get()
+            if memo is not None:
+                memo.invalidate()
+    return wrapper
+
+
+def memoize_tools(tools: list, read_only: set[str], is_failure: Callable[[Any], bool] = lambda result: False) -> list:
+    """Wrap tools so repeated read-only calls within a run return the first result.
+
+    Tools named in `read_only` are memoized by their arguments. Every other
+    tool is treated as a write and clears the run's memo once it returns, so
+    a later read sees the change. Results for which `is_failure` is true are
+    not memoized, so the agent can retry a failed call.
+
+    The wrappers keep the wrapped function's name and signature.
+    """
+    for tool in tools:
+        if tool.name in read_only:
+            tool.func = _memoized(tool.name, tool.func, is_failure) if tool.func else None
+            tool.coroutine = _memoized(tool.name, tool.coroutine, is_failure) if tool.coroutine else None
+        else:
+            tool.func = _invalidating(tool.func) if tool.func else None
+            tool.coroutine = _invalidating(tool.coroutine) if tool.coroutine else None
+    return tools
@@ -7,6 +7,7 @@ from langchain_community.chat_models import ChatTongyi
 from fastmcp.client import Client
 # pip install sseclient-py
 import asyncio
+import json
 # 1) 载入 .env
 load_dotenv()
 
@@ -23,12 +24,22 @@ except ImportError:
 from langchain.tools import StructuredTool, Tool
 from langchain.agents import initialize_agent, Tool
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Literal, Optional, Union
 
 # 导入 Obsidian 类
 import sys
 sys.path.append('../obsidian_fastmcp/src')
-from obsidian import Obsidian
+from obsidian import Obsidian, AsyncObsidian
+from obsidian_fs import FileSystemObsidian
+from vault_cache import VaultContentCache
+from search_index import VaultSearchIndex
+from semantic_index import SemanticIndex, create_embedder, NUMPY_AVAILABLE
+from conversion_cache import ConversionCache
+from converters import get_markitdown
+from response_cache import record_read, record_listing, record_write, record_uncacheable
+from tool_memo import memoize_tools
+from vault_snapshot import VaultSnapshot
+from vault_watcher import VaultWatcher
 
 def make_tool_func(client, tool):
     
@@ -63,18 +74,167 @@ class ObsidianConfig:
         self.host = os.getenv("OBSIDIAN_HOST", "127.0.0.1")
         self.port = int(os.getenv("OBSIDIAN_PORT", "27124"))
         self.verify_ssl = os.getenv("OBSIDIAN_VERIFY_SSL", "false").lower() == "true"
-
-# 初始化 Obsidian 实例
+        # 连接池配置
+        self.pool_size = int(os.getenv("OBSIDIAN_POOL_SIZE", "10"))
+        self.keep_alive = os.getenv("OBSIDIAN_KEEP_ALIVE", "true").lower() == "true"
+        self.max_retries = int(os.getenv("OBSIDIAN_MAX_RETRIES", "3"))
+        self.retry_backoff = float(os.getenv("OBSIDIAN_RETRY_BACKOFF", "0.3"))
+        # 批量读取的最大并发数
+        self.batch_concurrency = int(os.getenv("OBSIDIAN_BATCH_CONCURRENCY", "8"))
+        # 笔记内容缓存配置（条目数为 0 时禁用缓存）
+        self.cache_max_entries = int(os.getenv("OBSIDIAN_CACHE_MAX_ENTRIES", "512"))
+        self.cache_max_bytes = int(os.getenv("OBSIDIAN_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+        self.cache_revalidate_seconds = float(os.getenv("OBSIDIAN_CACHE_REVALIDATE_SECONDS", "5"))
+        # 存储后端："rest" 通过 Local REST API 访问，"filesystem" 直接读写本地保险库目录
+        self.backend = os.getenv("OBSIDIAN_BACKEND", "rest").lower()
+        self.vault_path = os.getenv("OBSIDIAN_VAULT_PATH", "")
+        self.mmap_threshold = int(os.getenv("OBSIDIAN_MMAP_THRESHOLD", str(1024 * 1024)))
+        # 本地全文索引配置
+        self.search_index = os.getenv("OBSIDIAN_SEARCH_INDEX", "false").lower() == "true"
+        self.search_refresh_seconds = float(os.getenv("OBSIDIAN_SEARCH_REFRESH_SECONDS", "10"))
+        self.search_rescan_seconds = float(os.getenv("OBSIDIAN_SEARCH_RESCAN_SECONDS", "600"))
+        # 保险库文件列表快照（find_files 使用）的最长复用时间
+        self.snapshot_refresh_seconds = float(os.getenv("OBSIDIAN_SNAPSHOT_REFRESH_SECONDS", "30"))
+        # 保险库变更监听：auto（文件系统后端用 inotify，REST 后端轮询）、inotify、poll、off
+        self.watcher = os.getenv("OBSIDIAN_WATCHER", "auto").lower()
+        self.watcher_debounce_seconds = float(os.getenv("OBSIDIAN_WATCHER_DEBOUNCE_SECONDS", "0.5"))
+        self.watcher_poll_seconds = float(os.getenv("OBSIDIAN_WATCHER_POLL_SECONDS", "10"))
+        self.watcher_rescan_seconds = float(os.getenv("OBSIDIAN_WATCHER_RESCAN_SECONDS", "300"))
+        # 语义检索配置
+        self.semantic_index = os.getenv("SEMANTIC_INDEX_ENABLED", "false").lower() == "true"
+        self.semantic_index_dir = os.getenv("SEMANTIC_INDEX_DIR", ".semantic_index")
+        self.embedding_provider = os.getenv("EMBEDDING_PROVIDER", "ollama")
+        self.embedding_model = os.getenv("EMBEDDING_MODEL", "nomic-embed-text")
+        self.embedding_base_url = os.getenv("EMBEDDING_BASE_URL", "")
+        self.semantic_top_k = int(os.getenv("SEMANTIC_TOP_K", "4"))
+        self.semantic_min_score = float(os.getenv("SEMANTIC_MIN_SCORE", "0.3"))
+        # 文档转换缓存（按文件内容哈希 + 转换器版本 + 输出格式），大小为 0 时禁用
+        self.conversion_cache_dir = os.getenv("CONVERT_CACHE_DIR", ".conversion_cache")
+        self.conversion_cache_max_bytes = int(os.getenv("CONVERT_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+
+# 初始化 Obsidian 实例（所有工具共享同一个连接池和内容缓存）
 obsidian_config = ObsidianConfig()
-obsidian_client = Obsidian(
+vault_cache = VaultContentCache(
+    max_entries=obsidian_config.cache_max_entries,
+    max_bytes=obsidian_config.cache_max_bytes,
+    revalidate_interval=obsidian_config.cache_revalidate_seconds
+) if obsidian_config.cache_max_entries > 0 else None
+
+def create_obsidian_client(config: ObsidianConfig, cache: Optional[VaultContentCache] = None) -> Obsidian:
+    """根据配置创建 REST 或本地文件系统后端的 Obsidian 客户端"""
+    client_kwargs = dict(
+        api_key=config.api_key,
+        protocol=config.protocol,
+        host=config.host,
+        port=config.port,
+        verify_ssl=config.verify_ssl,
+        pool_size=config.pool_size,
+        keep_alive=config.keep_alive,
+        max_retries=config.max_retries,
+        backoff_factor=config.retry_backoff,
+        cache=cache
+    )
+    if config.backend == "filesystem":
+        if config.vault_path:
+            try:
+                return FileSystemObsidian(
+                    vault_path=config.vault_path,
+                    mmap_threshold=config.mmap_threshold,
+                    **client_kwargs
+                )
+            except Exception as e:
+                print(f"警告: 文件系统后端初始化失败（{e}），改用 REST 后端")
+        else:
+            print("警告: 未设置 OBSIDIAN_VAULT_PATH，改用 REST 后端")
+    return Obsidian(**client_kwargs)
+
+obsidian_client = create_obsidian_client(obsidian_config, vault_cache)
+
+# 本地全文索引（启用后 search_files 不再由 Obsidian 扫描整个保险库）
+search_index = VaultSearchIndex(
+    obsidian_client,
+    refresh_interval=obsidian_config.search_refresh_seconds,
+    rescan_interval=obsidian_config.search_rescan_seconds,
+    max_workers=obsidian_config.batch_concurrency
+) if obsidian_config.search_index else None
+
+# 保险库文件列表快照：find_files 在本地按通配符、目录、扩展名查找，不再逐个目录请求
+vault_snapshot = VaultSnapshot(
+    obsidian_client,
+    refresh_interval=obsidian_config.snapshot_refresh_seconds,
+    max_workers=obsidian_config.batch_concurrency
+)
+
+def create_semantic_index(config: ObsidianConfig, client: Obsidian) -> Optional[SemanticIndex]:
+    """按配置创建语义向量索引，未启用或依赖缺失时返回 None"""
+    if not config.semantic_index:
+        return None
+    if not NUMPY_AVAILABLE:
+        print("警告: numpy 未安装，已禁用语义检索")
+        return None
+    try:
+        embedder = create_embedder(config.embedding_provider, config.embedding_model, config.embedding_base_url)
+    except Exception as e:
+        print(f"警告: 嵌入模型初始化失败（{e}），已禁用语义检索")
+        return None
+    return SemanticIndex(client, embedder, config.semantic_index_dir)
+
+semantic_index = create_semantic_index(obsidian_config, obsidian_client)
+
+# 保险库变更监听：把在 Obsidian 或其他程序中的修改推送给内容缓存、索引和文件列表快照
+vault_watcher = VaultWatcher(
+    obsidian_client,
+    mode=obsidian_config.watcher,
+    debounce=obsidian_config.watcher_debounce_seconds,
+    poll_interval=obsidian_config.watcher_poll_seconds,
+    rescan_interval=obsidian_config.watcher_rescan_seconds
+) if obsidian_config.watcher != "off" else None
+
+def apply_vault_events(events) -> None:
+    """只处理变化的路径，不重新扫描整个保险库"""
+    for event in events:
+        for path in event.paths():
+            if vault_cache is not None:
+                vault_cache.invalidate(path)
+            if search_index is not None:
+                search_index.mark_dirty(path)
+            if semantic_index is not None:
+                semantic_index.mark_dirty(path)
+        if event.kind in ("deleted", "moved"):
+            vault_snapshot.apply_change(event.path, None)
+        if event.kind != "deleted":
+            vault_snapshot.apply_change(event.dest_path or event.path, (event.size, event.mtime))
+
+if vault_watcher is not None:
+    vault_watcher.subscribe(apply_vault_events)
+
+# 异步客户端，供异步工具和 API 服务器使用
+async_obsidian_client = AsyncObsidian(
     api_key=obsidian_config.api_key,
     protocol=obsidian_config.protocol,
     host=obsidian_config.host,
     port=obsidian_config.port,
-    verify_ssl=obsidian_config.verify_ssl
+    verify_ssl=obsidian_config.verify_ssl,
+    pool_size=obsidian_config.pool_size,
+    keep_alive=obsidian_config.keep_alive,
+    max_retries=obsidian_config.max_retries,
+    batch_concurrency=obsidian_config.batch_concurrency,
+    cache=vault_cache
 )
 
+# 文档转换缓存：同一份文件内容只转换一次，供转换工具和 API 服务器共用
+conversion_cache = ConversionCache(
+    obsidian_config.conversion_cache_dir,
+    max_bytes=obsidian_config.conversion_cache_max_bytes
+) if obsidian_config.conversion_cache_max_bytes > 0 else None
+
 # 工具输入模型
+class FindFilesInput(BaseModel):
+    pattern: str = Field(default="", description="文件名通配符，例如 *会议*.md；包含 / 时匹配完整路径")
+    folder: str = Field(default="", description="只查找该文件夹下（包括子文件夹）的文件")
+    extension: str = Field(default="", description="文件扩展名，例如 md、pdf")
+    limit: int = Field(default=50, description="最多返回的文件数")
+
 class ListFilesInput(BaseModel):
     dirpath: Optional[str] = Field(default="", description="目录路径，留空则列出根目录文件")
 
@@ -88,6 +248,10 @@ class SearchInput(BaseModel):
     query: str = Field(description="搜索查询")
     context_length: int = Field(default=100, description="上下文长度")
 
+class SemanticSearchInput(BaseModel):
+    query: str = Field(description="检索问题或关键词")
+    top_k: int = Field(default=5, description="返回的片段数量")
+
 class AppendContentInput(BaseModel):
     filepath: str = Field(description="文件路径")
     content: str = Field(description="要追加的内容")
@@ -129,6 +293,7 @@ class ConvertUrlToMarkdownInput(BaseModel):
 # Obsidian 工具函数
 def list_files_in_vault(dirpath: str = "") -> str:
     """列出 Obsidian 保险库中的文件"""
+    record_listing(dirpath)
     try:
         if dirpath:
             files = obsidian_client.list_files_in_dir(dirpath)
@@ -138,8 +303,20 @@ def list_files_in_vault(dirpath: str = "") -> str:
     except Exception as e:
         return f"获取文件列表失败：{str(e)}"
 
+def find_files(pattern: str = "", folder: str = "", extension: str = "", limit: int = 50) -> str:
+    """在整个保险库的文件列表快照中查找文件"""
+    record_listing(folder)
+    try:
+        files = vault_snapshot.find(pattern, folder, extension, limit)
+        if not files:
+            return "没有找到匹配的文件"
+        return f"找到 {len(files)} 个文件：{[f['path'] for f in files]}"
+    except Exception as e:
+        return f"查找文件失败：{str(e)}"
+
 def get_file_contents(filepath: str) -> str:
     """获取指定文件的内容"""
+    record_read(filepath)
     try:
         content = obsidian_client.get_file_contents(filepath)
         return f"文件 {filepath} 的内容：\n{content}"
@@ -148,22 +325,72 @@ def get_file_contents(filepath: str) -> str:
 
 def get_batch_file_contents(filepaths: List[str]) -> str:
     """获取多个文件的内容"""
+    for filepath in filepaths:
+        record_read(filepath)
     try:
         content = obsidian_client.get_batch_file_contents(filepaths)
         return f"批量文件内容：\n{content}"
     except Exception as e:
         return f"获取批量文件内容失败：{str(e)}"
 
+async def aget_batch_file_contents(filepaths: List[str]) -> str:
+    """并发获取多个文件的内容"""
+    for filepath in filepaths:
+        record_read(filepath)
+    try:
+        if isinstance(obsidian_client, FileSystemObsidian):
+            # 本地文件系统后端不经过 REST API，直接在线程中读取
+            content = await asyncio.to_thread(obsidian_client.get_batch_file_contents, filepaths)
+        else:
+            content = await async_obsidian_client.get_batch_file_contents(filepaths)
+        return f"批量文件内容：\n{content}"
+    except Exception as e:
+        return f"获取批量文件内容失败：{str(e)}"
+
 def search_files(query: str, context_length: int = 100) -> str:
     """搜索文件"""
+    # 结果取决于整个保险库
+    record_listing()
     try:
-        results = obsidian_client.search(query, context_length)
+        if search_index is not None and search_index.ready:
+            results = search_index.search(query, context_length)
+        else:
+            results = obsidian_client.search(query, context_length)
         return f"搜索结果：{results}"
     except Exception as e:
         return f"搜索失败：{str(e)}"
 
+def semantic_search(query: str, top_k: int = 5) -> str:
+    """按语义检索相关笔记片段"""
+    record_listing()
+    try:
+        if semantic_index is None or not semantic_index.ready:
+            return "语义索引尚未就绪，请稍后再试或使用 search_files"
+        results = semantic_index.search(query, top_k)
+        return f"语义检索结果：{results}"
+    except Exception as e:
+        return f"语义检索失败：{str(e)}"
+
+def retrieve_context(query: str) -> str:
+    """为对话检索相关笔记片段，返回可直接放入提示词的上下文（无结果时返回空字符串）"""
+    if semantic_index is None or not semantic_index.ready:
+        return ""
+    try:
+        results = semantic_index.search(query, obsidian_config.semantic_top_k)
+    except Exception as e:
+        print(f"语义检索失败: {str(e)}")
+        return ""
+
+    snippets = [r for r in results if r["score"] >= obsidian_config.semantic_min_score]
+    if not snippets:
+        return ""
+    for r in snippets:
+        record_read(r["filename"])
+    return "\n\n".join(f"[{i}] {r['filename']}\n{r['text']}" for i, r in enumerate(snippets, 1))
+
 def append_content(filepath: str, content: str) -> str:
     """向文件追加内容"""
+    record_write(filepath)
     try:
         obsidian_client.append_content(filepath, content)
         return f"成功向文件 {filepath} 追加内容"
@@ -172,6 +399,7 @@ def append_content(filepath: str, content: str) -> str:
 
 def put_content(filepath: str, content: str) -> str:
     """写入文件内容（覆盖）"""
+    record_write(filepath)
     try:
         obsidian_client.put_content(filepath, content)
         return f"成功写入文件 {filepath}"
@@ -180,6 +408,7 @@ def put_content(filepath: str, content: str) -> str:
 
 def delete_file(filepath: str) -> str:
     """删除文件"""
+    record_write(filepath)
     try:
         obsidian_client.delete_file(filepath)
         return f"成功删除文件 {filepath}"
@@ -188,6 +417,7 @@ def delete_file(filepath: str) -> str:
 
 def search_json(query: dict) -> str:
     """使用JSON查询搜索"""
+    record_listing()
     try:
         results = obsidian_client.search_json(query)
         return f"JSON搜索结果：{results}"
@@ -196,6 +426,8 @@ def search_json(query: dict) -> str:
 
 def get_periodic_note(period: str, type: str = "content") -> str:
     """获取周期性笔记"""
+    # 结果取决于当前日期，跨天后缓存的回答会过期
+    record_uncacheable()
     try:
         content = obsidian_client.get_periodic_note(period, type)
         return f"周期性笔记 ({period}, {type})：\n{content}"
@@ -204,6 +436,8 @@ def get_periodic_note(period: str, type: str = "content") -> str:
 
 def get_recent_periodic_notes(period: str, limit: int = 5, include_content: bool = False) -> str:
     """获取最近的周期性笔记"""
+    # 结果取决于当前日期，跨天后缓存的回答会过期
+    record_uncacheable()
     try:
         notes = obsidian_client.get_recent_periodic_notes(period, limit, include_content)
         return f"最近的周期性笔记 ({period})：{notes}"
@@ -212,6 +446,8 @@ def get_recent_periodic_notes(period: str, limit: int = 5, include_content: bool
 
 def get_recent_changes(limit: int = 10, days: int = 90) -> str:
     """获取最近的更改"""
+    # 结果取决于当前日期，跨天后缓存的回答会过期
+    record_uncacheable()
     try:
         changes = obsidian_client.get_recent_changes(limit, days)
         return f"最近的更改：{changes}"
@@ -221,6 +457,8 @@ def get_recent_changes(limit: int = 10, days: int = 90) -> str:
 # MarkItDown 工具函数 <mcreference link="https://github.com/microsoft/markitdown" index="1">1</mcreference>
 def convert_file_to_markdown(filepath: str, save_to_obsidian: bool = False, output_filename: Optional[str] = None) -> str:
     """将文件转换为Markdown格式"""
+    # 转换的是保险库之外的文件，结果不可缓存
+    record_uncacheable()
     if not MARKITDOWN_AVAILABLE:
         return "错误：markitdown 库未安装，无法使用文档转换功能"
     
@@ -229,12 +467,19 @@ def convert_file_to_markdown(filepath: str, save_to_obsidian: bool = False, outp
         if not os.path.exists(filepath):
             return f"错误：文件 {filepath} 不存在"
         
-        # 初始化 MarkItDown <mcreference link="https://dev.to/leapcell/deep-dive-into-microsoft-markitdown-4if5" index="3">3</mcreference>
-        md = MarkItDown()
+        # 相同内容的文件直接使用缓存的转换结果
+        cache_key = conversion_cache.key(filepath, "markdown") if conversion_cache else None
+        markdown_content = conversion_cache.get(cache_key) if cache_key else None
         
-        # 转换文件
-        result = md.convert(filepath)
-        markdown_content = result.text_content
+        if markdown_content is None:
+            # 复用进程内共享的 MarkItDown 实例，避免每次调用重复初始化 <mcreference link="https://dev.to/leapcell/deep-dive-into-microsoft-markitdown-4if5" index="3">3</mcreference>
+            md = get_markitdown()
+            
+            # 转换文件
+            result = md.convert(filepath)
+            markdown_content = result.text_content
+            if cache_key:
+                conversion_cache.put(cache_key, markdown_content)
         
         if save_to_obsidian:
             # 生成输出文件名
@@ -260,12 +505,13 @@ def convert_file_to_markdown(filepath: str, save_to_obsidian: bool = False, outp
 
 def convert_url_to_markdown(url: str, save_to_obsidian: bool = False, output_filename: Optional[str] = None) -> str:
     """将URL内容转换为Markdown格式"""
+    record_uncacheable()
     if not MARKITDOWN_AVAILABLE:
         return "错误：markitdown 库未安装，无法使用文档转换功能"
     
     try:
-        # 初始化 MarkItDown <mcreference link="https://dev.to/leapcell/deep-dive-into-microsoft-markitdown-4if5" index="3">3</mcreference>
-        md = MarkItDown()
+        # 复用进程内共享的 MarkItDown 实例，避免每次调用重复初始化 <mcreference link="https://dev.to/leapcell/deep-dive-into-microsoft-markitdown-4if5" index="3">3</mcreference>
+        md = get_markitdown()
         
         # 转换URL
         result = md.convert(url)
@@ -304,6 +550,10 @@ class CreateFolderInput(BaseModel):
 class DeleteFolderInput(BaseModel):
     folder_path: str = Field(description="要删除的文件夹路径")
 
+class CopyFolderInput(BaseModel):
+    source: str = Field(description="源文件夹路径")
+    destination: str = Field(description="目标文件夹路径（不存在时自动创建）")
+
 class InsertLineInput(BaseModel):
     filepath: str = Field(description="文件路径")
     line_number: int = Field(description="行号（从1开始）")
@@ -313,25 +563,74 @@ class DeleteLineInput(BaseModel):
     filepath: str = Field(description="文件路径")
     line_number: int = Field(description="要删除的行号（从1开始）")
 
+class LineEdit(BaseModel):
+    operation: Literal["insert", "delete", "replace"] = Field(description="insert 在 line 之前插入，delete 删除 line 到 end_line，replace 用 content 替换 line 到 end_line")
+    line: int = Field(description="起始行号（从1开始，按编辑前的文件计算）；在文件末尾插入时使用总行数+1")
+    end_line: Optional[int] = Field(default=None, description="delete / replace 的结束行号（包含），默认与 line 相同")
+    content: str = Field(default="", description="insert / replace 写入的内容，可以包含多行")
+
+class VaultChange(BaseModel):
+    operation: Literal["put", "append", "delete", "edit_lines"] = Field(description="put 覆盖写入，append 追加，delete 删除文件，edit_lines 行编辑")
+    filepath: str = Field(description="文件路径")
+    content: str = Field(default="", description="put / append 写入的内容")
+    edits: List[LineEdit] = Field(default_factory=list, description="edit_lines 的行编辑列表")
+
+class ApplyVaultChangesInput(BaseModel):
+    changes: Union[List[VaultChange], str] = Field(description="要应用的修改列表（也可以是 JSON 数组字符串），同一文件的修改按顺序执行")
+    rollback_on_failure: bool = Field(default=True, description="任一修改失败时是否撤销已完成的修改")
+
+class EditLinesInput(BaseModel):
+    filepath: str = Field(description="文件路径")
+    edits: Union[List[LineEdit], str] = Field(description="行编辑列表（也可以是 JSON 数组字符串），行号都按编辑前的文件计算")
+    expected_mtime: Optional[int] = Field(default=None, description="可选，文件应有的修改时间（毫秒时间戳），文件已被修改时放弃编辑")
+
 # 新增工具函数
 def create_folder(folder_path: str) -> str:
     """创建文件夹"""
+    record_write(folder_path)
     try:
         obsidian_client.create_folder(folder_path)
         return f"成功创建文件夹：{folder_path}"
     except Exception as e:
         return f"创建文件夹失败：{str(e)}"
 
+def format_folder_summary(action: str, folder_path: str, summary: dict) -> str:
+    """把文件夹批量操作的结果汇总成一条消息"""
+    if not summary["failed"]:
+        return f"成功{action}文件夹 {folder_path}（共 {summary['files']} 个文件）"
+    failures = "\n".join(f"{f['path']}: {f['error']}" for f in summary["failed"][:20])
+    return f"{action}文件夹 {folder_path} 部分失败：{summary['succeeded']}/{summary['files']} 个文件成功\n{failures}"
+
 def delete_folder(folder_path: str) -> str:
-    """删除文件夹"""
+    """删除文件夹及其中的所有文件"""
+    record_write(folder_path)
     try:
-        obsidian_client.delete_folder(folder_path)
-        return f"成功删除文件夹：{folder_path}"
+        summary = obsidian_client.delete_folder(folder_path, obsidian_config.batch_concurrency)
+        return format_folder_summary("删除", folder_path, summary)
     except Exception as e:
         return f"删除文件夹失败：{str(e)}"
 
+def copy_folder(source: str, destination: str) -> str:
+    """复制文件夹及其中的所有文件"""
+    record_write(destination)
+    try:
+        summary = obsidian_client.copy_folder(source, destination, obsidian_config.batch_concurrency)
+        return format_folder_summary("复制", f"{source} -> {destination}", summary)
+    except Exception as e:
+        return f"复制文件夹失败：{str(e)}"
+
+def move_folder(source: str, destination: str) -> str:
+    """移动文件夹及其中的所有文件"""
+    record_write(source)
+    try:
+        summary = obsidian_client.move_folder(source, destination, obsidian_config.batch_concurrency)
+        return format_folder_summary("移动", f"{source} -> {destination}", summary)
+    except Exception as e:
+        return f"移动文件夹失败：{str(e)}"
+
 def insert_line_at_position(filepath: str, line_number: int, content: str) -> str:
     """在指定行号插入内容"""
+    record_write(filepath)
     try:
         obsidian_client.patch_content_at_line(filepath, line_number, content, "insert")
         return f"成功在文件 {filepath} 的第 {line_number} 行插入内容"
@@ -340,12 +639,74 @@ def insert_line_at_position(filepath: str, line_number: int, content: str) -> st
 
 def delete_line_at_position(filepath: str, line_number: int) -> str:
     """删除指定行号的内容"""
+    record_write(filepath)
     try:
         obsidian_client.patch_content_at_line(filepath, line_number, "", "delete")
         return f"成功删除文件 {filepath} 的第 {line_number} 行"
     except Exception as e:
         return f"删除行失败：{str(e)}"
 
+# 不修改保险库的工具，同一次运行中相同参数的调用可以复用结果
+READ_ONLY_TOOLS = {
+    "list_files_in_vault",
+    "find_files",
+    "get_file_contents",
+    "get_batch_file_contents",
+    "search_files",
+    "semantic_search",
+    "search_json",
+    "get_periodic_note",
+    "get_recent_periodic_notes",
+    "get_recent_changes"
+}
+
+def is_tool_failure(result) -> bool:
+    """工具函数出错时返回“……失败：原因”，失败的结果不复用，以便 Agent 重试"""
+    return isinstance(result, str) and "失败：" in result.split("\n", 1)[0]
+
+def edit_lines(filepath: str, edits: Union[List[LineEdit], str], expected_mtime: Optional[int] = None) -> str:
+    """一次性对文件应用多处行编辑（插入、删除、替换）"""
+    record_write(filepath)
+    try:
+        # ReAct 模式下参数以“文件路径|JSON 数组”的字符串形式传入
+        if isinstance(edits, str):
+            edits = json.loads(edits)
+        edits = [edit.dict() if isinstance(edit, LineEdit) else dict(edit) for edit in edits]
+        result = obsidian_client.apply_line_edits(filepath, edits, expected_mtime)
+        mtime = f"，修改时间 {result['mtime']}" if result["mtime"] is not None else ""
+        return f"成功对文件 {filepath} 应用 {result['edits']} 处行编辑，现有 {result['lines']} 行{mtime}"
+    except Exception as e:
+        return f"行编辑失败：{str(e)}"
+
+def apply_vault_changes(changes: Union[List[VaultChange], str], rollback_on_failure: bool = True) -> str:
+    """一次性并发应用多个文件的修改，失败时可撤销"""
+    try:
+        if isinstance(changes, str):
+            changes = json.loads(changes)
+        changes = [change.dict() if isinstance(change, VaultChange) else dict(change) for change in changes]
+        changeset = obsidian_client.changeset(obsidian_config.batch_concurrency)
+        for change in changes:
+            record_write(change["filepath"])
+            edits = [edit.dict() if isinstance(edit, LineEdit) else dict(edit) for edit in change.get("edits") or []]
+            changeset.add(change["operation"], change["filepath"], change.get("content", ""), edits)
+        result = changeset.apply(rollback_on_failure)
+    except Exception as e:
+        return f"批量修改失败：{str(e)}"
+    
+    done = sum(1 for r in result["results"] if r["status"] == "done")
+    lines = [f"{r['operation']} {r['filepath']}: {r['status']}" + (f"（{r['error']}）" if r["error"] else "") for r in result["results"]]
+    if result["status"] == "applied":
+        return f"成功应用 {done} 项修改"
+    if result["status"] == "rolled_back":
+        summary = "有修改失败，已撤销所有已完成的修改"
+    elif result["status"] == "failed":
+        summary = "无法读取文件用于撤销，未执行任何修改"
+    else:
+        summary = f"部分修改失败，{done} 项已生效"
+        if result["rollback_errors"]:
+            summary += f"，撤销失败：{'; '.join(result['rollback_errors'])}"
+    return f"批量修改失败：{summary}\n" + "\n".join(lines)
+
 def get_obsidian_tools():
     """获取所有 Obsidian 工具"""
     tools = [
@@ -355,6 +716,12 @@ def get_obsidian_tools():
             func=list_files_in_vault,
             args_schema=ListFilesInput
         ),
+        StructuredTool.from_function(
+            name="find_files",
+            description="按文件名通配符、所在文件夹或扩展名在整个保险库（包括所有子文件夹）中查找文件，查找笔记位置时优先使用，一次调用即可",
+            func=find_files,
+            args_schema=FindFilesInput
+        ),
         StructuredTool.from_function(
             name="get_file_contents",
             description="获取指定文件的内容",
@@ -365,6 +732,7 @@ def get_obsidian_tools():
             name="get_batch_file_contents",
             description="获取多个文件的内容",
             func=get_batch_file_contents,
+            coroutine=aget_batch_file_contents,
             args_schema=GetBatchFilesInput
         ),
         StructuredTool.from_function(
@@ -423,10 +791,22 @@ def get_obsidian_tools():
         ),
         StructuredTool.from_function(
             name="delete_folder",
-            description="删除文件夹",
+            description="删除文件夹及其中的所有文件",
             func=delete_folder,
             args_schema=DeleteFolderInput
         ),
+        StructuredTool.from_function(
+            name="copy_folder",
+            description="复制整个文件夹（包括子文件夹中的文件）到新位置，输入源文件夹和目标文件夹",
+            func=copy_folder,
+            args_schema=CopyFolderInput
+        ),
+        StructuredTool.from_function(
+            name="move_folder",
+            description="移动或重命名整个文件夹（包括子文件夹中的文件），输入源文件夹和目标文件夹",
+            func=move_folder,
+            args_schema=CopyFolderInput
+        ),
         StructuredTool.from_function(
             name="insert_line_at_position",
             description="在指定行号插入内容",
@@ -438,9 +818,34 @@ def get_obsidian_tools():
             description="删除指定行号的内容",
             func=delete_line_at_position,
             args_schema=DeleteLineInput
+        ),
+        StructuredTool.from_function(
+            name="edit_lines",
+            description="一次性对文件应用多处行编辑（insert / delete / replace，行号按编辑前的文件计算），修改多行时优先使用。"
+                        "单字符串输入格式：文件路径|JSON 数组，例如 notes/a.md|[{\"operation\": \"delete\", \"line\": 3}]",
+            func=edit_lines,
+            args_schema=EditLinesInput
+        ),
+        StructuredTool.from_function(
+            name="apply_vault_changes",
+            description="一次性应用多个文件的修改（put / append / delete / edit_lines），不同文件并发执行，"
+                        "任一修改失败时默认撤销全部修改。整理、批量修改笔记时优先使用。单字符串输入为 JSON 数组",
+            func=apply_vault_changes,
+            args_schema=ApplyVaultChangesInput
         )
     ]
     
+    # 添加语义检索工具（如果已启用）
+    if semantic_index is not None:
+        tools.append(
+            StructuredTool.from_function(
+                name="semantic_search",
+                description="按语义检索保险库中与问题相关的笔记片段，不知道文件名时优先使用",
+                func=semantic_search,
+                args_schema=SemanticSearchInput
+            )
+        )
+    
     # 添加 MarkItDown 工具（如果可用）
     if MARKITDOWN_AVAILABLE:
         markitdown_tools = [
@@ -459,4 +864,5 @@ def get_obsidian_tools():
         ]
         tools.extend(markitdown_tools)
     
-    return tools
\ No newline at end of file
+    # 同一次 Agent 运行中重复的只读调用直接返回第一次的结果，其余工具调用后清空这些结果
+    return memoize_tools(tools, READ_ONLY_TOOLS, is_failure=is_tool_failure)
\ No newline at end of file
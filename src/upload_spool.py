@@ -0,0 +1,122 @@
+import os
+import tempfile
+from typing import AsyncIterator, Optional
+
+from python_multipart import MultipartParser
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import parse_options_header
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an uploaded file exceeds the size limit."""
+
+
+class SpooledUpload():
+    """A file received through a multipart upload, spooled to a temporary file."""
+
+    def __init__(self):
+        self.path: Optional[str] = None
+        self.filename: Optional[str] = None
+        self.size = 0
+        self.fields: dict[str, str] = {}
+
+    def cleanup(self) -> None:
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+async def spool_multipart(content_type: str, body: AsyncIterator[bytes], max_bytes: int, max_field_bytes: int = 64 * 1024) -> SpooledUpload:
+    """Parse a multipart/form-data body chunk by chunk, writing the file part straight to disk.
+
+    Only the current chunk is held in memory, so memory use does not depend
+    on the upload size. The temporary file keeps the uploaded file's extension
+    so converters can detect its type; the caller must call `cleanup()`.
+
+    Args:
+        content_type: The request's Content-Type header
+        body: Async iterator over the raw request body
+        max_bytes: Maximum size of the uploaded file
+        max_field_bytes: Maximum size of each non-file form field
+
+    Raises:
+        ValueError: If the body is not multipart/form-data or has no file part
+        UploadTooLargeError: If the file or a field exceeds its size limit
+    """
+    mime_type, params = parse_options_header(content_type)
+    boundary = params.get(b"boundary")
+    if mime_type != b"multipart/form-data" or not boundary:
+        raise ValueError("请求必须是带 boundary 的 multipart/form-data")
+
+    upload = SpooledUpload()
+    header_name = []
+    header_value = []
+    part = {"headers": {}, "file": None, "field": None, "value": []}
+
+    def on_part_begin():
+        part.update(headers={}, file=None, field=None, value=[])
+
+    def on_header_field(data, start, end):
+        header_name.append(data[start:end])
+
+    def on_header_value(data, start, end):
+        header_value.append(data[start:end])
+
+    def on_header_end():
+        part["headers"][b"".join(header_name).lower()] = b"".join(header_value)
+        header_name.clear()
+        header_value.clear()
+
+    def on_headers_finished():
+        _, options = parse_options_header(part["headers"].get(b"content-disposition", b""))
+        filename = options.get(b"filename")
+        if filename is not None and upload.path is None:
+            upload.filename = os.path.basename(filename.decode("utf-8", errors="replace"))
+            suffix = os.path.splitext(upload.filename)[1]
+            fd, upload.path = tempfile.mkstemp(suffix=suffix, prefix="upload_")
+            part["file"] = os.fdopen(fd, "wb")
+        elif filename is None:
+            part["field"] = (options.get(b"name") or b"").decode("utf-8", errors="replace")
+
+    def on_part_data(data, start, end):
+        if part["file"] is not None:
+            upload.size += end - start
+            if upload.size > max_bytes:
+                raise UploadTooLargeError(f"上传文件超过大小限制（{max_bytes} 字节）")
+            part["file"].write(data[start:end])
+        elif part["field"] is not None:
+            part["value"].append(data[start:end])
+            if sum(len(v) for v in part["value"]) > max_field_bytes:
+                raise UploadTooLargeError(f"表单字段 {part['field']} 过大")
+
+    def on_part_end():
+        if part["file"] is not None:
+            part["file"].close()
+            part["file"] = None
+        elif part["field"] is not None:
+            upload.fields[part["field"]] = b"".join(part["value"]).decode("utf-8", errors="replace")
+
+    parser = MultipartParser(boundary, callbacks={
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end
+    })
+
+    try:
+        async for chunk in body:
+            parser.write(chunk)
+        parser.finalize()
+    except BaseException as e:
+        if part["file"] is not None:
+            part["file"].close()
+        upload.cleanup()
+        if isinstance(e, MultipartParseError):
+            raise ValueError(f"无法解析上传内容: {str(e)}")
+        raise
+
+    if upload.path is None:
+        raise ValueError("请求中没有上传文件")
+    return upload
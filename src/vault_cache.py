@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Optional
+
+
+def parse_mtime(value: Any) -> Optional[int]:
+    """Convert an mtime reported by Obsidian to epoch milliseconds.
+
+    The REST API reports `stat.mtime` as epoch milliseconds while Dataview
+    serializes `file.mtime` as an ISO 8601 string.
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp() * 1000)
+        except ValueError:
+            return None
+    return None
+
+
+class VaultContentCache():
+    """Bounded LRU cache of note contents keyed by vault path.
+
+    Entries are evicted when either `max_entries` or `max_bytes` is exceeded.
+    Every entry remembers the note's mtime so that a list of files modified
+    since the last validation can drop only the stale entries.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 64 * 1024 * 1024, revalidate_interval: float = 5.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.revalidate_interval = revalidate_interval
+
+        self._entries: OrderedDict[str, tuple[str, Optional[int], int]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._last_validated = time.time()
+        self._validating = False
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, path: str, mtime: Optional[int] = None) -> Optional[tuple[str, Optional[int]]]:
+        """Return `(content, mtime)` for a cached path, or None on a miss.
+
+        Args:
+            path: Vault path of the note
+            mtime: Current mtime of the note if the caller already knows it;
+                an entry with a different mtime is dropped and counts as a miss
+        """
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and mtime is not None and entry[1] != mtime:
+                self._remove(path)
+                self.invalidations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def put(self, path: str, content: str, mtime: Optional[int] = None) -> None:
+        size = len(content.encode('utf-8'))
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._remove(path)
+            self._entries[path] = (content, mtime, size)
+            self._size += size
+
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, path: str) -> None:
+        """Drop a path and, if it names a folder, everything below it."""
+        prefix = path.rstrip('/') + '/'
+        with self._lock:
+            if self._remove(path):
+                self.invalidations += 1
+            for cached_path in [p for p in self._entries if p.startswith(prefix)]:
+                self._remove(cached_path)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._size = 0
+
+    def begin_revalidation(self) -> Optional[float]:
+        """Claim the next revalidation round if the interval has elapsed.
+
+        Returns:
+            The time of the previous validation, or None if no round is due
+            (or another thread is already running one)
+        """
+        with self._lock:
+            if self._validating or not self._entries:
+                return None
+            if time.time() - self._last_validated < self.revalidate_interval:
+                return None
+            self._validating = True
+            return self._last_validated
+
+    def end_revalidation(self, modified: Optional[dict[str, Optional[int]]], started_at: float) -> None:
+        """Apply the files modified since the previous validation.
+
+        Args:
+            modified: Mapping of path to its current mtime (epoch ms, or None if
+                unknown). Passing None means the check failed and every entry
+                is dropped.
+            started_at: When the modification query was issued
+        """
+        if modified is None:
+            self.clear()
+        else:
+            with self._lock:
+                for path, mtime in modified.items():
+                    entry = self._entries.get(path)
+                    if entry is None:
+                        continue
+                    cached_mtime = entry[1]
+                    if mtime is None or cached_mtime is None or mtime > cached_mtime:
+                        self._remove(path)
+                        self.invalidations += 1
+
+        with self._lock:
+            self._last_validated = started_at
+            self._validating = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+    def _remove(self, path: str) -> bool:
+        entry = self._entries.pop(path, None)
+        if entry is None:
+            return False
+        self._size -= entry[2]
+        return True
@@ -0,0 +1,201 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+CHANGE_OPERATIONS = ('put', 'append', 'delete', 'edit_lines')
+
+
+def _is_not_found(error: Exception) -> bool:
+    return '40400' in str(error)
+
+
+class VaultChangeset():
+    """A batch of vault writes applied together.
+
+    Operations on the same path, or on a folder and paths inside it, run one
+    after another in the order they were added; unrelated paths run
+    concurrently, at most `max_concurrency` at a time. With rollback enabled every touched file is snapshotted first (as
+    raw bytes, so attachments survive), and if any operation fails the files
+    that were already changed are restored (or removed again if they did not
+    exist before). Deleting a folder snapshots every file below it; rolling
+    back rewrites those files, but empty subfolders are not recreated.
+
+    Usage:
+        result = client.changeset().put("a.md", "...").delete("b.md").apply()
+    """
+
+    def __init__(self, client, max_concurrency: int = 8):
+        self.client = client
+        self.max_concurrency = max(1, max_concurrency)
+        self.operations: list[dict[str, Any]] = []
+
+    def put(self, filepath: str, content: str) -> 'VaultChangeset':
+        return self.add('put', filepath, content=content)
+
+    def append(self, filepath: str, content: str) -> 'VaultChangeset':
+        return self.add('append', filepath, content=content)
+
+    def delete(self, filepath: str) -> 'VaultChangeset':
+        return self.add('delete', filepath)
+
+    def edit_lines(self, filepath: str, edits: list[dict]) -> 'VaultChangeset':
+        return self.add('edit_lines', filepath, edits=edits)
+
+    def add(self, operation: str, filepath: str, content: str = "", edits: Optional[list[dict]] = None) -> 'VaultChangeset':
+        if operation not in CHANGE_OPERATIONS:
+            raise Exception(f"Unsupported operation: {operation}. Use one of {', '.join(CHANGE_OPERATIONS)}.")
+        if not filepath.strip('/'):
+            raise Exception("A file path is required")
+        self.operations.append({
+            'operation': operation,
+            'filepath': filepath.strip('/'),
+            'content': content,
+            'edits': edits or []
+        })
+        return self
+
+    def apply(self, rollback_on_failure: bool = True) -> dict[str, Any]:
+        """Run every queued operation.
+
+        Returns:
+            Dict with 'status' ("applied", "failed", "rolled_back" or
+            "partial"), 'results' (one entry per operation with 'index',
+            'operation', 'filepath', 'status' and 'error') and
+            'rollback_errors'
+        """
+        results = [
+            {'index': i, 'operation': op['operation'], 'filepath': op['filepath'], 'status': 'pending', 'error': None}
+            for i, op in enumerate(self.operations)
+        ]
+        groups: dict[str, list[int]] = {}
+        for i, op in enumerate(self.operations):
+            groups.setdefault(op['filepath'], []).append(i)
+        lanes = self._lanes(list(groups))
+
+        snapshots: dict[str, Any] = {}
+        if rollback_on_failure:
+            error = self._snapshot(list(groups), snapshots)
+            if error is not None:
+                for result in results:
+                    result.update(status='skipped', error=error)
+                return {'status': 'failed', 'results': results, 'rollback_errors': []}
+
+        failed = threading.Event()
+
+        def run_lane(paths: list[str]) -> None:
+            for i in sorted(i for path in paths for i in groups[path]):
+                if failed.is_set() and rollback_on_failure:
+                    results[i]['status'] = 'skipped'
+                    continue
+                try:
+                    self._run(self.operations[i])
+                    results[i]['status'] = 'done'
+                except Exception as e:
+                    results[i].update(status='failed', error=str(e))
+                    failed.set()
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, max(len(lanes), 1))) as executor:
+            list(executor.map(run_lane, lanes))
+
+        if not failed.is_set():
+            return {'status': 'applied', 'results': results, 'rollback_errors': []}
+        if not rollback_on_failure:
+            return {'status': 'partial', 'results': results, 'rollback_errors': []}
+
+        changed = {path for path, indices in groups.items() if any(results[i]['status'] != 'skipped' for i in indices)}
+        changed_lanes = [[path for path in lane if path in changed] for lane in lanes]
+        rollback_errors = self._rollback([lane for lane in changed_lanes if lane], snapshots, results, groups)
+        return {
+            'status': 'partial' if rollback_errors else 'rolled_back',
+            'results': results,
+            'rollback_errors': rollback_errors
+        }
+
+    @staticmethod
+    def _lanes(paths: list[str]) -> list[list[str]]:
+        """Group paths so that a folder and every path inside it share a lane."""
+        def overlaps(a: str, b: str) -> bool:
+            return a == b or a.startswith(b + '/') or b.startswith(a + '/')
+
+        lanes: list[list[str]] = []
+        for path in paths:
+            lane = [path]
+            for other in [other for other in lanes if any(overlaps(path, p) for p in other)]:
+                lanes.remove(other)
+                lane = other + lane
+            lanes.append(lane)
+        return lanes
+
+    def _run(self, op: dict[str, Any]) -> None:
+        operation = op['operation']
+        if operation == 'put':
+            self.client.put_content(op['filepath'], op['content'])
+        elif operation == 'append':
+            self.client.append_content(op['filepath'], op['content'])
+        elif operation == 'delete':
+            self.client.delete_file(op['filepath'])
+        else:
+            self.client.apply_line_edits(op['filepath'], op['edits'])
+
+    def _snapshot(self, paths: list[str], snapshots: dict[str, Any]) -> Optional[str]:
+        """Read the current state of every path, or return an error message.
+
+        A file is stored as its bytes, a folder as a dict of the bytes of
+        every file below it, and a path that does not exist as None.
+        """
+        def read(path: str) -> tuple[str, Any, Optional[str]]:
+            try:
+                return path, self.client._read_bytes(path), None
+            except Exception as e:
+                read_error = e
+            try:
+                if self.client.folder_exists(path):
+                    files = self.client.walk_files(path)
+                    with ThreadPoolExecutor(max_workers=min(self.max_concurrency, max(len(files), 1))) as executor:
+                        return path, dict(zip(files, executor.map(self.client._read_bytes, files))), None
+                if _is_not_found(read_error):
+                    return path, None, None
+                return path, None, f"Could not snapshot {path} for rollback: {str(read_error)}"
+            except Exception as e:
+                return path, None, f"Could not snapshot {path} for rollback: {str(e)}"
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, max(len(paths), 1))) as executor:
+            for path, content, error in executor.map(read, paths):
+                if error is not None:
+                    return error
+                snapshots[path] = content
+        return None
+
+    def _rollback(self, lanes: list[list[str]], snapshots: dict[str, Any], results: list[dict], groups: dict[str, list[int]]) -> list[str]:
+        errors = []
+
+        def restore(path: str) -> Optional[str]:
+            snapshot = snapshots[path]
+            try:
+                if snapshot is None:
+                    try:
+                        self.client.delete_file(path)
+                    except Exception as e:
+                        if not _is_not_found(e):
+                            raise
+                elif isinstance(snapshot, dict):
+                    # Writing the files back recreates the folder and its parents
+                    for file_path, data in snapshot.items():
+                        self.client._write_bytes(file_path, data)
+                else:
+                    self.client._write_bytes(path, snapshot)
+            except Exception as e:
+                return f"{path}: {str(e)}"
+            for i in groups[path]:
+                if results[i]['status'] == 'done':
+                    results[i]['status'] = 'rolled_back'
+            return None
+
+        def restore_lane(paths: list[str]) -> list[str]:
+            # Overlapping paths are restored one at a time, like they were applied
+            return [error for error in map(restore, paths) if error is not None]
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, max(len(lanes), 1))) as executor:
+            for lane_errors in executor.map(restore_lane, lanes):
+                errors.extend(lane_errors)
+        return errors
@@ -0,0 +1,243 @@
+import bisect
+import fnmatch
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+
+def _extension(path: str) -> str:
+    return os.path.splitext(path)[1].lower().lstrip('.')
+
+
+class VaultSnapshot():
+    """Cached listing of every file in the vault with its size and mtime.
+
+    The first query lists the whole vault through `client.list_file_stats`.
+    Later refreshes list it again and diff the result against the snapshot,
+    so only added, removed and modified paths touch the indexes. A refresh
+    happens when the snapshot is older than `refresh_interval`. Paths written
+    through the client are re-checked one by one before the next query
+    (a full refresh only when more than `max_pending` piled up), and watchers
+    can apply single-path changes directly with `apply_change`.
+
+    Queries (by glob, prefix or extension) are answered locally from a sorted
+    path list and an extension index.
+    """
+
+    def __init__(self, client, refresh_interval: float = 30.0, max_workers: int = 8, max_pending: int = 256):
+        self.client = client
+        self.refresh_interval = refresh_interval
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+
+        self._entries: dict[str, tuple[Optional[int], Optional[int]]] = {}
+        self._paths: list[str] = []
+        self._by_extension: dict[str, set[str]] = {}
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+
+        self.ready = False
+        self._dirty = False
+        self._pending: set[str] = set()
+        self._last_refresh = 0.0
+        self.refreshes = 0
+        self.last_refresh_ms = None
+        self.last_diff = {'added': 0, 'removed': 0, 'modified': 0}
+        self.queries = 0
+        self.path_updates = 0
+
+        client.add_change_listener(self.mark_path)
+
+    def mark_dirty(self) -> None:
+        """List the whole vault again before the next query."""
+        with self._lock:
+            self._dirty = True
+
+    def mark_path(self, path: str) -> None:
+        """Re-check a single path (a file or a folder) before the next query."""
+        with self._lock:
+            self._pending.add(path.strip('/'))
+
+    def refresh(self) -> dict[str, list[str]]:
+        """List the vault again and apply the difference to the snapshot.
+
+        Returns:
+            Dict with the 'added', 'removed' and 'modified' paths
+        """
+        with self._refresh_lock:
+            started = time.time()
+            with self._lock:
+                self._dirty = False
+                # The full listing covers every path written so far
+                self._pending.clear()
+            try:
+                current = self.client.list_file_stats("", self.max_workers)
+            except Exception:
+                with self._lock:
+                    self._dirty = True
+                raise
+
+            with self._lock:
+                previous = self._entries
+                added = [p for p in current if p not in previous]
+                removed = [p for p in previous if p not in current]
+                modified = [p for p in current if p in previous and previous[p] != current[p]]
+                for path in removed:
+                    self._remove(path)
+                for path in added:
+                    self._add(path, current[path])
+                for path in modified:
+                    self._entries[path] = current[path]
+
+                self.ready = True
+                self._last_refresh = started
+                self.refreshes += 1
+                self.last_refresh_ms = round((time.time() - started) * 1000, 1)
+                self.last_diff = {'added': len(added), 'removed': len(removed), 'modified': len(modified)}
+            return {'added': added, 'removed': removed, 'modified': modified}
+
+    def ensure_fresh(self) -> None:
+        with self._lock:
+            stale = not self.ready or self._dirty or len(self._pending) > self.max_pending \
+                or time.time() - self._last_refresh >= self.refresh_interval
+            pending = bool(self._pending)
+        if stale:
+            self.refresh()
+        elif pending:
+            self._apply_pending()
+
+    def _apply_pending(self) -> None:
+        """Re-check the paths written through the client since the last query."""
+        with self._lock:
+            paths, self._pending = self._pending, set()
+        if not paths:
+            return
+
+        def recheck(path: str) -> None:
+            try:
+                stat = self.client.stat_file(path)
+                if stat is not None:
+                    self.apply_change(path, stat)
+                elif self.client.folder_exists(path):
+                    # A folder was copied, moved or created: list just that subtree
+                    self._replace_below(path, self.client.list_file_stats(path, self.max_workers))
+                else:
+                    self.apply_change(path, None)
+            except Exception:
+                self.mark_dirty()
+
+        with ThreadPoolExecutor(max_workers=min(max(1, self.max_workers), len(paths))) as executor:
+            list(executor.map(recheck, paths))
+        with self._lock:
+            self.path_updates += len(paths)
+
+    def _replace_below(self, folder: str, current: dict[str, tuple[Optional[int], Optional[int]]]) -> None:
+        with self._lock:
+            for path in self._below(folder.rstrip('/') + '/'):
+                if path not in current:
+                    self._remove(path)
+            for path, stat in current.items():
+                self.apply_change(path, stat)
+
+    def apply_change(self, path: str, stat: Optional[tuple[Optional[int], Optional[int]]] = None) -> None:
+        """Update a single path without listing the vault.
+
+        Args:
+            path: Vault path that changed
+            stat: (size, mtime) of the file, or None if it no longer exists
+        """
+        with self._lock:
+            if not self.ready:
+                return
+            if stat is None:
+                self._remove(path)
+                # A removed folder takes everything below it along
+                prefix = path.rstrip('/') + '/'
+                for child in self._below(prefix):
+                    self._remove(child)
+            elif path in self._entries:
+                self._entries[path] = stat
+            else:
+                self._add(path, stat)
+
+    def find(self, pattern: str = "", folder: str = "", extension: str = "", limit: int = 100) -> list[dict[str, Any]]:
+        """Find files by glob pattern, folder and/or extension.
+
+        Args:
+            pattern: fnmatch-style glob (`*` also matches `/`); a pattern
+                without `/` is matched against the file name only
+            folder: Folder the files must be under (including subfolders)
+            extension: File extension without the dot, e.g. "md"
+            limit: Maximum number of results
+
+        Returns:
+            List of {'path', 'size', 'mtime'} sorted by path
+        """
+        self.ensure_fresh()
+        prefix = folder.strip('/') + '/' if folder.strip('/') else ""
+        extension = extension.lower().lstrip('.')
+        pattern = pattern.strip()
+        pattern_lower = pattern.lower()
+        match_name = '/' not in pattern
+
+        results = []
+        with self._lock:
+            self.queries += 1
+            if prefix:
+                candidates = self._below(prefix)
+            elif extension:
+                candidates = sorted(self._by_extension.get(extension, ()))
+            else:
+                candidates = self._paths
+            for path in candidates:
+                if extension and _extension(path) != extension:
+                    continue
+                if pattern:
+                    target = path.rsplit('/', 1)[-1] if match_name else path
+                    if not fnmatch.fnmatchcase(target.lower(), pattern_lower):
+                        continue
+                size, mtime = self._entries[path]
+                results.append({'path': path, 'size': size, 'mtime': mtime})
+                if len(results) >= limit:
+                    break
+        return results
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'ready': self.ready,
+                'files': len(self._entries),
+                'extensions': len(self._by_extension),
+                'refreshes': self.refreshes,
+                'last_refresh_ms': self.last_refresh_ms,
+                'last_diff': dict(self.last_diff),
+                'queries': self.queries,
+                'path_updates': self.path_updates
+            }
+
+    def _below(self, prefix: str) -> list[str]:
+        # Paths are sorted, so everything under a prefix is one contiguous run
+        start = bisect.bisect_left(self._paths, prefix)
+        end = start
+        while end < len(self._paths) and self._paths[end].startswith(prefix):
+            end += 1
+        return self._paths[start:end]
+
+    def _add(self, path: str, stat: tuple[Optional[int], Optional[int]]) -> None:
+        self._entries[path] = stat
+        bisect.insort(self._paths, path)
+        self._by_extension.setdefault(_extension(path), set()).add(path)
+
+    def _remove(self, path: str) -> None:
+        if self._entries.pop(path, None) is None:
+            return
+        index = bisect.bisect_left(self._paths, path)
+        if index < len(self._paths) and self._paths[index] == path:
+            del self._paths[index]
+        paths = self._by_extension.get(_extension(path))
+        if paths is not None:
+            paths.discard(path)
+            if not paths:
+                del self._by_extension[_extension(path)]
@@ -0,0 +1,296 @@
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    FileSystemEventHandler = object
+    WATCHDOG_AVAILABLE = False
+
+
+class VaultEvent():
+    """A debounced change to one vault path.
+
+    `kind` is "created", "modified", "deleted" or "moved"; a move also
+    carries `dest_path`. `size` and `mtime` (epoch ms) describe the file after
+    the change and are None when unknown or deleted.
+    """
+
+    def __init__(self, kind: str, path: str, dest_path: Optional[str] = None, size: Optional[int] = None, mtime: Optional[int] = None):
+        self.kind = kind
+        self.path = path
+        self.dest_path = dest_path
+        self.size = size
+        self.mtime = mtime
+
+    def paths(self) -> list[str]:
+        """Every path whose state changed."""
+        return [self.path, self.dest_path] if self.dest_path else [self.path]
+
+    def __repr__(self) -> str:
+        target = f" -> {self.dest_path}" if self.dest_path else ""
+        return f"VaultEvent({self.kind} {self.path}{target})"
+
+
+def _merge(previous: Optional[VaultEvent], event: VaultEvent) -> Optional[VaultEvent]:
+    """Coalesce two pending events for the same path (None drops both)."""
+    if previous is None:
+        return event
+    if previous.kind == "created" and event.kind == "deleted":
+        return None
+    if previous.kind == "created" and event.kind == "modified":
+        return VaultEvent("created", event.path, size=event.size, mtime=event.mtime)
+    if previous.kind == "deleted" and event.kind == "created":
+        return VaultEvent("modified", event.path, size=event.size, mtime=event.mtime)
+    return event
+
+
+class _WatchdogHandler(FileSystemEventHandler):
+    def __init__(self, watcher: 'VaultWatcher'):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event) -> None:
+        kind = {"created": "created", "modified": "modified", "deleted": "deleted", "moved": "moved"}.get(event.event_type)
+        if kind is None:
+            return
+        # Folder creation and content changes are reported for the files inside them
+        if event.is_directory and kind in ("created", "modified"):
+            return
+        path = self.watcher._relative(event.src_path)
+        dest_path = self.watcher._relative(event.dest_path) if kind == "moved" else None
+        if kind == "moved" and (dest_path is None or path is None):
+            # Moved into or out of the watched part of the vault (e.g. a hidden temp file renamed over a note)
+            if dest_path is not None:
+                size, mtime = self.watcher._stat(dest_path)
+                self.watcher.push(VaultEvent("modified", dest_path, size=size, mtime=mtime))
+            elif path is not None:
+                self.watcher.push(VaultEvent("deleted", path))
+            return
+        if path is None:
+            return
+        if kind == "deleted":
+            self.watcher.push(VaultEvent("deleted", path))
+            return
+        if event.is_directory:
+            # A renamed folder is reported as its old path going away and every file below the new one appearing
+            self.watcher.push(VaultEvent("deleted", path))
+            for file_path in self.watcher._walk(dest_path):
+                size, mtime = self.watcher._stat(file_path)
+                self.watcher.push(VaultEvent("created", file_path, size=size, mtime=mtime))
+            return
+        size, mtime = self.watcher._stat(dest_path or path)
+        self.watcher.push(VaultEvent(kind, path, dest_path, size=size, mtime=mtime))
+
+
+class VaultWatcher():
+    """Change feed for the vault, delivered to subscribers in debounced batches.
+
+    For a local vault (`client.vault_path`) changes come from the operating
+    system's file notifications through watchdog (inotify on Linux).
+    Otherwise, or without watchdog, the vault is polled: every
+    `poll_interval` seconds the notes modified since the last poll are
+    fetched with one Dataview query, and every `rescan_interval` seconds the
+    full file listing is diffed to pick up deletions, which Dataview cannot
+    report.
+
+    Events for the same path are coalesced until no new event has arrived for
+    `debounce` seconds, so an editor saving a note several times in a row
+    produces one event. Subscribers receive a list of `VaultEvent`s on the
+    watcher's thread and must not block for long.
+    """
+
+    def __init__(self, client, mode: str = "auto", debounce: float = 0.5, poll_interval: float = 10.0, rescan_interval: float = 300.0):
+        self.client = client
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.rescan_interval = rescan_interval
+        self.vault_path = getattr(client, "vault_path", None)
+
+        if mode == "auto":
+            mode = "inotify" if self.vault_path else "poll"
+        if mode == "inotify" and not (self.vault_path and WATCHDOG_AVAILABLE):
+            reason = "watchdog 未安装" if self.vault_path else "未使用文件系统后端"
+            print(f"警告: {reason}，改用轮询监听保险库变化")
+            mode = "poll"
+        self.mode = mode
+
+        self._subscribers: list[Callable[[list[VaultEvent]], None]] = []
+        self._pending: dict[str, VaultEvent] = {}
+        self._last_event = 0.0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._observer = None
+        self._known: Optional[dict[str, tuple]] = None
+
+        self.running = False
+        self.events_received = 0
+        self.events_delivered = 0
+        self.batches = 0
+        self.subscriber_errors = 0
+        self.polls = 0
+
+    def subscribe(self, callback: Callable[[list[VaultEvent]], None]) -> None:
+        self._subscribers.append(callback)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self.running = True
+        self._stop.clear()
+        self._spawn(self._deliver_loop, "vault-watcher-deliver")
+        if self.mode == "inotify":
+            self._observer = Observer()
+            self._observer.schedule(_WatchdogHandler(self), self.vault_path, recursive=True)
+            self._observer.daemon = True
+            self._observer.start()
+        else:
+            self._spawn(self._poll_loop, "vault-watcher-poll")
+        print(f"保险库监听已启动（{self.mode}）")
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+        self.running = False
+        self._stop.set()
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads.clear()
+
+    def push(self, event: VaultEvent) -> None:
+        """Queue an event for the next debounced batch."""
+        with self._lock:
+            self.events_received += 1
+            merged = _merge(self._pending.pop(event.path, None), event)
+            if merged is not None:
+                self._pending[event.path] = merged
+            self._last_event = time.monotonic()
+        self._wake.set()
+
+    def flush(self) -> list[VaultEvent]:
+        """Deliver pending events now, without waiting for the debounce delay."""
+        with self._lock:
+            batch = list(self._pending.values())
+            self._pending.clear()
+        if batch:
+            self._deliver(batch)
+        return batch
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "running": self.running,
+                "pending": len(self._pending),
+                "events_received": self.events_received,
+                "events_delivered": self.events_delivered,
+                "batches": self.batches,
+                "subscriber_errors": self.subscriber_errors,
+                "polls": self.polls
+            }
+
+    def _spawn(self, target, name: str) -> None:
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _deliver_loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            while not self._stop.is_set():
+                with self._lock:
+                    if not self._pending:
+                        break
+                    quiet = time.monotonic() - self._last_event
+                if quiet >= self.debounce:
+                    self.flush()
+                    break
+                self._stop.wait(self.debounce - quiet)
+
+    def _deliver(self, batch: list[VaultEvent]) -> None:
+        with self._lock:
+            self.batches += 1
+            self.events_delivered += len(batch)
+        for callback in self._subscribers:
+            try:
+                callback(batch)
+            except Exception as e:
+                with self._lock:
+                    self.subscriber_errors += 1
+                print(f"保险库变更订阅者出错: {str(e)}")
+
+    def _poll_loop(self) -> None:
+        last_poll = time.time()
+        last_rescan = 0.0
+        while not self._stop.wait(self.poll_interval):
+            started = time.time()
+            try:
+                if started - last_rescan >= self.rescan_interval:
+                    self._rescan()
+                    last_rescan = started
+                else:
+                    for path, mtime in self.client.get_files_modified_since(last_poll).items():
+                        known = self._known.get(path) if self._known is not None else None
+                        if known is not None and known[1] == mtime:
+                            continue
+                        if self._known is not None:
+                            # Dataview reports no size; the next rescan fills it in
+                            self._known[path] = (None, mtime)
+                        self.push(VaultEvent("modified" if known else "created", path, mtime=mtime))
+                last_poll = started
+                self.polls += 1
+            except Exception as e:
+                print(f"轮询保险库变化失败: {str(e)}")
+
+    def _rescan(self) -> None:
+        """Diff the full listing against the previous one."""
+        current = self.client.list_file_stats()
+        previous = self._known
+        self._known = current
+        if previous is None:
+            return
+        for path in previous.keys() - current.keys():
+            self.push(VaultEvent("deleted", path))
+        for path, (size, mtime) in current.items():
+            if path not in previous:
+                self.push(VaultEvent("created", path, size=size, mtime=mtime))
+            elif previous[path][1] != mtime or None not in (previous[path][0], size) and previous[path][0] != size:
+                self.push(VaultEvent("modified", path, size=size, mtime=mtime))
+
+    def _relative(self, full_path) -> Optional[str]:
+        if isinstance(full_path, bytes):
+            full_path = os.fsdecode(full_path)
+        rel_path = os.path.relpath(full_path, self.vault_path).replace(os.sep, '/')
+        # Hidden entries (.obsidian, .trash, temp files from atomic writes) are not part of the vault
+        if rel_path.startswith('..') or any(part.startswith('.') for part in rel_path.split('/')):
+            return None
+        return rel_path
+
+    def _walk(self, rel_path: str) -> list[str]:
+        files = []
+        for root, dirs, names in os.walk(os.path.join(self.vault_path, rel_path)):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            for name in names:
+                file_path = self._relative(os.path.join(root, name))
+                if file_path is not None:
+                    files.append(file_path)
+        return files
+
+    def _stat(self, rel_path: str) -> tuple[Optional[int], Optional[int]]:
+        try:
+            stat = os.stat(os.path.join(self.vault_path, rel_path))
+        except OSError:
+            return None, None
+        return stat.st_size, stat.st_mtime_ns // 1_000_000
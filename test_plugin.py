@@ -87,6 +87,51 @@ def test_chat():
         print(f"❌ 聊天异常: {e}")
         return False
 
+def test_chat_stream():
+    """测试流式聊天端点"""
+    print("\n📡 测试流式聊天...")
+    message = {
+        "message": "你好，请简单介绍一下你自己。",
+        "conversation_id": None
+    }
+    
+    try:
+        headers = {"Content-Type": "application/json"}
+        if API_KEY:
+            headers["Authorization"] = f"Bearer {API_KEY}"
+            
+        response = requests.post(f"{API_URL}/chat/stream", 
+                               json=message, 
+                               headers=headers,
+                               stream=True)
+        
+        if response.status_code != 200:
+            print(f"❌ 流式聊天失败: {response.status_code} - {response.text}")
+            return False
+        
+        tokens = 0
+        for line in response.iter_lines(decode_unicode=True):
+            if not line:
+                continue
+            event = json.loads(line)
+            if event["type"] == "token":
+                tokens += 1
+            elif event["type"] == "final":
+                print(f"✅ 流式聊天成功:")
+                print(f"   响应: {event.get('response', '无响应')}")
+                print(f"   token 事件数: {tokens}")
+                print(f"   首 token 延迟: {event.get('time_to_first_token_ms')} ms")
+                return True
+            elif event["type"] == "error":
+                print(f"❌ 流式聊天出错: {event.get('error')}")
+                return False
+        
+        print("❌ 流式聊天未返回最终结果")
+        return False
+    except Exception as e:
+        print(f"❌ 流式聊天异常: {e}")
+        return False
+
 def test_obsidian_tools():
     """测试Obsidian工具功能"""
     print("\n🛠️ 测试Obsidian工具...")
@@ -140,6 +185,10 @@ def main():
     if not test_chat():
         print("❌ 聊天功能失败")
     
+    # 测试流式聊天
+    if not test_chat_stream():
+        print("❌ 流式聊天失败")
+    
     # 等待一下
     time.sleep(2)
     